@@ -0,0 +1,205 @@
+"""
+CROSS-SUPPLIER DUPLICATE CLUSTERS
+---------------------------------
+Merging_code.py only drops exact (Product_Name, Supplier) duplicates, so the same
+item listed by two suppliers under slightly different names is counted twice.
+This stage groups such listings under a shared Cluster_ID.
+
+1. Blocking: every product gets a key of (weight in grams, packaging type, first
+   brand token of the name). Only products with the same key are compared, so the
+   work grows with the block sizes instead of with all n*(n-1)/2 pairs.
+2. Oversized blocks (more than MAX_BLOCK_SIZE products, e.g. a very common brand
+   and weight) are split again by the second name token; whatever is still too
+   large is compared with a sorted-neighbourhood window of WINDOW products.
+3. Scoring: two products from different suppliers match when the Jaccard
+   similarity of their name tokens is at least MATCH_THRESHOLD and their
+   Units_Per_Carton agree (or one of them is unknown).
+4. Matches are merged with union-find, best score first. A cluster holds at most
+   one product per supplier (listings of one supplier are distinct SKUs after the
+   exact dedup), which stops "COCA COLA LIGHT" and "COCA COLA" from chaining
+   together through a third supplier's "COCA COLA ORIGINAL". Every product gets a
+   Cluster_ID ("cluster_<n>", numbered in output row order) and its cluster size.
+
+Input is the typed Parquet output of Merging_code.py (the CSV when the Parquet
+file is missing). Output is a CSV of Product_ID, Cluster_ID, Cluster_Size.
+
+Usage
+-----
+    python Duplicate_clusters.py
+    python Duplicate_clusters.py --input products.parquet --threshold 0.6
+"""
+
+# IMPORTS
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from Merging_code import nullable_int64, output_file, output_parquet
+
+# CONFIG
+CLUSTERS_FILE = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Product_Clusters.csv"
+MATCH_THRESHOLD = 0.5     # minimum token Jaccard similarity for a match
+MAX_BLOCK_SIZE = 50       # blocks above this size are split further
+WINDOW = 10               # sorted-neighbourhood window for blocks that stay oversized
+
+# name tokens that describe size or packaging rather than the product
+NOISE_TOKENS = {
+    "KG", "KGS", "GM", "GMS", "GR", "GRAM", "GRAMS", "ML", "LTR", "LT", "LITRE", "LITER",
+    "PCS", "PC", "PS", "CTN", "CARTON", "CARTONS", "PKT", "PACK", "BOX", "BTL", "CAN",
+    "TIN", "JAR", "BAG", "BAGS", "DOZ", "NOS", "X",
+}
+
+
+def name_tokens(names: pd.Series) -> pd.Series:
+    """Upper-case alphabetic tokens of each name (2+ letters, noise words removed), in name order."""
+    words = names.astype("string").str.upper().str.findall(r"[A-Z]{2,}")
+    return words.map(lambda ws: [w for w in ws if w not in NOISE_TOKENS] if isinstance(ws, list) else [])
+
+
+def load_products(path: str) -> pd.DataFrame:
+    """Product_ID, Product_Name, Supplier, Weight_Grams, Packaging_Type, Units_Per_Carton."""
+    columns = ['Product_ID', 'Product_Name', 'Supplier', 'Weight_Grams', 'Packaging_Type', 'Units_Per_Carton']
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_csv(path)
+    df['Weight_Grams'] = nullable_int64(df['Weight_Quantity'].astype("string").str.removesuffix("G"))
+    return df[columns]
+
+
+class UnionFind:
+    """Disjoint sets over row positions, tracking the suppliers present in each set."""
+
+    def __init__(self, suppliers):
+        self.parent = np.arange(len(suppliers))
+        self.suppliers = {i: {s} for i, s in enumerate(suppliers)}
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int) -> bool:
+        """Merge the sets of i and j unless they share a supplier; True if merged."""
+        ri, rj = self.find(i), self.find(j)
+        if ri == rj or self.suppliers[ri] & self.suppliers[rj]:
+            return False
+        # the smaller row position becomes the root, so roots are first occurrences
+        root, child = min(ri, rj), max(ri, rj)
+        self.parent[child] = root
+        self.suppliers[root] |= self.suppliers.pop(child)
+        return True
+
+
+def candidate_pairs(members: np.ndarray, sort_keys: list, max_block: int, window: int):
+    """All pairs of a block, or neighbour pairs inside `window` once sorted when it is too large."""
+    if len(members) <= max_block:
+        for a in range(len(members)):
+            for b in range(a + 1, len(members)):
+                yield members[a], members[b]
+        return
+    ordered = members[np.argsort(sort_keys, kind="stable")]
+    for a in range(len(ordered)):
+        for b in range(a + 1, min(a + 1 + window, len(ordered))):
+            yield ordered[a], ordered[b]
+
+
+def cluster_products(df: pd.DataFrame, threshold: float = MATCH_THRESHOLD,
+                     max_block: int = MAX_BLOCK_SIZE, window: int = WINDOW):
+    """
+    Cluster_ID / Cluster_Size for every row of `df` (same order), plus run stats.
+    Rows without any name token are left as singletons.
+    """
+    df = df.reset_index(drop=True)
+    tokens = name_tokens(df['Product_Name'])
+    token_sets = [frozenset(t) for t in tokens]
+    suppliers = df['Supplier'].astype("string").to_numpy(dtype=object)
+    units = pd.to_numeric(df['Units_Per_Carton'], errors="coerce").to_numpy(dtype=float)
+    weight = df['Weight_Grams'].astype("Int64").astype("string").fillna("")
+
+    blocking = pd.DataFrame({
+        'weight': weight,
+        'packaging': df['Packaging_Type'].astype("string").fillna(""),
+        'brand': tokens.str[0].fillna(""),
+        'second': tokens.str[1].fillna(""),
+        'joined': tokens.str.join(" "),
+    })
+    has_tokens = (blocking['brand'] != "").to_numpy()
+    keyed = blocking[has_tokens]
+
+    uf = UnionFind(suppliers)
+    stats = {"products": len(df), "blocks": 0, "largest_block": 0, "comparisons": 0, "matches": 0}
+
+    for _, block in keyed.groupby(['weight', 'packaging', 'brand'], sort=False):
+        # a block with a single supplier cannot contain a cross-supplier match
+        if len(block) < 2 or len(set(suppliers[block.index])) < 2:
+            continue
+        sub_blocks = [block] if len(block) <= max_block else \
+            [b for _, b in block.groupby('second', sort=False)]
+        for sub in sub_blocks:
+            if len(sub) < 2:
+                continue
+            stats["blocks"] += 1
+            stats["largest_block"] = max(stats["largest_block"], len(sub))
+            members = sub.index.to_numpy()
+            scored = []
+            for i, j in candidate_pairs(members, sub['joined'].tolist(), max_block, window):
+                if suppliers[i] == suppliers[j]:
+                    continue
+                stats["comparisons"] += 1
+                if not (np.isnan(units[i]) or np.isnan(units[j]) or units[i] == units[j]):
+                    continue
+                a, b = token_sets[i], token_sets[j]
+                score = len(a & b) / len(a | b)
+                if score >= threshold:
+                    scored.append((-score, i, j))
+            for _, i, j in sorted(scored):
+                stats["matches"] += uf.union(i, j)
+
+    roots = np.array([uf.find(i) for i in range(len(df))])
+    # number clusters by first occurrence, i.e. in output row order
+    cluster_no = pd.Series(roots).rank(method="dense").astype(np.int64).to_numpy()
+    sizes = pd.Series(roots).map(pd.Series(roots).value_counts()).to_numpy()
+    clusters = pd.DataFrame({
+        'Product_ID': df['Product_ID'].to_numpy(),
+        'Cluster_ID': [f"cluster_{n}" for n in cluster_no],
+        'Cluster_Size': sizes,
+    })
+    stats["clusters"] = int(cluster_no.max()) if len(df) else 0
+    stats["multi_product_clusters"] = int(pd.Series(roots)[sizes > 1].nunique())
+    return clusters, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=output_parquet if os.path.exists(output_parquet) else output_file,
+                        help="cleaned products (.parquet or .csv) written by Merging_code.py")
+    parser.add_argument("--output", default=CLUSTERS_FILE)
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD)
+    parser.add_argument("--max-block", type=int, default=MAX_BLOCK_SIZE)
+    parser.add_argument("--window", type=int, default=WINDOW)
+    args = parser.parse_args()
+
+    print(f"📥 Loading {args.input} ...")
+    df = load_products(args.input)
+    start = time.perf_counter()
+    clusters, stats = cluster_products(df, args.threshold, args.max_block, args.window)
+    elapsed = time.perf_counter() - start
+    clusters.to_csv(args.output, index=False)
+
+    n = stats["products"]
+    print(f"\n✅ Clusters saved as: {args.output}")
+    print(f"🧾 Products: {n:,} | clusters: {stats['clusters']:,} | "
+          f"clusters with 2+ products: {stats['multi_product_clusters']:,}")
+    print(f"🔎 Compared {stats['comparisons']:,} pairs in {stats['blocks']:,} blocks "
+          f"(largest {stats['largest_block']:,}) instead of {n * (n - 1) // 2:,}; "
+          f"{stats['matches']:,} matches in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+REPORT ENGINE BENCHMARK
+-----------------------
+Runs the report queries (report_queries.QUERIES) with SQLite and with DuckDB on
+the same synthetic catalog at several sizes.
+
+For every size, one catalog is generated in the shape Merging_code.py writes
+(OUTPUT_COLUMNS, "400G" weights) around the packaging / units / grams columns of
+Report_benchmark.synthetic_columns, so both benchmarks measure the same data. It
+is saved as both outputs of Merging_code.py: the CSV and the typed Parquet file
+(Merging_code.to_arrow). The SQLite master table is loaded from the same rows
+with the typed columns, REPORT_INDEXES and connection profile Sql_creation.py uses.
+
+Engines timed (Report_benchmark.best_of, load time not included for SQLite):
+
+1. sqlite per query: every query on its own, as SQL Queries.py used to run them
+2. sqlite passes: report_queries.run_report (grouped passes, no summary tables)
+3. duckdb parquet: report_duckdb over the Parquet file
+4. duckdb csv: report_duckdb over the CSV (loaded into DuckDB on every run)
+
+Every engine must return exactly the results of "sqlite per query" (exit code 1
+otherwise). The summary tables of report_summaries.py are left out: they answer
+the report from a few rows at any size, but only because the load maintains them.
+
+Usage
+-----
+    python Engine_benchmark.py
+    python Engine_benchmark.py --sizes 100000,1000000,10000000 --workdir /tmp --threads 4
+"""
+
+# IMPORTS
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from Merging_code import OUTPUT_COLUMNS, to_arrow
+from Report_benchmark import SEED, best_of, synthetic_columns
+from report_duckdb import compare_engines, run_report_duckdb
+from report_queries import QUERIES, TABLE_NAME, create_indexes, run_report
+from sqlite_connect import connect
+
+# CONFIG
+DEFAULT_SIZES = "100000,1000000"
+SUPPLIERS = ["Amal Trading", "Al Maya", "Choithrams", "Spinneys", "Union Coop", "Lulu"]
+MISSING_SERIALS = 0.03
+
+ENGINES = ["sqlite per query", "sqlite passes", "duckdb parquet", "duckdb csv"]
+
+
+def synthetic_catalog(n: int) -> pd.DataFrame:
+    """
+    n cleaned products (OUTPUT_COLUMNS) around the packaging / units / grams columns of
+    Report_benchmark.synthetic_columns; serial numbers repeat within and across suppliers.
+    """
+    columns = synthetic_columns(n)
+    units, grams = columns["Units_Per_Carton"], columns["Weight_Grams"]
+    # its own stream for the columns synthetic_columns does not draw
+    rng = np.random.default_rng(SEED + 1)
+    ids = pd.Series(np.arange(n)).astype(str)
+    serials = pd.Series(rng.integers(1, max(n // 2, 2), n)).astype(str)
+    df = pd.DataFrame({
+        "Product_ID": "product_" + ids.str.zfill(12),
+        "Product_Name": "PRODUCT " + ids,
+        "Serial_Number": serials.mask(rng.random(n) < MISSING_SERIALS),
+        "Supplier": rng.choice(SUPPLIERS, n),
+        "Weight_Quantity": pd.Series(grams).astype(str).add("G").mask(grams == 0),
+        "Packaging_Type": columns["Packaging_Type"],
+        "Units_Per_Carton": pd.Series(units).astype("Int64").mask(units == 0),
+    })
+    return df[OUTPUT_COLUMNS]
+
+
+def build_sqlite(path: str, df: pd.DataFrame):
+    """products with the typed report columns and the report indexes, as Sql_creation.py loads it."""
+    typed = to_arrow(df).to_pandas()
+    typed = typed.astype({"Supplier": "string", "Packaging_Type": "string"})
+    conn = connect(path, "bulk_load")
+    conn.execute(f"""
+        CREATE TABLE {TABLE_NAME} (
+            Product_ID TEXT PRIMARY KEY, Product_Name TEXT, Serial_Number TEXT, Supplier TEXT,
+            Weight_Grams INTEGER, Packaging_Type TEXT, Units_Per_Carton INTEGER
+        )""")
+    rows = typed.astype(object).where(typed.notna(), None).itertuples(index=False, name=None)
+    with conn:
+        conn.executemany(f"INSERT INTO {TABLE_NAME} VALUES ({', '.join('?' * typed.shape[1])})", rows)
+        create_indexes(conn, TABLE_NAME)
+    return conn
+
+
+def benchmark(sizes, workdir: str, threads: int = None) -> bool:
+    ok = True
+    print(f"\n{'rows':>12}" + "".join(f"{engine + ' s':>20}" for engine in ENGINES) + f"{'best':>18}")
+    for n in sizes:
+        folder = tempfile.mkdtemp(prefix=f"engine_bench_{n}_", dir=workdir)
+        df = synthetic_catalog(n)
+        csv_file, parquet_file = os.path.join(folder, "products.csv"), os.path.join(folder, "products.parquet")
+        df.to_csv(csv_file, index=False)
+        pq.write_table(to_arrow(df), parquet_file, compression="zstd")
+        conn = build_sqlite(os.path.join(folder, "products.db"), df)
+        del df
+
+        runs = {
+            "sqlite per query": lambda: {desc: pd.read_sql_query(sql, conn) for desc, sql in QUERIES.items()},
+            "sqlite passes": lambda: run_report(conn)[0],
+            "duckdb parquet": lambda: run_report_duckdb(parquet_file, None, threads)[1],
+            "duckdb csv": lambda: run_report_duckdb(csv_file, None, threads)[1],
+        }
+        times, results = {}, {}
+        for engine, run in runs.items():
+            times[engine], results[engine] = best_of(run)
+        conn.close()
+        shutil.rmtree(folder)
+
+        best = min(times, key=times.get)
+        print(f"{n:>12,}" + "".join(f"{times[engine]:>20.3f}" for engine in ENGINES) + f"{best:>18}")
+        for engine in ENGINES[1:]:
+            if compare_engines(results["sqlite per query"], results[engine]):
+                print(f"   ❌ {engine} differs from sqlite per query at {n:,} rows")
+                ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated synthetic row counts")
+    parser.add_argument("--workdir", default=tempfile.gettempdir(), help="where the benchmark files are written")
+    parser.add_argument("--threads", type=int, default=None, help="DuckDB threads (default: all cores)")
+    args = parser.parse_args()
+
+    if not benchmark([int(x) for x in args.sizes.split(",")], args.workdir, args.threads):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+EXTRACTION GOLDEN CHECK & BENCHMARK
+-----------------------------------
+Compares the vectorized weight and units-per-carton extractors in Merging_code.py
+with the original row-wise functions they replace. The vectorized counts are
+nullable Int64, so a row-wise count outside the int64 range is expected as NULL.
+
+1. Golden check: runs both versions over every Product_Name of the four supplier
+   catalogs and over EDGE_CASES (non-string columns, repeated index labels, digit
+   runs beyond int64 or float, non-ASCII digits and spaces), and fails (exit code 1)
+   if a single row differs. The EDGE_CASES names also go through process_supplier,
+   which must keep every row.
+2. Benchmark: times both versions on synthetic columns of 10k, 1M and 10M rows
+   (names sampled with replacement from the real catalogs) and prints rows/sec.
+
+Usage
+-----
+    python Extraction_benchmark.py --catalog-dir /path/to/Files
+    python Extraction_benchmark.py --sizes 10000,1000000 --rowwise-limit 1000000
+"""
+
+# IMPORTS
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Merging_code import (
+    INT64_MIN,
+    INT64_MAX,
+    input_files,
+    process_supplier,
+    standardize_columns,
+    extract_weight_quantity,
+    extract_weight_quantity_vectorized,
+    extract_units_per_carton,
+    extract_units_per_carton_vectorized,
+)
+
+# CONFIG
+CATALOG_DIR = "/home/anusha/Desktop/Servoo/Files"
+DEFAULT_SIZES = "10000,1000000,10000000"
+ROWWISE_LIMIT = 1_000_000   # row-wise .apply is skipped above this size (too slow to be useful)
+SEED = 42
+
+# column -> (row-wise function, vectorized function)
+EXTRACTORS = {
+    "Weight_Quantity": (extract_weight_quantity, extract_weight_quantity_vectorized),
+    "Units_Per_Carton": (extract_units_per_carton, extract_units_per_carton_vectorized),
+}
+
+# columns the pipeline does not produce from the real catalogs, but the extractor must still survive
+EDGE_CASES = {
+    "all missing": pd.Series([np.nan, np.nan, np.nan]),
+    "numbers only": pd.Series([1, 24, 500]),
+    "no strings": pd.Series([5, None, 2.5], dtype=object),
+    "mixed types": pd.Series(["12 PCS", 5, None, "6*2.5L FAMILY CTN", 3.5], dtype=object),
+    "repeated index": pd.Series(["24X500 ML", "12 PCS", "NO UNITS", "4 X 18 X 56G"], index=[0, 0, 1, 1]),
+    "long digits": pd.Series(["99999999999999999999 PCS", "123456789012345678901X500ML",
+                              "10000000000X10000000000X5G", "99999999999999999999+1",
+                              "ABC 123456789012345678901 PCS", "9223372036854775807 PCS",
+                              "TEA 99999999999999999999G", "SALT " + "9" * 400 + "G"]),
+    "weight formats": pd.Series(["340GX24", "2.5KGX 4", "15.9KG1", "500 ml", "1.5 M L", "0.5G", "2.5G",
+                                 "500Gß", "500G_", "500\xa0G", "\u0665\u0660\u0660 G", "12 LT BOTTLE",
+                                 "1e20", 1e20, 2.5, "GHEE 1KGS CTN", "500GRAMS", "NO WEIGHT",
+                                 "2.5kgx4", "5KGS", "500\x0bG", "500\x1cG", "500G\n", "500G\x1f", "12.5.5KG",
+                                 "500 ΜL", "1,5 L", "ſ500G", "500G×12", "5KG\u2003BAG"]),
+    "unit formats": pd.Series(["4 X 18 X 56G", "4X5X6", "4X5 ABC 6X7", "24X500 ML CTN", "(1.5 ML*12)",
+                               "6*2.5L FAMILY CTN", "7 UP 150 ML X 30", "100 TEA BAGS", "24X ML", "36+6",
+                               "9223372036854775807+1", "12\x0bPCS", "12\x1cPCS", "_12PCS", "A12PCS",
+                               "12 PCS×", "\u0661\u0662 PCS", "6×2.25LTR", "12pcs", "X 7"]),
+}
+
+
+def load_catalog_names(catalog_dir: str) -> pd.Series:
+    """All Product_Name values of the configured supplier catalogs, in file order."""
+    names = []
+    for supplier, path in input_files.items():
+        path = os.path.join(catalog_dir, os.path.basename(path))
+        if not os.path.exists(path):
+            print(f"⚠️ File not found: {path}")
+            continue
+        names.append(standardize_columns(pd.read_csv(path), supplier)['Product_Name'])
+    return pd.concat(names, ignore_index=True)
+
+
+def int64_or_none(value):
+    """A row-wise result as the pipeline stores it: integers outside int64 are NULL."""
+    return None if isinstance(value, int) and not INT64_MIN <= value <= INT64_MAX else value
+
+
+def same(expected, actual) -> bool:
+    if pd.isna(expected) or pd.isna(actual):
+        return pd.isna(expected) and pd.isna(actual)
+    return expected == actual
+
+
+def golden_check(names: pd.Series) -> bool:
+    ok = True
+    for column, (rowwise, vectorized) in EXTRACTORS.items():
+        expected = [int64_or_none(v) for v in names.apply(rowwise)]
+        actual = vectorized(names).tolist()
+        diffs = [(n, e, a) for n, e, a in zip(names, expected, actual) if not same(e, a)]
+        print(f"🔎 {column}: {len(names) - len(diffs)}/{len(names)} rows identical")
+        for n, e, a in diffs[:10]:
+            print(f"   ❌ {n!r}: row-wise={e!r} vectorized={a!r}")
+        ok = ok and not diffs
+    for case, names in EDGE_CASES.items():
+        for column, (rowwise, vectorized) in EXTRACTORS.items():
+            expected = [int64_or_none(v) for v in names.apply(rowwise)]
+            actual = vectorized(names)
+            if not actual.index.equals(names.index) or not all(map(same, expected, actual)):
+                print(f"   ❌ {column} / {case}: row-wise={expected!r} vectorized={actual.tolist()!r}")
+                ok = False
+    print(f"🔎 Edge cases: {'all identical' if ok else 'differences found'} ({len(EDGE_CASES)} columns)")
+    return pipeline_check() and ok
+
+
+def pipeline_check() -> bool:
+    """process_supplier over the EDGE_CASES names: no row lost, counts outside int64 stored as NULL."""
+    ok = True
+    for case, names in EDGE_CASES.items():
+        try:
+            clean = process_supplier("Edge cases", pd.DataFrame({'Product_Name': names.to_numpy()}))
+        except Exception as e:
+            print(f"   ❌ process_supplier / {case}: {type(e).__name__}: {e}")
+            ok = False
+            continue
+        expected = [int64_or_none(v) for v in names.apply(extract_units_per_carton)]
+        if len(clean) != len(names) or not all(map(same, expected, clean['Units_Per_Carton'])):
+            print(f"   ❌ process_supplier / {case}: Units_Per_Carton={clean['Units_Per_Carton'].tolist()!r}, "
+                  f"expected {expected!r}")
+            ok = False
+    print(f"🔎 Pipeline: {'edge cases survive process_supplier' if ok else 'failures found'}")
+    return ok
+
+
+def timed(fn, arg):
+    start = time.perf_counter()
+    fn(arg)
+    return time.perf_counter() - start
+
+
+def benchmark(names: pd.Series, sizes, rowwise_limit: int):
+    rng = np.random.default_rng(SEED)
+    pool = names.to_numpy(dtype=object)
+    print(f"\n{'column':<18}{'rows':>12}{'row-wise rows/s':>18}{'vectorized rows/s':>20}{'speedup':>10}")
+    for n in sizes:
+        synthetic = pd.Series(pool[rng.integers(0, len(pool), n)])
+        for column, (rowwise, vectorized) in EXTRACTORS.items():
+            t_vec = timed(vectorized, synthetic)
+            if n <= rowwise_limit:
+                t_row = timed(lambda s: s.apply(rowwise), synthetic)
+                row_rate, speedup = f"{n / t_row:,.0f}", f"{t_row / t_vec:.1f}x"
+            else:
+                row_rate, speedup = "skipped", "-"
+            print(f"{column:<18}{n:>12,}{row_rate:>18}{n / t_vec:>20,.0f}{speedup:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog-dir", default=CATALOG_DIR)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated synthetic row counts")
+    parser.add_argument("--rowwise-limit", type=int, default=ROWWISE_LIMIT)
+    parser.add_argument("--check-only", action="store_true", help="run the golden check and exit")
+    args = parser.parse_args()
+
+    names = load_catalog_names(args.catalog_dir)
+    if names.empty:
+        sys.exit("❌ No catalog rows found")
+    if not golden_check(names):
+        sys.exit(1)
+    if not args.check_only:
+        benchmark(names, [int(x) for x in args.sizes.split(",")], args.rowwise_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,10 @@ Intended usage
     `output_file`.
 - Run the script as a standalone module. Each configured CSV will be read,
     transformed, and appended to a combined DataFrame which is saved to `output_file`.
+- For very large catalogs run with `--streaming` (optionally `--chunk-size N`):
+    files are read, processed, deduplicated and written chunk by chunk.
+- `--workers N` spreads the extraction of not-yet-seen names over N processes;
+    the output is identical to the serial run.
 - The consolidated output columns are:
         Product_ID, Product_Name, Serial_Number, Supplier,
         Weight_Quantity, Packaging_Type, Units_Per_Carton
@@ -20,6 +24,7 @@ Dependencies
 ------------
 - pandas (pd)
 - numpy (np)
+- pyarrow (Parquet output)
 - re
 - os
 Top-level behavior summary
@@ -33,10 +38,13 @@ Top-level behavior summary
      - `Units_Per_Carton` via `extract_units_per_carton`
      - `Packaging_Type` via `detect_packaging_type`, except for the "Amal Trading"
          supplier where a provided 'Unit' column is used (CTN vs NON-CTN)
+     The extractors run once per distinct normalized name (`extract_features` behind
+     a `NameMemo`) and the results are joined back onto the rows.
 5. Keep selected columns, append to a global list and concat into `final_df`.
-6. Deduplicate by (Product_Name, Supplier), reset index and assign Product_ID values
-     in the form "product_<n>".
-7. Write consolidated CSV to `output_file` and print a brief summary.
+6. Deduplicate by (Product_Name, Supplier), reset index and assign stable Product_ID
+     values in the form "product_<hash>" (see product_ids.py).
+7. Write consolidated CSV to `output_file`, the rows changed since the previous run
+     to `output_delta`, and print a brief summary.
 
 Config & customization points
 -----------------------------
@@ -51,8 +59,8 @@ Error handling & logging
 - Missing input files: printed warning and skipped.
 - Missing Product_Name column after standardization: raises ValueError.
 - CSV read errors (encoding, malformed CSV) will propagate as pandas exceptions.
-- Minimal console logging is provided via print statements; replace with logging
-    for production use.
+- Progress is printed; per-stage timings are logged through `logging` and written
+    to the JSON run report (`RUN_REPORT`, see run_report.py).
 Examples
 --------
 - To add a new supplier, add an entry to `input_files` mapping (name -> CSV path).
@@ -64,8 +72,8 @@ Limitations & caveats
     necessary for unusual naming conventions.
 - Volume-to-mass conversions are approximations and may not hold for non-water densities.
 - Numeric rounding to integer grams may hide fractional weights; adjust if needed.
-- Deduplication is based only on (Product_Name, Supplier). If global deduplication
-    across suppliers is required, add normalized matching logic (e.g., fuzzy matching).
+- Deduplication is based only on (Product_Name, Supplier). The same item listed by
+    several suppliers is grouped afterwards by Duplicate_clusters.py (shared Cluster_ID).
 Author / Maintainer notes
 -------------------------
 - Keep regexes maintainable and add unit test coverage for the extraction functions
@@ -76,9 +84,20 @@ Author / Maintainer notes
 
 # IMPORTS
 import pandas as pd
+import argparse
+import logging
+import math
 import os
 import re
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from etl_cache import SupplierCache, NameMemo, code_salt, delta_stamp_path, output_versions, write_delta_stamp
+from product_ids import ProductIds
+from run_report import RunReport
 
 #CONFIG - INPUT FILES 
 input_files = {
@@ -88,8 +107,100 @@ input_files = {
     "Chettiot": "/home/anusha/Desktop/sevoo_task/servoo_task/common_files/CATALOG-CHETTIOT-csv.csv"
 }
 
+#CONFIG - OUTPUT FILE
+""" output_file: str
+        - Purpose: File path for saving the consolidated cleaned product CSV.
+        - Usage: The final DataFrame is written to this path as a CSV without index."""
+output_file = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Cleaned_Products.csv"
+
+""" output_parquet: str
+        - Purpose: Columnar copy of the consolidated products, written alongside the CSV.
+        - Typed per PARQUET_SCHEMA: Supplier / Packaging_Type dictionary-encoded, weight as
+            integer grams (Weight_Grams), Units_Per_Carton as nullable integer."""
+output_parquet = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Cleaned_Products.parquet"
+
+#CONFIG - PRODUCT IDS & DELTA
+""" Product_IDs are derived from the normalized (Supplier, Product_Name) identity and kept
+        in ID_REGISTRY, so they survive reordering and growth of the catalogs.
+    output_delta lists the rows inserted, updated or deleted since the previous run (column
+        Change, compared against the previous output_parquet); deleted rows only carry
+        their Product_ID. The JSON stamp next to it records the SHA-256 of the outputs
+        before and after the run; Sql_creation.py --delta refuses a delta whose base is
+        not what the database was loaded from. A run where nothing changed leaves the
+        delta (and its stamp) alone."""
+ID_REGISTRY = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/product_id_registry.parquet"
+output_delta = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Products_Delta.csv"
+
+PARQUET_SCHEMA = pa.schema([
+    ("Product_ID", pa.string()),
+    ("Product_Name", pa.string()),
+    ("Serial_Number", pa.string()),
+    ("Supplier", pa.dictionary(pa.int32(), pa.string())),
+    ("Weight_Grams", pa.int64()),
+    ("Packaging_Type", pa.dictionary(pa.int8(), pa.string())),
+    ("Units_Per_Carton", pa.int64()),
+])
+
+#CONFIG - STREAMING MODE
+""" Streaming mode (--streaming) reads each supplier CSV in chunks of CHUNK_SIZE rows,
+        processes and writes every chunk as it goes, and deduplicates with a compact
+        set of 64-bit key hashes, so memory is bounded by the chunk size rather than
+        by the total catalog size."""
+CHUNK_SIZE = 100_000
+
+#CONFIG - INCREMENTAL CACHE
+""" Batch and --workers runs fingerprint every input file (size, mtime, SHA-256) and
+        keep each supplier's cleaned DataFrame in CACHE_DIR, so only changed suppliers
+        are reprocessed; if nothing changed the merge is skipped. Use --no-cache to
+        force a full rebuild.
+    Extractor results per distinct normalized product name are kept in
+        CACHE_DIR/MEMO_FILENAME for every mode, so names seen in earlier runs are not
+        parsed again (--no-cache keeps the memo in memory for the current run only).
+        The stored memo keeps at most MEMO_MAX_NAMES names (least recently looked up
+        ones are dropped) and is only rewritten by runs that learned new names."""
+CACHE_DIR = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/cache"
+MEMO_FILENAME = "extraction_memo.pkl"
+MEMO_MAX_NAMES = 1_000_000
+
+""" SALT_MODULES: source files (next to this one) hashed into the cache salt. Every module
+        that shapes the cleaned rows, the memo or the Product_IDs belongs here, so editing
+        any of them invalidates cached suppliers, memo and the "nothing changed" skip.
+        run_report.py only observes the run and is left out."""
+SALT_MODULES = ["Merging_code.py", "etl_cache.py", "product_ids.py"]
+
+#CONFIG - RUN REPORT
+""" Every run writes RUN_REPORT (JSON): time, rows in / out and peak memory per stage and
+        supplier, extraction null rates, memo / delta / ID counters. Stage lines are
+        also logged. --profile DIR additionally dumps a cProfile file per stage."""
+RUN_REPORT = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/merge_run_report.json"
+
+# columns filled by the name extractors (their null rate is reported per supplier)
+EXTRACTED_COLUMNS = ['Weight_Quantity', 'Units_Per_Carton']
+
+OUTPUT_COLUMNS = ['Product_ID', 'Product_Name', 'Serial_Number', 'Supplier',
+                  'Weight_Quantity', 'Packaging_Type', 'Units_Per_Carton']
+
 # HELPER FUNCTIONS 
 
+# First occurrence of a number + unit. The lookahead allows an immediate X or digits
+# after the unit (handles "340GX24"). Compiled once, shared by both weight extractors.
+WEIGHT_PATTERN = re.compile(
+    r'(\d+(?:\.\d+)?)\s*(KG|KGS|G|GM|GR|GRAM|GRAMS|L|LTR|LITRE|ML|M L|LT)(?=[\s\*×X0-9\W]|$)',
+    flags=re.IGNORECASE
+)
+
+# WEIGHT_PATTERN for upper-cased ASCII text in pyarrow's RE2, which has no lookahead:
+# the character after the unit is consumed instead of looked at (same matches and
+# groups), and \s is spelled out as Python's ASCII whitespace (RE2 leaves out \v, \x1c-\x1f).
+WEIGHT_PATTERN_ASCII = (
+    r'(?P<value>\d+(?:\.\d+)?)[\t-\r\x1c-\x20]*'
+    r'(?P<unit>KG|KGS|G|GM|GR|GRAM|GRAMS|L|LTR|LITRE|ML|M L|LT)(?:\W|[X0-9]|$)'
+)
+
+# unit (upper case) -> grams per unit; anything else (LT) counts as grams
+UNIT_TO_GRAMS = {"KG": 1000, "KGS": 1000, "L": 1000, "LTR": 1000, "LITRE": 1000}
+
+
 def extract_weight_quantity(name: str):
     """
     Extract and standardize weight/quantity values from product names.
@@ -102,14 +213,7 @@ def extract_weight_quantity(name: str):
 
     text = str(name).upper().strip()
 
-    # Regex finds the first occurrence of a number + unit.
-    # Uses a lookahead to allow immediate X or digits after the unit (handles "340GX24").
-    weight_re = re.compile(
-        r'(\d+(?:\.\d+)?)\s*(KG|KGS|G|GM|GR|GRAM|GRAMS|L|LTR|LITRE|ML|M L|LT)(?=[\s\*×X0-9\W]|$)',
-        flags=re.IGNORECASE
-    )
-
-    match = weight_re.search(text)
+    match = WEIGHT_PATTERN.search(text)
     if not match:
         return None
 
@@ -132,6 +236,10 @@ def extract_weight_quantity(name: str):
     else:
         grams = value
 
+    # a digit run too long for a float (e.g. 400 nines) is not a weight
+    if not math.isfinite(grams):
+        return None
+
     # Return integer grams with "G"
     return f"{int(round(grams))}G"
 
@@ -152,6 +260,50 @@ def extract_weight_quantity(name: str):
                 * Volume-to-mass conversions assume water-like density (1 L ≈ 1000 g).
                 * Does not interpret compound forms beyond the first weight token."""
 
+
+def extract_weight_quantity_vectorized(names: pd.Series) -> pd.Series:
+    """
+    Column-wise equivalent of `names.apply(extract_weight_quantity)`. ASCII names
+    are searched in one pyarrow (RE2) pass with WEIGHT_PATTERN_ASCII; the few names
+    with other characters (Unicode digits / spaces / case rules) keep the row-wise
+    function, so the output is the same row for row.
+    """
+    values = np.full(len(names), None, dtype=object)
+    # str(name) of every non-missing value, like the row-wise function
+    text = pa.array(names.astype("string[pyarrow]").array)
+    is_ascii = pc.fill_null(pc.string_is_ascii(text), False).to_numpy(zero_copy_only=False)
+
+    other = np.flatnonzero(~is_ascii & ~names.isna().to_numpy())
+    values[other] = [extract_weight_quantity(v) for v in names.iloc[other]]
+
+    parts = pc.extract_regex(pc.ascii_upper(text.filter(is_ascii)), WEIGHT_PATTERN_ASCII)
+    found = parts.is_valid().to_numpy(zero_copy_only=False)
+    if not found.any():
+        return pd.Series(values.tolist(), index=names.index)
+    parts = parts.filter(found)
+    rows = np.flatnonzero(is_ascii)[found]
+
+    # float() of each number (numpy calls it on the object array): correctly rounded
+    # like the row-wise function, where to_numeric is not for 17+ digits
+    number = pc.struct_field(parts, "value").to_numpy(zero_copy_only=False).astype(object).astype(float)
+    factor = pd.Series(pc.struct_field(parts, "unit").to_numpy(zero_copy_only=False)).map(UNIT_TO_GRAMS).fillna(1)
+    grams = pd.Series(np.round(number * factor.to_numpy(dtype=float)), index=rows)
+
+    # a digit run too long for a float (inf) is not a weight
+    grams = grams[np.isfinite(grams)]
+    fits = grams.abs() < 2 ** 63
+    # whole floats below 2**63 convert to int64 exactly; larger ones go through Python ints
+    labels = pd.concat([grams[fits].astype(np.int64).astype(str),
+                        grams[~fits].map(lambda g: str(int(g)))])
+    values[labels.index.to_numpy()] = (labels + "G").tolist()
+    return pd.Series(values.tolist(), index=names.index)
+
+"""extract_weight_quantity_vectorized(names: pd.Series) -> pd.Series
+        - Purpose: Same output as extract_weight_quantity row by row, without a Python
+            call per name.
+        - Golden-checked against the row-wise function on all catalog rows by
+            Extraction_benchmark.py."""
+
 #  UNITS PER CARTON EXTRACTION 
 def extract_units_per_carton(name: str):
     """
@@ -190,7 +342,7 @@ def extract_units_per_carton(name: str):
     x_numbers = re.findall(r'(\d+)\s*[X×]\s*(?=\d+)', name)
     if len(x_numbers) >= 2:
         nums = list(map(int, x_numbers))
-        return int(np.prod(nums))
+        return math.prod(nums)
     elif len(x_numbers) == 1:
         return int(x_numbers[0])
 
@@ -233,6 +385,84 @@ def extract_units_per_carton(name: str):
                 * Focuses on common commercial formatting but is not exhaustive."""
 
 
+# The cases of extract_units_per_carton, in the same priority order, for upper-cased
+# ASCII text in pyarrow's RE2: (case, pattern, how to turn the groups into a count).
+# \s is spelled out as Python's ASCII whitespace (RE2 leaves out \v, \x1c-\x1f), the
+# lookahead of multi_x consumes its digit instead, and × is left out: names holding
+# it are not ASCII and keep the row-wise function.
+_WS = r'[\t-\r\x1c-\x20]*'
+UNITS_CASCADE = [
+    ("pcs",         rf'(?P<a>\d+){_WS}(?:PCS|PC|PS)\b',                                     "first"),
+    ("bracket",     rf'\({_WS}[\d\.]+{_WS}(?:ML|L|G|KG)?{_WS}[*X]{_WS}(?P<a>\d+){_WS}\)',  "first"),
+    ("before_unit", rf'(?P<a>\d+){_WS}[*X]{_WS}[\d\.]+{_WS}(?:ML|L|LTR|G|KG|MIL|OZ)',        "first"),
+    ("multi_x",     rf'(?P<a>\d+){_WS}X{_WS}\d',                                            "product"),
+    ("single_x",    rf'\b(?P<a>\d+){_WS}X{_WS}\d*{_WS}(?:KG|G|GM|L|ML)\b',                  "first"),
+    ("bags",        rf'\b(?P<a>\d+){_WS}(?:BAG|BAGS|TEABAG|TEABAGS|TEA BAGS|STICKS)\b',     "first"),
+    ("plus",        rf'(?P<a>\d+){_WS}\+{_WS}(?P<b>\d+)',                                   "sum"),
+    ("fallback",    rf'[*X]{_WS}(?P<a>\d+)',                                                 "first"),
+]
+
+# every "<n> X" followed by a digit (case 4 of extract_units_per_carton)
+MULTI_X_PATTERN = re.compile(r'(\d+)\s*[X×]\s*(?=\d+)')
+
+
+def extract_units_per_carton_vectorized(names: pd.Series) -> pd.Series:
+    """
+    Column-wise equivalent of `names.apply(extract_units_per_carton)` as nullable
+    Int64, with counts outside the int64 range as NA. ASCII names go through
+    UNITS_CASCADE in pyarrow, one extract_regex per case over the rows no earlier
+    case resolved; other names keep the row-wise function.
+    """
+    counts = pd.arrays.IntegerArray(np.zeros(len(names), dtype=np.int64), np.ones(len(names), dtype=bool))
+    # only str values are names (missing, numbers etc. give NA like the row-wise function);
+    # a string column needs no per-value type check
+    if pd.api.types.infer_dtype(names, skipna=True) == "string":
+        is_str = names.notna().to_numpy()
+    else:
+        is_str = np.array([isinstance(v, str) for v in names], dtype=bool)
+    text = pa.array(names.where(is_str).astype("string[pyarrow]").array)
+    is_ascii = pc.fill_null(pc.string_is_ascii(text), False).to_numpy(zero_copy_only=False)
+
+    other = np.flatnonzero(is_str & ~is_ascii)
+    if len(other):
+        found = [extract_units_per_carton(v) for v in names.iloc[other]]
+        counts[other] = nullable_int64(pd.Series(found, dtype=object)).array
+
+    rows = np.flatnonzero(is_ascii)
+    pending = pc.ascii_upper(text.filter(is_ascii))
+    for _, pattern, combine in UNITS_CASCADE:
+        if not len(rows):
+            break
+        parts = pc.extract_regex(pending, pattern)
+        found = parts.is_valid().to_numpy(zero_copy_only=False)
+        if not found.any():
+            continue
+        parts = parts.filter(found)
+        if combine == "product":
+            # 1 hit -> n, 2+ hits -> product of all; only the rows this case resolves
+            # are searched again with every hit, the products as exact Python ints
+            products = [math.prod(map(int, MULTI_X_PATTERN.findall(t)))
+                        for t in pending.filter(found).to_pylist()]
+            value = nullable_int64(pd.Series(products, dtype=object))
+        else:
+            value = nullable_int64(pc.struct_field(parts, "a").to_pandas())
+            if combine == "sum":
+                other_value = nullable_int64(pc.struct_field(parts, "b").to_pandas())
+                # a sum beyond int64 is NA rather than a wrapped value
+                value = value.where(~(value > INT64_MAX - other_value).fillna(False)) + other_value
+        counts[rows[found]] = value.array
+        rows, pending = rows[~found], pending.filter(~found)
+
+    return pd.Series(counts, index=names.index)
+
+"""extract_units_per_carton_vectorized(names: pd.Series) -> pd.Series
+        - Purpose: Same counts as extract_units_per_carton row by row (NA for counts
+            beyond int64), resolving the cascade case by case over shrinking subsets
+            instead of per row.
+        - Golden-checked against the row-wise function on all catalog rows by
+            Extraction_benchmark.py."""
+
+
 #  PACKAGING TYPE DETECTION 
 def detect_packaging_type(name: str):
     """
@@ -259,6 +489,63 @@ def detect_packaging_type(name: str):
             an explicit 'Unit' column for Amal Trading)."""
 
 
+def extract_features(names: pd.Series) -> pd.DataFrame:
+    """All three name-derived columns for `names`, index preserved."""
+    return pd.DataFrame({
+        'Weight_Quantity': extract_weight_quantity_vectorized(names),
+        'Units_Per_Carton': extract_units_per_carton_vectorized(names),
+        'Packaging_Type': names.apply(detect_packaging_type),
+    }, index=names.index)
+
+
+def extract_on_pool(pool, chunk_size: int, names: pd.Series) -> pd.DataFrame:
+    """extract_features with slices of at most chunk_size names spread over `pool`."""
+    slices = [names.iloc[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+    if len(slices) <= 1:
+        return extract_features(names)
+    return pd.concat(pool.map(extract_features, slices))
+
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _exact_int64(text: str):
+    """int(text) when it is an integer inside the int64 range, else None."""
+    try:
+        value = int(text)
+    except ValueError:
+        return None
+    return value if INT64_MIN <= value <= INT64_MAX else None
+
+
+def nullable_int64(values: pd.Series) -> pd.Series:
+    """
+    `values` (ints, floats or numeric text) as nullable Int64: NA when missing, not a
+    whole number, or outside the int64 range, instead of an OverflowError or a
+    wrapped value.
+    """
+    if pd.api.types.is_bool_dtype(values.dtype) or not pd.api.types.is_numeric_dtype(values.dtype):
+        text = values.astype("string").str.strip()
+        # up to 18 characters there are at most 18 digits, which always fit int64;
+        # longer text is rare and converted exactly through Python ints
+        short = text.str.len().fillna(0).to_numpy() <= 18
+        numbers = pd.to_numeric(text.where(short), errors="coerce", dtype_backend="numpy_nullable")
+        result = nullable_int64(numbers)
+        long = ~short
+        if long.any():
+            exact = [_exact_int64(v) for v in text[long]]
+            result[long] = pd.arrays.IntegerArray(np.array([v or 0 for v in exact], dtype=np.int64),
+                                                  np.array([v is None for v in exact]))
+        return result
+    # nullable copies, so masking keeps the other values exact
+    if pd.api.types.is_float_dtype(values.dtype):
+        numbers = values.astype("Float64")
+        numbers = numbers.where(numbers % 1 == 0)
+    else:
+        numbers = values.astype("UInt64" if pd.api.types.is_unsigned_integer_dtype(values.dtype) else "Int64")
+    return numbers.where((numbers >= INT64_MIN) & (numbers <= INT64_MAX)).astype("Int64")
+
+
 #  COLUMN STANDARDIZATION FUNCTION 
 def standardize_columns(df: pd.DataFrame, supplier_name: str):
     """Standardize inconsistent column names."""
@@ -292,18 +579,8 @@ standardize_columns(df: pandas.DataFrame, supplier_name: str) -> pandas.DataFram
 
 
 #  MAIN ETL PIPELINE 
-all_data = []
-
-
-# PROCESS EACH INPUT FILE
-for supplier, file_path in input_files.items():
-    if not os.path.exists(file_path):
-        print(f"⚠️ File not found: {file_path}")
-        continue
-
-    print(f"📥 Processing {supplier} ...")
-    df = pd.read_csv(file_path)
-
+def process_supplier(supplier: str, df: pd.DataFrame, memo: NameMemo = None) -> pd.DataFrame:
+    """Standardize one supplier's DataFrame and extract the packaging features."""
     # Standardize columns
     df = standardize_columns(df, supplier)
 
@@ -312,48 +589,393 @@ for supplier, file_path in input_files.items():
         if col not in df.columns:
             df[col] = None
 
-    # Feature extraction
-    df['Weight_Quantity'] = df['Product_Name'].apply(extract_weight_quantity)
-    df['Units_Per_Carton'] = df['Product_Name'].apply(extract_units_per_carton)
+    # Feature extraction, once per distinct name
+    memo = memo if memo is not None else NameMemo(extract_features)
+    features = memo.lookup(df['Product_Name'])
+    df['Weight_Quantity'] = features['Weight_Quantity']
+    # nullable integer, so the CSV gets "12" or an empty field, never "12.0";
+    # counts beyond int64 (long digit runs in a name) are already NULL
+    df['Units_Per_Carton'] = features['Units_Per_Carton'].astype("Int64").array
      # 🔹 CHANGE #1: Packaging_Type handling
     if supplier == "Amal Trading" and 'Unit' in df.columns:
         # Directly use the 'Unit' column for packaging type
         df['Packaging_Type'] = df['Unit'].apply(lambda x: "CTN" if str(x).strip().upper() == "CTN" else "NON-CTN")
     else:
         # For all others, detect from product name
-        df['Packaging_Type'] = df['Product_Name'].apply(detect_packaging_type)
+        df['Packaging_Type'] = features['Packaging_Type']
 
     # Keep only needed columns for now
-    df_clean = df[['Product_Name', 'Serial_Number', 'Supplier',
-                   'Weight_Quantity', 'Packaging_Type', 'Units_Per_Carton']]
-    all_data.append(df_clean)
+    return df[['Product_Name', 'Serial_Number', 'Supplier',
+               'Weight_Quantity', 'Packaging_Type', 'Units_Per_Carton']]
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Typed Arrow table (PARQUET_SCHEMA) for a frame with OUTPUT_COLUMNS."""
+    weight = df['Weight_Quantity'].astype("string").str.removesuffix("G")
+    serial = df['Serial_Number'].astype("string")
+    columns = {
+        'Product_ID': df['Product_ID'].astype("string"),
+        'Product_Name': df['Product_Name'].astype("string"),
+        # serials parsed as floats because of gaps ("12.0") are stored as "12"
+        'Serial_Number': serial.str.replace(r'\.0$', '', regex=True),
+        'Supplier': df['Supplier'].astype("string"),
+        # out-of-range grams / units become NULL rather than a wrapped int64
+        'Weight_Grams': nullable_int64(weight),
+        'Packaging_Type': df['Packaging_Type'].astype("string"),
+        'Units_Per_Carton': nullable_int64(df['Units_Per_Carton']),
+    }
+    return pa.Table.from_pandas(pd.DataFrame(columns), schema=PARQUET_SCHEMA, preserve_index=False)
 
 
-#  COMBINE ALL FILES 
-"""Concatenate all supplier DataFrames, deduplicate, reset index"""
-final_df = pd.concat(all_data, ignore_index=True)
-final_df.drop_duplicates(subset=['Product_Name', 'Supplier'], inplace=True)
-final_df.reset_index(drop=True, inplace=True)
+def row_hashes(table: pa.Table) -> pd.Series:
+    """uint64 hash of every non-ID column per row, indexed by Product_ID."""
+    df = table.to_pandas()
+    content = df.drop(columns='Product_ID').astype("string")
+    return pd.Series(pd.util.hash_pandas_object(content, index=False).to_numpy(),
+                     index=pd.Index(df['Product_ID'].astype(object)))
 
 
-#  ADD GLOBAL UNIQUE PRODUCT IDs 
-"""Assign unique Product_IDs in the form "product_<n>"."""
-final_df['Product_ID'] = [f"product_{i+1}" for i in range(len(final_df))]
+class DeltaWriter:
+    """
+    Writes output_delta: rows of this run that are new ("insert") or whose content
+    changed ("update") since the previous output_parquet, then the Product_IDs that
+    disappeared ("delete"). Must be created before output_parquet and output_file are
+    overwritten; add() can be called once per chunk, close() once both are written.
+    """
 
-# Reorder columns
-final_df = final_df[['Product_ID', 'Product_Name', 'Serial_Number', 'Supplier',
-                     'Weight_Quantity', 'Packaging_Type', 'Units_Per_Carton']]
+    def __init__(self):
+        # versions of the previous outputs, which this delta applies on top of
+        self.base = output_versions(output_parquet, output_file)
+        if os.path.exists(output_parquet):
+            self.previous = row_hashes(pq.read_table(output_parquet))
+        else:
+            self.previous = pd.Series(dtype=np.uint64, index=pd.Index([], dtype=object))
+        self._seen = np.zeros(len(self.previous), dtype=bool)
+        self.counts = {"insert": 0, "update": 0, "delete": 0}
+        self._tmp_path = output_delta + ".tmp"
+        self._file = open(self._tmp_path, "w", newline="", encoding="utf-8")
+        pd.DataFrame(columns=['Change'] + OUTPUT_COLUMNS).to_csv(self._file, index=False)
+
+    def add(self, df: pd.DataFrame):
+        hashes = row_hashes(to_arrow(df)).to_numpy()
+        pos = self.previous.index.get_indexer(df['Product_ID'])
+        known = pos >= 0
+        self._seen[pos[known]] = True
+        old = np.zeros(len(df), dtype=np.uint64)
+        old[known] = self.previous.to_numpy()[pos[known]]
+        change = np.where(~known, "insert", np.where(old != hashes, "update", ""))
+        changed = df.loc[change != "", OUTPUT_COLUMNS]
+        changed.insert(0, 'Change', change[change != ""])
+        changed.to_csv(self._file, index=False, header=False)
+        for kind in ("insert", "update"):
+            self.counts[kind] += int((change == kind).sum())
+
+    def close(self):
+        deleted = self.previous.index[~self._seen]
+        pd.DataFrame({'Change': "delete", 'Product_ID': deleted}) \
+            .reindex(columns=['Change'] + OUTPUT_COLUMNS) \
+            .to_csv(self._file, index=False, header=False)
+        self.counts["delete"] = len(deleted)
+        self._file.close()
+        # the old stamp goes first: a delta without a stamp is refused, never misapplied
+        if os.path.exists(delta_stamp_path(output_delta)):
+            os.remove(delta_stamp_path(output_delta))
+        os.replace(self._tmp_path, output_delta)
+        write_delta_stamp(output_delta, self.base, output_versions(output_parquet, output_file))
+
+    def summary(self) -> str:
+        return (f"Delta since previous run: {self.counts['insert']:,} inserted, "
+                f"{self.counts['update']:,} updated, {self.counts['delete']:,} deleted")
+
+
+class SeenKeys:
+    """
+    Incremental (Product_Name, Supplier) dedup for streaming mode.
+    Keys are stored as uint64 pandas hashes (8 bytes per product instead of the
+    strings), in a few sorted runs: every chunk adds a run, and runs are merged
+    while the newest is at least as large as the one before it, so each hash is
+    merged O(log N) times and there are O(log N) runs to search. (One sorted array
+    re-merged with every chunk would copy the whole seen set per chunk.)
+    A 64-bit collision would drop a distinct product; at 10M products the odds
+    are about 3 in a million.
+    """
 
-#  SAVE OUTPUT 
-""" output_file: str
-        - Purpose: File path for saving the consolidated cleaned product CSV.
-        - Usage: The final DataFrame is written to this path as a CSV without index."""
-output_file = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Cleaned_Products.csv"
-final_df.to_csv(output_file, index=False)
-print(f"\n✅ Consolidated file saved as: {output_file}")
+    def __init__(self):
+        self._runs = []   # sorted uint64 arrays, sizes decreasing
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def _seen(self, hashes: np.ndarray) -> np.ndarray:
+        # sorted lookups walk every run front to back instead of jumping around it
+        order = np.argsort(hashes)
+        needles = hashes[order]
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            pos = np.minimum(np.searchsorted(run, needles), len(run) - 1)
+            found |= run[pos] == needles
+        seen = np.empty_like(found)
+        seen[order] = found
+        return seen
+
+    def _add(self, hashes: np.ndarray):
+        run = np.sort(hashes)
+        while self._runs and len(self._runs[-1]) <= len(run):
+            run = np.concatenate([self._runs.pop(), run])
+            run.sort(kind="stable")   # two sorted halves: timsort merges them in linear time
+        self._runs.append(run)
+
+    def filter_new(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of `df` whose key was not seen before (first occurrence wins), recording them as seen."""
+        keys = pd.DataFrame({
+            'Product_Name': df['Product_Name'].astype(object),
+            'Supplier': df['Supplier'].astype(object),
+        })
+        hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+        first_in_chunk = ~pd.Series(hashes).duplicated().to_numpy()
+        keep = first_in_chunk & ~self._seen(hashes)
+        if keep.any():
+            self._add(hashes[keep])
+        return df[keep]
+
+
+def combine_and_save(all_data, ids: ProductIds = None, report: RunReport = None) -> pd.DataFrame:
+    #  COMBINE ALL FILES 
+    """Concatenate all supplier DataFrames, deduplicate, reset index"""
+    report = report if report is not None else RunReport()
+    with report.stage("dedup") as st:
+        final_df = pd.concat(all_data, ignore_index=True)
+        st["rows_in"] = len(final_df)
+        final_df.drop_duplicates(subset=['Product_Name', 'Supplier'], inplace=True)
+        final_df.reset_index(drop=True, inplace=True)
+        st["rows_out"] = len(final_df)
+
+
+    #  ADD GLOBAL UNIQUE PRODUCT IDs 
+    """Assign stable Product_IDs in the form "product_<hash>"."""
+    ids = ids if ids is not None else ProductIds()
+    with report.stage("assign_ids", rows_in=len(final_df)) as st:
+        final_df['Product_ID'] = ids.assign(final_df)
+        st["rows_out"] = len(final_df)
+
+    # Reorder columns
+    final_df = final_df[OUTPUT_COLUMNS]
+
+    #  SAVE OUTPUT 
+    with report.stage("write", rows_in=len(final_df)) as st:
+        delta = DeltaWriter()
+        delta.add(final_df)
+        final_df.to_csv(output_file, index=False)
+        pq.write_table(to_arrow(final_df), output_parquet, compression="zstd")
+        delta.close()
+        st["rows_out"] = len(final_df)
+    report.counters["delta"] = delta.counts
+    print(f"🔁 {delta.summary()}")
+    return final_df
+
+
+def plan_suppliers(cache, report: RunReport = None):
+    """(supplier -> path for files that exist, set of suppliers whose cached intermediate is still valid)."""
+    available, fresh = {}, set()
+    with (report if report is not None else RunReport()).stage("plan") as st:
+        for supplier, file_path in input_files.items():
+            if not os.path.exists(file_path):
+                print(f"⚠️ File not found: {file_path}")
+                continue
+            available[supplier] = file_path
+            if cache is not None and cache.is_fresh(supplier, file_path):
+                fresh.add(supplier)
+        st["rows_out"] = len(available)
+    return available, fresh
+
+
+def outputs_current(cache) -> bool:
+    return cache is not None and cache.output_is_current(output_file) and os.path.exists(output_parquet)
+
+
+def load_supplier(supplier, file_path, fresh, cache, memo, report) -> pd.DataFrame:
+    """Cleaned frame of one supplier: from the cache when fresh, else read and processed."""
+    if supplier in fresh:
+        print(f"♻️ {supplier} unchanged, using cached intermediate")
+        with report.stage("cache_load", supplier) as st:
+            clean = cache.load(supplier)
+            st["rows_out"] = len(clean)
+        return clean
+
+    with report.stage("read", supplier) as st:
+        df = pd.read_csv(file_path)
+        st["rows_out"] = len(df)
+    print(f"📥 Processing {supplier} ({len(df):,} rows) ...")
+    with report.stage("extract", supplier, rows_in=len(df)) as st:
+        clean = process_supplier(supplier, df, memo)
+        st["rows_out"] = len(clean)
+    report.record_extraction(supplier, clean, EXTRACTED_COLUMNS)
+    if cache is not None:
+        with report.stage("cache_store", supplier, rows_in=len(clean)):
+            cache.store(supplier, clean)
+    return clean
+
+
+def finish(all_data, cache, ids, report) -> pd.DataFrame:
+    final_df = combine_and_save(all_data, ids, report)
+    if cache is not None:
+        cache.commit(output_file)
+    return final_df
+
+
+def run_batch(cache=None, memo=None, ids=None, report=None):
+    """Serial run. Returns the final DataFrame, or None if the cache shows nothing changed."""
+    report = report if report is not None else RunReport()
+    available, fresh = plan_suppliers(cache, report)
+    if outputs_current(cache):
+        return None
+
+    # PROCESS EACH INPUT FILE
+    all_data = [load_supplier(supplier, file_path, fresh, cache, memo, report)
+                for supplier, file_path in available.items()]
+    return finish(all_data, cache, ids, report)
 
 
-#  SUMMARY 
-print("\n📊 Sample Output:")
-print(final_df.head(10))
-print(f"\n🧾 Total Cleaned Products: {len(final_df)}")
\ No newline at end of file
+def run_parallel(workers: int, chunk_size: int = CHUNK_SIZE, cache=None, memo=None, ids=None, report=None):
+    """
+    run_batch with extraction spread over a process pool. Suppliers are processed
+    whole and in order, exactly as in run_batch; only the names the memo has not
+    seen yet are extracted, in slices of at most chunk_size names per task, so the
+    output is identical to the serial run.
+    """
+    report = report if report is not None else RunReport()
+    available, fresh = plan_suppliers(cache, report)
+    if outputs_current(cache):
+        return None
+    memo = memo if memo is not None else NameMemo(extract_features)
+    serial_extract = memo.extract
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        memo.extract = partial(extract_on_pool, pool, chunk_size)
+        try:
+            all_data = [load_supplier(supplier, file_path, fresh, cache, memo, report)
+                        for supplier, file_path in available.items()]
+        finally:
+            memo.extract = serial_extract
+    return finish(all_data, cache, ids, report)
+
+
+def run_streaming(chunk_size: int = CHUNK_SIZE, memo=None, ids=None, report=None) -> pd.DataFrame:
+    """
+    Chunked version of run_batch. Rows are processed, deduplicated and appended to
+    output_file chunk by chunk; IDs and row order match the batch run. Source
+    columns are read as text, so serial numbers keep their original formatting
+    even when a file has gaps. Returns the first written chunk for the sample
+    printout.
+    """
+    report = report if report is not None else RunReport()
+    seen = SeenKeys()
+    memo = memo if memo is not None else NameMemo(extract_features)
+    ids = ids if ids is not None else ProductIds()
+    delta = DeltaWriter()
+    rows_written = 0
+    sample = None
+    # schema of an empty frame carries the pandas metadata, so readers get the same dtypes as in batch mode
+    parquet_schema = to_arrow(pd.DataFrame(columns=OUTPUT_COLUMNS)).schema
+    with open(output_file, "w", newline="", encoding="utf-8") as out, \
+            pq.ParquetWriter(output_parquet, parquet_schema, compression="zstd") as parquet_out:
+        for supplier, file_path in input_files.items():
+            if not os.path.exists(file_path):
+                print(f"⚠️ File not found: {file_path}")
+                continue
+
+            print(f"📥 Streaming {supplier} in chunks of {chunk_size:,} ...")
+            chunks = pd.read_csv(file_path, chunksize=chunk_size, dtype=str)
+            for chunk in report.timed_chunks(chunks, "read", supplier):
+                with report.stage("extract", supplier, rows_in=len(chunk)) as st:
+                    clean = process_supplier(supplier, chunk, memo)
+                    st["rows_out"] = len(clean)
+                report.record_extraction(supplier, clean, EXTRACTED_COLUMNS)
+                with report.stage("dedup", supplier, rows_in=len(clean)) as st:
+                    df = seen.filter_new(clean).copy()
+                    st["rows_out"] = len(df)
+                with report.stage("assign_ids", supplier, rows_in=len(df)) as st:
+                    df['Product_ID'] = ids.assign(df)
+                    st["rows_out"] = len(df)
+                with report.stage("write", supplier, rows_in=len(df)) as st:
+                    delta.add(df[OUTPUT_COLUMNS])
+                    df[OUTPUT_COLUMNS].to_csv(out, index=False, header=sample is None)
+                    parquet_out.write_table(to_arrow(df[OUTPUT_COLUMNS]))
+                    st["rows_out"] = len(df)
+                rows_written += len(df)
+                if sample is None:
+                    sample = df[OUTPUT_COLUMNS].head(10)
+    delta.close()
+    report.counters["delta"] = delta.counts
+    print(f"🔁 {delta.summary()}")
+    print(f"🧾 Rows written: {rows_written}")
+    return sample if sample is not None else pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge supplier catalogs into one cleaned product file.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--streaming", action="store_true",
+                      help="process each CSV in chunks and write output incrementally")
+    mode.add_argument("--workers", type=int, default=0,
+                      help="process suppliers / chunks on a pool of N processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="rows per chunk in --streaming and --workers modes")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore cached per-supplier intermediates and rebuild everything")
+    parser.add_argument("--report", default=RUN_REPORT,
+                        help="where to write the JSON run report")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="run every stage under cProfile and dump one .prof file per stage into DIR")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler()]
+    )
+    mode_name = "streaming" if args.streaming else "parallel" if args.workers > 0 else "batch"
+    report = RunReport(args.profile, mode=mode_name, workers=args.workers, chunk_size=args.chunk_size,
+                       cache=not args.no_cache)
+
+    if args.no_cache:
+        cache, memo = None, NameMemo(extract_features)
+    else:
+        code_dir = os.path.dirname(os.path.abspath(__file__))
+        salt = code_salt(*(os.path.join(code_dir, name) for name in SALT_MODULES))
+        cache = SupplierCache(CACHE_DIR, salt)
+        memo = NameMemo(extract_features, os.path.join(CACHE_DIR, MEMO_FILENAME), salt, MEMO_MAX_NAMES)
+    ids = ProductIds(ID_REGISTRY)
+    if args.streaming:
+        final_df = run_streaming(args.chunk_size, memo, ids, report)
+    elif args.workers > 0:
+        final_df = run_parallel(args.workers, args.chunk_size, cache, memo, ids, report)
+    else:
+        final_df = run_batch(cache, memo, ids, report)
+    memo.save()
+    ids.save()
+    report.counters["memo"] = {"rows": memo.rows, "distinct_names": memo.names, "name_hits": memo.name_hits,
+                               "extracted": memo.extracted, "stored_from_earlier_runs": memo.persisted,
+                               "evicted": memo.evicted}
+    report.counters["ids"] = {"added": ids.added, "collisions": ids.collisions}
+    report.counters["up_to_date"] = final_df is None
+    report.save(args.report)
+    if final_df is None:
+        print(f"\n✅ No input changed since the last run, {output_file} and {output_delta} are up to date")
+        return
+    print(f"\n✅ Consolidated file saved as: {output_file}")
+    print(f"✅ Columnar copy saved as: {output_parquet}")
+    print(f"✅ Changed rows saved as: {output_delta}")
+    print(f"✅ Run report saved as: {args.report}")
+
+
+    #  SUMMARY 
+    print("\n📊 Sample Output:")
+    print(final_df.head(10))
+    if not args.streaming:
+        print(f"\n🧾 Total Cleaned Products: {len(final_df)}")
+    print(f"🧠 {memo.summary()}")
+    print(f"🆔 New Product_IDs registered: {ids.added:,} ({ids.collisions} hash collisions resolved)")
+
+
+if __name__ == "__main__":
+    main()
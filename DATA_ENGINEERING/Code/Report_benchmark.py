@@ -0,0 +1,165 @@
+"""
+TYPED COLUMN REPORT BENCHMARK
+-----------------------------
+Compares report aggregations over the old text columns with the same
+aggregations over the typed columns Sql_creation.py now writes.
+
+- text layout: Weight_Quantity "400G" / "N/A" and Units_Per_Carton "12" / "N/A",
+  as loaded by the old to_sql load from the cleaned CSV
+- typed layout: Weight_Grams and Units_Per_Carton INTEGER, NULL when unknown
+
+Both layouts get the same synthetic products (one SQLite file each, with the
+covering index of report_queries.py) and run:
+
+1. Total units available: the old CAST / NOT IN ('N/A', ...) query against the
+   current report query from report_queries.py.
+2. Total weight per packaging type: REPLACE + CAST of "400G" against SUM(Weight_Grams).
+
+Each query must give the same result on both layouts (exit code 1 otherwise); the
+best of REPEATS runs is reported.
+
+Usage
+-----
+    python Report_benchmark.py
+    python Report_benchmark.py --sizes 100000,1000000,10000000 --workdir /tmp
+"""
+
+# IMPORTS
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from report_queries import QUERIES, TABLE_NAME
+from sqlite_connect import connect
+
+# CONFIG
+DEFAULT_SIZES = "100000,1000000"
+REPEATS = 3
+SEED = 42
+UNITS = [6, 12, 24, 30, 48]
+GRAMS = [35, 100, 150, 250, 400, 500, 1000, 2000]
+
+# query -> (text layout SQL, typed layout SQL)
+BENCH_QUERIES = {
+    "Total units available": (f"""
+        SELECT
+            SUM(
+                CASE
+                    WHEN Packaging_Type='CTN'
+                         AND Units_Per_Carton NOT IN ('N/A', '', '0', 'NULL')
+                    THEN CAST(Units_Per_Carton AS INTEGER)
+                    ELSE 1
+                END
+            ) AS total_units
+        FROM {TABLE_NAME};
+    """, QUERIES["Total units available"]),
+
+    "Total weight per packaging type": (f"""
+        SELECT Packaging_Type, SUM(CAST(REPLACE(Weight_Quantity, 'G', '') AS INTEGER)) AS grams
+        FROM {TABLE_NAME}
+        WHERE Weight_Quantity NOT IN ('N/A', '')
+        GROUP BY Packaging_Type;
+    """, f"""
+        SELECT Packaging_Type, SUM(Weight_Grams) AS grams
+        FROM {TABLE_NAME}
+        GROUP BY Packaging_Type;
+    """),
+}
+
+# layout -> (units / weight column types, index)
+LAYOUTS = {
+    "text": ("Units_Per_Carton TEXT, Weight_Quantity TEXT",
+             f"CREATE INDEX idx_bench ON {TABLE_NAME} (Packaging_Type, Units_Per_Carton, Weight_Quantity)"),
+    "typed": ("Units_Per_Carton INTEGER, Weight_Grams INTEGER",
+              f"CREATE INDEX idx_bench ON {TABLE_NAME} (Packaging_Type, Units_Per_Carton, Weight_Grams)"),
+}
+
+
+def synthetic_columns(n: int) -> dict:
+    """
+    Packaging_Type, Units_Per_Carton and Weight_Grams arrays for n products (0 when
+    unknown). Engine_benchmark.py builds its catalogs from the same columns.
+    """
+    rng = np.random.default_rng(SEED)
+    ctn = rng.random(n) < 0.4
+    units = np.where(ctn & (rng.random(n) < 0.8), rng.choice(UNITS, n), 0)
+    grams = np.where(rng.random(n) < 0.75, rng.choice(GRAMS, n), 0)
+    return {"Packaging_Type": np.where(ctn, "CTN", "NON-CTN"), "Units_Per_Carton": units, "Weight_Grams": grams}
+
+
+def synthetic_products(n: int):
+    """Packaging type, units (None when unknown) and grams (None when unknown) for n products."""
+    columns = synthetic_columns(n)
+    return [(p, int(u) or None, int(g) or None) for p, u, g in
+            zip(columns["Packaging_Type"], columns["Units_Per_Carton"], columns["Weight_Grams"])]
+
+
+def build_db(path: str, layout: str, products):
+    columns, index = LAYOUTS[layout]
+    conn = connect(path, "bulk_load")
+    conn.execute(f"CREATE TABLE {TABLE_NAME} (Packaging_Type TEXT, {columns})")
+    if layout == "text":
+        rows = ((p, "N/A" if u is None else str(u), "N/A" if g is None else f"{g}G") for p, u, g in products)
+    else:
+        rows = iter(products)
+    with conn:
+        conn.executemany(f"INSERT INTO {TABLE_NAME} VALUES (?, ?, ?)", rows)
+        conn.execute(index)
+    return conn
+
+
+def best_of(run, repeats: int = REPEATS):
+    """Shortest time of `repeats` calls of run(), and the result of the last call."""
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def best_time(conn, sql: str):
+    seconds, result = best_of(lambda: conn.execute(sql).fetchall())
+    return seconds, sorted(result, key=str)
+
+
+def benchmark(sizes, workdir: str) -> bool:
+    ok = True
+    print(f"\n{'query':<34}{'rows':>12}{'text rows/s':>16}{'typed rows/s':>16}{'speedup':>10}")
+    for n in sizes:
+        products = synthetic_products(n)
+        conns = {}
+        for layout in LAYOUTS:
+            path = os.path.join(workdir, f"report_bench_{layout}_{n}.db")
+            if os.path.exists(path):
+                os.remove(path)
+            conns[layout] = build_db(path, layout, products)
+        for name, (text_sql, typed_sql) in BENCH_QUERIES.items():
+            t_text, r_text = best_time(conns["text"], text_sql)
+            t_typed, r_typed = best_time(conns["typed"], typed_sql)
+            print(f"{name:<34}{n:>12,}{n / t_text:>16,.0f}{n / t_typed:>16,.0f}{t_text / t_typed:>9.1f}x")
+            if r_text != r_typed:
+                print(f"   ❌ results differ: text={r_text} typed={r_typed}")
+                ok = False
+        for layout, conn in conns.items():
+            conn.close()
+            os.remove(os.path.join(workdir, f"report_bench_{layout}_{n}.db"))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated synthetic row counts")
+    parser.add_argument("--workdir", default=tempfile.gettempdir(), help="where the benchmark databases are built")
+    args = parser.parse_args()
+
+    if not benchmark([int(x) for x in args.sizes.split(",")], args.workdir):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,111 +3,92 @@ STEP 4: SQL ANALYSIS & REPORTING
 ---------------------------------
 Performs analysis on Servoo master product database and saves results
 to both a CSV file and a new database table.
+
+Each run is appended to the report history (report_store.py): a row in
+report_runs plus one analysis_report row per query with its Run_ID, the result
+as JSON and, for single-value results, the number itself. The CSV holds the
+rows of the latest run.
+
+With --engine duckdb the same queries run in DuckDB straight over the Parquet / CSV
+output of Merging_code.py given by --source (default: report_duckdb.default_source,
+needs the duckdb package); the results are identical and still saved to the history
+in DB_FILE.
 """
 
 # IMPORTS
-import sqlite3
-import pandas as pd
-from datetime import datetime
+import argparse
+
+from report_queries import TABLE_NAME, report_queries, run_report
+from report_summaries import summary_tables
+from report_store import ensure_store, save_run
+from sqlite_connect import ConnectionPool, connect
 
 #CONFIG 
 DB_FILE = "/home/anusha/Desktop/sevoo_task/servoo_task/DATA_ENGINEERING_TASK/Data/servoo_master.db"
-TABLE_NAME = "products"
 OUTPUT_CSV = "/home/anusha/Desktop/sevoo_task/servoo_task/DATA_ENGINEERING_TASK/Data/Servoo_SQL_Report.csv"
 OUTPUT_TABLE = "analysis_report"
 
-#CONNECT 
-conn = sqlite3.connect(DB_FILE)
-
-#QUERIES 
-queries = {
-    "Total number of products": f"SELECT COUNT(*) AS total_products FROM {TABLE_NAME};",
-
-    "Number of CTN vs NON-CTN products": f"""
-        SELECT Packaging_Type, COUNT(*) AS count
-        FROM {TABLE_NAME}
-        GROUP BY Packaging_Type;
-    """,
-
-    "Total units available": f"""
-        SELECT 
-            SUM(
-                CASE 
-                    WHEN Packaging_Type='CTN' 
-                         AND Units_Per_Carton NOT IN ('N/A', '', '0', 'NULL')
-                    THEN CAST(Units_Per_Carton AS INTEGER)
-                    ELSE 1
-                END
-            ) AS total_units
-        FROM {TABLE_NAME};
-    """,
-
-    "Duplicate Serial_Numbers": f"""
-        SELECT Serial_Number, COUNT(*) AS count
-        FROM {TABLE_NAME}
-        GROUP BY Serial_Number
-        HAVING COUNT(*) > 1;
-    """,
-
-    "Missing Serial_Numbers": f"""
-        SELECT COUNT(*) AS missing_serials
-        FROM {TABLE_NAME}
-        WHERE Serial_Number IS NULL OR TRIM(Serial_Number) = '';
-    """,
+parser = argparse.ArgumentParser(description="Run the Servoo report queries and save the results.")
+parser.add_argument("--engine", choices=["sqlite", "duckdb"], default="sqlite",
+                    help="answer the queries from DB_FILE, or with DuckDB over the ETL output files")
+parser.add_argument("--workers", type=int, default=1,
+                    help="run the independent report passes at once on this many read-only connections; "
+                         "only used with --no-summaries (or when the summary tables are missing), since "
+                         "the summary tables leave no passes to share (DuckDB threads with --engine duckdb)")
+parser.add_argument("--no-summaries", action="store_true",
+                    help="recompute everything from products instead of reading the summary tables")
+parser.add_argument("--db", default=DB_FILE, help="master database (default: DB_FILE)")
+parser.add_argument("--output-csv", default=OUTPUT_CSV, help="report CSV (default: OUTPUT_CSV)")
+parser.add_argument("--source", default=None,
+                    help="Parquet or CSV output of Merging_code.py read with --engine duckdb "
+                         "(default: the Parquet file in DATA_ENGINEERING/Data, else the CSV)")
+args = parser.parse_args()
+DB_FILE, OUTPUT_CSV = args.db, args.output_csv
 
-    "Supplier-wise product counts": f"""
-        SELECT Supplier, COUNT(*) AS total_products
-        FROM {TABLE_NAME}
-        GROUP BY Supplier
-        ORDER BY total_products DESC;
-    """,
-
-    "Products appearing in multiple catalogs": f"""
-        SELECT Serial_Number, COUNT(DISTINCT Supplier) AS supplier_count
-        FROM {TABLE_NAME}
-        GROUP BY Serial_Number
-        HAVING supplier_count > 1;
-    """,
-
-    "Unique products (only in one catalog)": f"""
-        SELECT COUNT(*) AS unique_products
-        FROM (
-            SELECT Serial_Number
-            FROM {TABLE_NAME}
-            GROUP BY Serial_Number
-            HAVING COUNT(DISTINCT Supplier) = 1
-        );
-    """
-}
-
-#EXECUTE & SAVE 
-results = []  # to store all results for CSV + DB
+#CONNECT 
+# write profile (WAL): the read-only worker connections and a running load work side by side
+conn = connect(DB_FILE, "write")
+# read-only connections for the report passes, opened on first use and kept for the whole run
+readers = ConnectionPool(DB_FILE, "read", args.workers)
+
+#QUERIES (shared with the query-plan check in report_queries.py) & EXECUTE
+if args.engine == "duckdb":
+    from report_duckdb import run_report_duckdb
+    queries, query_results, run_stats = run_report_duckdb(args.source,
+                                                          threads=args.workers if args.workers > 1 else None)
+else:
+    if args.source:
+        print("⚠️ --source is ignored: the sqlite engine reads the products table of --db (use it with --engine duckdb)")
+    queries = report_queries(conn)
+    # all queries are answered from the summary tables kept by Sql_creation.py, or from
+    # a few grouped passes over products when they are missing (same results)
+    summaries = None if args.no_summaries else summary_tables(conn)
+    if summaries and args.workers > 1:
+        print("⚠️ --workers is ignored: the report reads the summary tables, there are no passes to run "
+              "in parallel (use it with --no-summaries)")
+    query_results, run_stats = run_report(conn, summaries, readers)
 
 for desc, query in queries.items():
     print(f"\n🔹 {desc}")
-    df_result = pd.read_sql_query(query, conn)
+    df_result = query_results[desc]
     print(df_result.to_string(index=False))
 
-    # Convert each result to a text summary format for saving
-    summary = df_result.to_dict(orient="records")
-    results.append({
-        "Query_Description": desc,
-        "Query": query.strip(),
-        "Result": str(summary)
-    })
+#SAVE TO DATABASE (appended to the report history)
+with conn:
+    ensure_store(conn)
+    df_summary = save_run(conn, query_results, queries, run_stats)
+readers.close()
+conn.close()
 
 #SAVE TO CSV 
-df_summary = pd.DataFrame(results)
-df_summary["Generated_At"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 df_summary.to_csv(OUTPUT_CSV, index=False)
 
-#SAVE TO DATABASE 
-df_summary.to_sql(OUTPUT_TABLE, conn, if_exists="replace", index=False)
-
-conn.commit()
-conn.close()
-
 print("\n✅ Analysis complete!")
+# row counts are only known for the SQLite passes (None from DuckDB)
+scanned = "" if run_stats["rows_scanned"] is None else (
+    f": {run_stats['rows_scanned']:,} rows scanned (one scan per query: {run_stats['rows_scanned_per_query']:,})")
+print(f"⏱️ {run_stats['queries']} queries in {run_stats['seconds']:.2f}s from {run_stats['source']} "
+      f"({run_stats['passes']} passes over {TABLE_NAME}, {run_stats['workers']} connection(s)){scanned}")
 print(f"📁 CSV saved at: {OUTPUT_CSV}")
-print(f"🗃️ Results also stored in table '{OUTPUT_TABLE}' inside {DB_FILE}")
+print(f"🗃️ Results also stored in table '{OUTPUT_TABLE}' inside {DB_FILE} (run {df_summary['Run_ID'].iloc[0]})")
 
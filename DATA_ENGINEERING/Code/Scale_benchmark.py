@@ -0,0 +1,157 @@
+"""
+PIPELINE SCALE BENCHMARK
+------------------------
+Runs the whole pipeline on synthetic catalogs (catalog_generator.py) at several
+sizes and records, per stage, the wall time, rows per second and peak memory.
+
+Stages, each in its own process so its peak memory is its own:
+
+1. generate: catalog_generator.py writes the four supplier CSVs
+2. merge: Merging_code.py (batch, --no-cache; --streaming from --streaming-from
+   rows on), inputs and outputs redirected into the size's folder
+3. load: Sql_creation.py into a fresh master database (summary tables included)
+4. report: SQL Queries.py, answered from the summary tables
+5. report passes: SQL Queries.py --no-summaries, grouped passes over products
+
+Rows per second count the input rows for generate and merge and the merged
+products for load and report. Peak memory is the child's ru_maxrss (os.wait4).
+Each stage's output goes to <folder>/<stage>.log; a failing stage prints the end
+of its log and stops the benchmark with exit code 1.
+
+Usage
+-----
+    python Scale_benchmark.py
+    python Scale_benchmark.py --sizes 10000,1000000 --workdir /tmp --results scale.csv
+"""
+
+# IMPORTS
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+# CONFIG
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = "10000,1000000,10000000"
+STREAMING_FROM = 5_000_000
+LOG_TAIL = 20
+
+STAGES = ["generate", "merge", "load", "report", "report passes"]
+
+
+def peak_mb(rusage) -> float:
+    """ru_maxrss of a finished child in MB (KB on Linux, bytes on macOS, as run_report.peak_rss_mb)."""
+    return round(rusage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_stage(command, log_file: str):
+    """Run one stage to completion: (seconds, peak MB), or None when it fails."""
+    with open(log_file, "w", encoding="utf-8") as log:
+        start = time.perf_counter()
+        child = subprocess.Popen(command, cwd=CODE_DIR, stdout=log, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(child.pid, 0)
+        seconds = time.perf_counter() - start
+        child.returncode = os.waitstatus_to_exitcode(status)
+    if child.returncode != 0:
+        with open(log_file, encoding="utf-8", errors="replace") as log:
+            tail = log.readlines()[-LOG_TAIL:]
+        print(f"   ❌ exit code {child.returncode}: {' '.join(command)}\n" + "".join("      " + line for line in tail))
+        return None
+    return seconds, peak_mb(rusage)
+
+
+def merge_stage(folder: str, streaming: bool):
+    """
+    Child process of the merge stage: Merging_code.main() on the catalogs in folder,
+    with every output, the ID registry and the cache kept inside folder.
+    """
+    import Merging_code as m
+    from catalog_generator import SUPPLIERS
+
+    m.input_files = {supplier: os.path.join(folder, file_name) for supplier, (file_name, _, _) in SUPPLIERS.items()}
+    m.output_file = os.path.join(folder, "Servoo_Cleaned_Products.csv")
+    m.output_parquet = os.path.join(folder, "Servoo_Cleaned_Products.parquet")
+    m.output_delta = os.path.join(folder, "Servoo_Products_Delta.csv")
+    m.ID_REGISTRY = os.path.join(folder, "product_id_registry.parquet")
+    m.CACHE_DIR = os.path.join(folder, "cache")
+    sys.argv = ["Merging_code.py", "--no-cache", "--report", os.path.join(folder, "merge_run_report.json")]
+    if streaming:
+        sys.argv.append("--streaming")
+    m.main()
+
+
+def stage_commands(folder: str, rows: int, streaming: bool) -> dict:
+    db_file = os.path.join(folder, "servoo_master.db")
+    report = [sys.executable, "SQL Queries.py", "--db", db_file,
+              "--output-csv", os.path.join(folder, "servoo_analysis_report.csv")]
+    return {
+        "generate": [sys.executable, "catalog_generator.py", "--rows", str(rows), "--out", folder],
+        "merge": [sys.executable, os.path.abspath(__file__), "--merge-stage", folder]
+                 + (["--streaming"] if streaming else []),
+        "load": [sys.executable, "Sql_creation.py", "--db", db_file,
+                 "--parquet", os.path.join(folder, "Servoo_Cleaned_Products.parquet"),
+                 "--csv", os.path.join(folder, "Servoo_Cleaned_Products.csv"),
+                 "--clusters", os.path.join(folder, "no_clusters.csv")],
+        "report": report,
+        "report passes": report + ["--no-summaries"],
+    }
+
+
+def benchmark(sizes, workdir: str, streaming_from: int, keep: bool) -> pd.DataFrame:
+    records = []
+    print(f"\n{'rows':>12}{'stage':>16}{'seconds':>12}{'rows/s':>14}{'peak MB':>10}")
+    for n in sizes:
+        folder = tempfile.mkdtemp(prefix=f"scale_bench_{n}_", dir=workdir)
+        commands = stage_commands(folder, n, n >= streaming_from)
+        products = n
+        for stage in STAGES:
+            measured = run_stage(commands[stage], os.path.join(folder, stage.replace(" ", "_") + ".log"))
+            if measured is None:
+                print(f"   files kept in {folder}")
+                return None
+            seconds, peak = measured
+            if stage == "merge":
+                products = pq.ParquetFile(os.path.join(folder, "Servoo_Cleaned_Products.parquet")).metadata.num_rows
+            counted = n if stage in ("generate", "merge") else products
+            records.append({"rows": n, "stage": stage, "rows_counted": counted, "seconds": round(seconds, 3),
+                            "rows_per_sec": round(counted / seconds), "peak_mb": peak})
+            print(f"{n:>12,}{stage:>16}{seconds:>12.2f}{counted / seconds:>14,.0f}{peak:>10.1f}")
+        if keep:
+            print(f"   files kept in {folder}")
+        else:
+            shutil.rmtree(folder)
+    return pd.DataFrame(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated synthetic row counts")
+    parser.add_argument("--workdir", default=tempfile.gettempdir(), help="where the benchmark files are written")
+    parser.add_argument("--results", help="CSV the measurements are written to")
+    parser.add_argument("--streaming-from", type=int, default=STREAMING_FROM,
+                        help="merge with --streaming from this many rows on")
+    parser.add_argument("--keep", action="store_true", help="keep the generated files of every size")
+    parser.add_argument("--merge-stage", metavar="FOLDER", help=argparse.SUPPRESS)
+    parser.add_argument("--streaming", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.merge_stage:
+        merge_stage(args.merge_stage, args.streaming)
+        return
+
+    results = benchmark([int(x) for x in args.sizes.split(",")], args.workdir, args.streaming_from, args.keep)
+    if results is None:
+        sys.exit(1)
+    if args.results:
+        results.to_csv(args.results, index=False)
+        print(f"\n✅ Measurements saved as: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
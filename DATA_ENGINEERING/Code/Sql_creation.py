@@ -9,30 +9,112 @@ Purpose
 Load a cleaned product CSV into a SQLite "master" database table. This module
 reads a pre-cleaned CSV file into a pandas DataFrame, augments it with two
 metadata columns, enforces a specific column order, creates a SQLite table
-(if needed), and writes the DataFrame into the target database.
+(if needed), and upserts the rows into it, keeping the declared schema
+(Product_ID primary key) and any indexes on the table.
+
+Run with --delta to apply only the rows Merging_code.py reported as inserted,
+updated or deleted since its previous run (DELTA_FILE). The delta is only applied
+when it was computed against the merge output the database was last loaded from.
 
 """
 
 # IMPORTS
-import sqlite3
+import argparse
+import os
+import time
 import pandas as pd
 from datetime import datetime
 
-# CONFIG 
-CSV_FILE = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo-Product-Data-Cleaned.csv"
+from etl_cache import file_sha256, read_delta_stamp
+from Merging_code import nullable_int64
+from report_queries import create_indexes
+from report_summaries import ensure_summaries
+from sqlite_connect import connect
+
+# CONFIG
+CSV_FILE = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Cleaned_Products.csv"
+PARQUET_FILE = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Cleaned_Products.parquet"
+DELTA_FILE = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Products_Delta.csv"
 DB_FILE = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/servoo_master.db"
 TABLE_NAME = "products"
+CLUSTERS_FILE = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/Servoo_Product_Clusters.csv"
+CLUSTERS_TABLE = "product_clusters"
+LOAD_STATE_TABLE = "load_state"
+BATCH_SIZE = 50_000
+DB_PROFILE = "bulk_load"
 
 """Configuration
 -------------
-The module uses three top-level configuration constants which can be adjusted:
-- CSV_FILE: path to the cleaned CSV input file.
+The module uses the following top-level configuration constants which can be adjusted:
+- CSV_FILE: CSV output of Merging_code.py (its output_file).
+- PARQUET_FILE: typed columnar copy Merging_code.py writes next to CSV_FILE (same
+  rows). Read by default when it exists; --source parquet / csv picks one
+  explicitly. The loaded file is printed at the start of every run.
+- DELTA_FILE: rows changed since the previous merge run (Change = insert / update /
+  delete), applied instead of the full file with --delta. Its JSON stamp names the
+  merge outputs it leads from and to (SHA-256, see etl_cache.write_delta_stamp).
+- LOAD_STATE_TABLE: one row with the version (SHA-256) of the merge output the
+  products table holds, set by every load and checked against the delta stamp.
 - DB_FILE: path to the SQLite database file to create / modify.
-- TABLE_NAME: name of the target table inside the SQLite database."""
+- TABLE_NAME: name of the target table inside the SQLite database.
+- CLUSTERS_FILE / CLUSTERS_TABLE: cross-supplier duplicate clusters written by
+  Duplicate_clusters.py, and the table they are loaded into when the file exists.
+- BATCH_SIZE: rows per executemany call.
+- DB_PROFILE: connection profile of sqlite_connect.py for the load (WAL journal,
+  256 MB page cache, busy timeout)."""
+
+parser = argparse.ArgumentParser(description="Load cleaned products into the SQLite master table.")
+parser.add_argument("--delta", action="store_true",
+                    help="apply only the inserted / updated / deleted rows from DELTA_FILE")
+parser.add_argument("--db", default=DB_FILE, help="SQLite database to load (default: DB_FILE)")
+parser.add_argument("--parquet", default=PARQUET_FILE, help="Parquet input (default: PARQUET_FILE)")
+parser.add_argument("--csv", default=CSV_FILE, help="CSV input (default: CSV_FILE)")
+parser.add_argument("--source", choices=["parquet", "csv"],
+                    help="which merge output to load (default: the Parquet file when it exists, else the CSV)")
+parser.add_argument("--delta-file", default=DELTA_FILE, help="delta input for --delta (default: DELTA_FILE)")
+parser.add_argument("--clusters", default=CLUSTERS_FILE, help="clusters CSV, loaded when it exists")
+args = parser.parse_args()
+# the options default to the CONFIG paths above; other runs (e.g. Scale_benchmark.py) point elsewhere
+DB_FILE, PARQUET_FILE, CSV_FILE, DELTA_FILE, CLUSTERS_FILE = (
+    args.db, args.parquet, args.csv, args.delta_file, args.clusters)
 
-# Read cleaned CSV data
-df = pd.read_csv(CSV_FILE)
-"""1. Read the cleaned CSV file at CSV_FILE into a pandas DataFrame."""
+# Read cleaned data
+deleted_ids = []
+if args.delta:
+    stamp = read_delta_stamp(DELTA_FILE)
+    if stamp is None:
+        raise SystemExit(f"❌ {DELTA_FILE} has no version stamp; run a full load")
+    df = pd.read_csv(DELTA_FILE, dtype={"Serial_Number": str})
+    deleted_ids = df.loc[df["Change"] == "delete", "Product_ID"].tolist()
+    df = df[df["Change"] != "delete"].drop(columns="Change")
+    print(f"📥 Loading {DELTA_FILE} (delta)")
+    source, version = "delta", stamp["target"][0]
+else:
+    source = args.source or ("parquet" if os.path.exists(PARQUET_FILE) else "csv")
+    source_file = PARQUET_FILE if source == "parquet" else CSV_FILE
+    print(f"📥 Loading {source_file} ({source})")
+    df = pd.read_parquet(source_file) if source == "parquet" else pd.read_csv(source_file)
+    version = file_sha256(source_file)
+"""1. Read the cleaned data into a pandas DataFrame: the Parquet file at PARQUET_FILE
+    when present (already typed, no text parsing or type inference), otherwise the
+    CSV file at CSV_FILE, both written by the same Merging_code.py run; --source
+    forces one of them. With --delta, read DELTA_FILE instead and split it into
+    rows to upsert and Product_IDs to delete. The version of what is loaded (SHA-256
+    of the file, or the delta's target) is recorded in LOAD_STATE_TABLE. Serial_Number, Weight_Grams and
+    Units_Per_Carton are normalized so the same product gives the same values from
+    every source."""
+
+# Same text form for every source: "12" rather than "12.0" for numbers that were
+# parsed as floats because of gaps in the column
+df["Serial_Number"] = df["Serial_Number"].astype("string").str.replace(r"\.0$", "", regex=True)
+# Typed columns: integer grams and units, NULL when unknown ("N/A", "", missing) or
+# outside the int64 range (never a wrapped number)
+if "Weight_Grams" not in df.columns:
+    df["Weight_Grams"] = df["Weight_Quantity"].astype("string").str.removesuffix("G")
+df["Weight_Grams"] = nullable_int64(df["Weight_Grams"])
+df["Units_Per_Carton"] = nullable_int64(df["Units_Per_Carton"])
+# the text weight ("400G") is kept for existing readers, always derived from the grams
+df["Weight_Quantity"] = df["Weight_Grams"].astype("string") + "G"
 
 # Add additional columns
 df["Source_File"] = df.get("Supplier", "Unknown")
@@ -45,17 +127,19 @@ df["Last_Updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
 # Ensure correct column order and names
-expected_columns = [
-    "Product_ID",
-    "Product_Name",
-    "Serial_Number",
-    "Supplier",
-    "Weight_Quantity",
-    "Packaging_Type",
-    "Units_Per_Carton",
-    "Source_File",
-    "Last_Updated"
-]
+PRODUCT_COLUMNS = {
+    "Product_ID": "TEXT",
+    "Product_Name": "TEXT",
+    "Serial_Number": "TEXT",
+    "Supplier": "TEXT",
+    "Weight_Quantity": "TEXT",
+    "Weight_Grams": "INTEGER",
+    "Packaging_Type": "TEXT",
+    "Units_Per_Carton": "INTEGER",
+    "Source_File": "TEXT",
+    "Last_Updated": "TEXT"
+}
+expected_columns = list(PRODUCT_COLUMNS)
 df = df[expected_columns]
 
 """"3. Reorder/select columns to match the expected schema. The script expects the
@@ -64,16 +148,41 @@ df = df[expected_columns]
       - Product_Name
       - Serial_Number
       - Supplier
-      - Weight_Quantity
+      - Weight_Quantity (or Weight_Grams)
       - Packaging_Type
       - Units_Per_Carton
     If any of the expected columns are missing, selecting the expected order will
     raise a KeyError."""
 
 # Connect to SQLite and create table
-conn = sqlite3.connect(DB_FILE)
+conn = connect(DB_FILE, DB_PROFILE)
 cur = conn.cursor()
 
+# A delta is computed against the previous merge output; applied on top of any other
+# load (two merges without a load in between) it would miss changes
+cur.execute(f"CREATE TABLE IF NOT EXISTS {LOAD_STATE_TABLE} (Version TEXT, Source TEXT, Loaded_At TEXT)")
+loaded = cur.execute(f"SELECT Version FROM {LOAD_STATE_TABLE}").fetchone()
+loaded_version = loaded[0] if loaded else None
+if args.delta and loaded_version in stamp["target"]:
+    conn.close()
+    print(f"✅ {DELTA_FILE} is already applied to {DB_FILE}, nothing to do")
+    raise SystemExit(0)
+if args.delta and loaded_version not in stamp["base"]:
+    conn.close()
+    raise SystemExit(f"❌ {DELTA_FILE} was computed against another merge run than the one loaded into "
+                     f"{DB_FILE}; run a full load")
+
+# Tables created by the old to_sql(if_exists="replace") load have no primary key, and
+# older loads stored units as text without Weight_Grams; drop any table that differs
+# from the declared schema so it is created again (the rows are reloaded anyway).
+declared = [(name, col_type, int(name == "Product_ID")) for name, col_type in PRODUCT_COLUMNS.items()]
+existing = [(row[1], row[2].upper(), row[5]) for row in cur.execute(f"PRAGMA table_info({TABLE_NAME})")]
+if existing and existing != declared:
+    if args.delta:
+        raise SystemExit(f"❌ {TABLE_NAME} does not have the current schema yet; run a full load before --delta")
+    print(f"⚠️ {TABLE_NAME} does not match the declared schema, recreating it")
+    cur.execute(f"DROP TABLE {TABLE_NAME}")
+
 cur.execute(f"""
 CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
     Product_ID TEXT PRIMARY KEY,
@@ -81,36 +190,127 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
     Serial_Number TEXT,
     Supplier TEXT,
     Weight_Quantity TEXT,
+    Weight_Grams INTEGER,
     Packaging_Type TEXT,
-    Units_Per_Carton TEXT,
+    Units_Per_Carton INTEGER,
     Source_File TEXT,
     Last_Updated TEXT
 )
 """)
 
-"""4. Connect to a SQLite database file at DB_FILE and create the target table
-    TABLE_NAME if it does not already exist. The table schema is:
+"""4. Connect to a SQLite database file at DB_FILE with the DB_PROFILE settings and create the
+    target table TABLE_NAME if it does not already exist. A table left by earlier
+    loads with another schema (no primary key, text units) is dropped first. The
+    table schema is:
       - Product_ID TEXT PRIMARY KEY
       - Product_Name TEXT
       - Serial_Number TEXT
       - Supplier TEXT
       - Weight_Quantity TEXT
+      - Weight_Grams INTEGER (NULL when unknown)
       - Packaging_Type TEXT
-      - Units_Per_Carton TEXT
+      - Units_Per_Carton INTEGER (NULL when unknown)
       - Source_File TEXT
       - Last_Updated TEXT"""
 
 
-# Insert data into table
-df.to_sql(TABLE_NAME, conn, if_exists="replace", index=False)
+# Upsert data into table
+content_columns = expected_columns[1:-1]
+upsert_sql = f"""
+INSERT INTO {TABLE_NAME} ({", ".join(expected_columns)})
+VALUES ({", ".join("?" * len(expected_columns))})
+ON CONFLICT(Product_ID) DO UPDATE SET
+    {", ".join(f"{c} = excluded.{c}" for c in expected_columns[1:])}
+WHERE {" OR ".join(f"{TABLE_NAME}.{c} IS NOT excluded.{c}" for c in content_columns)}
+"""
+rows = df.astype(object).where(df.notna(), None)
+
+start = time.perf_counter()
+rows_before = cur.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}").fetchone()[0]
+with conn:
+    # Report summary tables follow every change through triggers; on a cold load they
+    # are built after the bulk insert instead (one grouped pass)
+    summaries_rebuilt = ensure_summaries(conn) if rows_before else False
+
+    written = 0  # rows inserted or updated (rowcount leaves out the trigger writes)
+    for offset in range(0, len(rows), BATCH_SIZE):
+        cur.executemany(upsert_sql, rows.iloc[offset:offset + BATCH_SIZE].itertuples(index=False, name=None))
+        written += cur.rowcount
+
+    if args.delta:
+        cur.executemany(f"DELETE FROM {TABLE_NAME} WHERE Product_ID = ?", [(i,) for i in deleted_ids])
+        deleted = cur.rowcount if deleted_ids else 0
+    elif rows_before:
+        # full load: drop products that are no longer in the cleaned file
+        cur.execute("CREATE TEMP TABLE loaded_ids (Product_ID TEXT PRIMARY KEY)")
+        cur.executemany("INSERT OR IGNORE INTO loaded_ids VALUES (?)", ((i,) for i in df["Product_ID"].tolist()))
+        cur.execute(f"DELETE FROM {TABLE_NAME} WHERE Product_ID NOT IN (SELECT Product_ID FROM temp.loaded_ids)")
+        deleted = cur.rowcount
+        cur.execute("DROP TABLE temp.loaded_ids")
+    else:
+        deleted = 0
+
+    # Indexes covering the report queries; built once after the first (bulk) load,
+    # then kept up to date by the upserts
+    index_start = time.perf_counter()
+    create_indexes(conn, TABLE_NAME)
+    index_seconds = time.perf_counter() - index_start
+    summaries_rebuilt = ensure_summaries(conn) or summaries_rebuilt
+    cur.execute(f"DELETE FROM {LOAD_STATE_TABLE}")
+    cur.execute(f"INSERT INTO {LOAD_STATE_TABLE} VALUES (?, ?, ?)",
+                (version, source, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+rows_after = cur.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}").fetchone()[0]
+elapsed = time.perf_counter() - start
+inserted = rows_after - rows_before + deleted
+updated = written - inserted
+
+# Load duplicate clusters (Product_ID -> Cluster_ID) when Duplicate_clusters.py has run
+# on exactly the products now in the table; clusters of an older product set are dropped
+if os.path.exists(CLUSTERS_FILE):
+    clusters = pd.read_csv(CLUSTERS_FILE, dtype={"Product_ID": str})
+    cur.execute("CREATE TEMP TABLE cluster_ids (Product_ID TEXT PRIMARY KEY)")
+    cur.executemany("INSERT OR IGNORE INTO cluster_ids VALUES (?)", ((i,) for i in clusters["Product_ID"].tolist()))
+    unknown = cur.execute(f"""SELECT COUNT(*) FROM temp.cluster_ids
+        WHERE Product_ID NOT IN (SELECT Product_ID FROM {TABLE_NAME})""").fetchone()[0]
+    unclustered = cur.execute(f"""SELECT COUNT(*) FROM {TABLE_NAME}
+        WHERE Product_ID NOT IN (SELECT Product_ID FROM temp.cluster_ids)""").fetchone()[0]
+    cur.execute("DROP TABLE temp.cluster_ids")
+    if unknown or unclustered:
+        print(f"⚠️ {CLUSTERS_FILE} is stale ({unknown:,} clustered Product_IDs not in {TABLE_NAME}, "
+              f"{unclustered:,} products without a cluster); {CLUSTERS_TABLE} not loaded, "
+              f"rerun Duplicate_clusters.py")
+        cur.execute(f"DROP TABLE IF EXISTS {CLUSTERS_TABLE}")
+    else:
+        clusters.to_sql(CLUSTERS_TABLE, conn, if_exists="replace", index=False)
+        create_indexes(conn, CLUSTERS_TABLE)
 
 
 conn.commit()
+conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
 conn.close()
 
 
-"""5. Write the DataFrame into the database table using pandas.DataFrame.to_sql with
-    if_exists="replace" and index=False.
-    Note: using "replace" will drop and recreate the table (so any prior table contents will be lost)."""
+"""5. Upsert the rows in one transaction with batched executemany calls of
+    INSERT ... ON CONFLICT(Product_ID) DO UPDATE. Rows whose content is unchanged are
+    left alone (Last_Updated only moves when something else changed). A full load
+    then deletes products missing from the input; --delta deletes the Product_IDs
+    marked "delete" instead. The table, its key and its indexes are never dropped.
+    LOAD_STATE_TABLE is set to the loaded version in the same transaction; --delta
+    refuses a delta whose stamp does not start from that version (and skips one
+    that was already applied), so a missed delta forces a full load instead of
+    silently losing its changes.
+    The indexes covering the report queries (report_queries.REPORT_INDEXES) are
+    created when missing; check their use with `python report_queries.py`.
+    The report summary tables (report_summaries.py) are updated by triggers on
+    products, or rebuilt from products when missing.
+    If CLUSTERS_FILE exists it is loaded into CLUSTERS_TABLE with to_sql (replace)
+    and its index is recreated, but only when its Product_IDs are exactly those of
+    the products table; clusters built from another product set are reported as
+    stale and CLUSTERS_TABLE is dropped, so the report never joins them."""
 
+db_mb = os.path.getsize(DB_FILE) / 1e6
 print(f"✅ Data successfully loaded into {DB_FILE} -> Table: {TABLE_NAME}")
+print(f"📊 {len(df):,} rows read ({'delta' if args.delta else 'full'} load): {inserted:,} inserted, "
+      f"{updated:,} updated, {len(df) - inserted - updated:,} unchanged, {deleted:,} deleted "
+      f"in {elapsed:.2f}s (indexes {index_seconds:.2f}s); database size {db_mb:.1f} MB")
+print(f"🧮 Report summary tables {'rebuilt from products' if summaries_rebuilt else 'kept current by triggers'}")
@@ -0,0 +1,282 @@
+"""
+SYNTHETIC SUPPLIER CATALOGS
+---------------------------
+Deterministic generator of supplier catalogs in the four column layouts
+Merging_code.py reads, to run the pipeline far beyond the ~5k real products.
+
+Layouts (file names as in Merging_code.input_files):
+- Amal Trading: SL NO, Item Name, Quantity, Unit
+- Future: SERIAL NUMBER, PRODUCT TITLE
+- Chettiot: SL NO, Item Name ("WOMEN - BLACK PEPPER POWDER - 50G")
+- Red Frozen: Serial_Number, Product_Name, Weight_Quantity, Units_Per_Carton, Packaging_Type
+
+The distributions follow the real catalogs:
+- rows per supplier (SUPPLIERS): 87% / 9% / 3.5% / 0.5%
+- amounts (AMOUNTS): 1KG, 400GM, 1LTR, 500GM, 100GM, ... spelled the way each
+  supplier writes them (GM / G / GMS, LTR / " LTR" / L)
+- share of names with an amount and with a pack notation ("12*1 LTR", "1KG*20 PKT",
+  "24X250ML", "1KG X10", "10 PCS", "100 TEABAGS"), per supplier
+- the Unit column of Amal Trading (CTN, PKT, PCS, KG, BAG, ...) and its mostly "0"
+  Quantity; the half-filled Units_Per_Carton and empty Packaging_Type of Red Frozen
+- duplicates: DUPLICATE_RATE of the rows repeat an earlier row of the same catalog,
+  and SHARED_RATE of the rows are drawn from a pool of products common to all
+  suppliers, so the same product shows up in several catalogs, spelled differently
+
+Rows are generated and written CHUNK_ROWS at a time, each chunk from its own
+seeded generator: the same seed and row count give byte-identical files, and 10M
+rows need no more memory than one chunk.
+
+Usage
+-----
+    python catalog_generator.py --rows 1000000 --out /tmp/catalogs
+    python catalog_generator.py --rows 10000 --out /tmp/catalogs --seed 7
+"""
+
+# IMPORTS
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# CONFIG
+SEED = 42
+CHUNK_ROWS = 500_000
+DUPLICATE_RATE = 0.01
+SHARED_RATE = 0.05
+
+# supplier -> (file name, columns, share of all rows)
+SUPPLIERS = {
+    "Amal Trading": ("Amal Trading - Sheet1 (2).csv", ["SL NO", "Item Name", "Quantity", "Unit"], 0.87),
+    "Future": ("CATALOG - FUTURE.csv", ["SERIAL NUMBER", "PRODUCT TITLE"], 0.09),
+    "Chettiot": ("CATALOG-CHETTIOT-csv.csv", ["SL NO", "Item Name"], 0.035),
+    "Red Frozen": ("CATALOG-RED-FROZEN.csv",
+                   ["Serial_Number", "Product_Name", "Weight_Quantity", "Units_Per_Carton", "Packaging_Type"], 0.005),
+}
+
+BRANDS = [
+    "NESCAFE", "LIPTON", "ALMARAI", "AL AIN", "PRIME", "AL KABEER", "AL AREESH", "INDIA GATE",
+    "HALDIRAM'S", "NIVEA", "AXE", "TIFFANY", "ULKER", "KITCO", "AMERICANA", "SADIA", "DOUX",
+    "LUCKY GOLD", "SUNNY", "REIHAN", "LORD CAFFE", "PRIYA", "CASPER", "BATO", "MAHRA", "ARCTIC GOLD",
+    "DESI & FRESH", "RAINBOW", "PUCK", "KDD", "MAZZA", "HEINZ", "KELLOGG'S", "NESTLE", "TANG",
+    "GALAXY", "OREO", "DETTOL", "ARIEL", "TIDE",
+]
+ITEMS = [
+    "CHICKEN NUGGETS", "CHICKEN BURGER", "BEEF BURGER", "FRENCH FRIES", "GREEN PEAS", "BASMATI RICE",
+    "BLACK TEA", "INSTANT COFFEE", "TURKISH COFFEE", "COOKING OIL", "SUNFLOWER OIL", "TOMATO KETCHUP",
+    "MAYONNAISE", "CREAM CHEESE", "EVAPORATED MILK", "CONDENSED MILK", "FULL CREAM MILK POWDER",
+    "PORTION MILK", "CHOCOLATE BISCUITS", "CREAM CRACKERS", "CORN FLAKES", "MIXED PICKLE", "MANGO PICKLE",
+    "BLACK PEPPER POWDER", "TURMERIC POWDER", "CHILLI POWDER", "CUMIN WHOLE", "ALMOND", "WALNUT", "CASHEW",
+    "DRY LEMON", "CHICKPEAS", "RED LENTILS", "BLACK EYE BEANS", "WHEAT FLOUR", "TANDOORI FLOUR", "SUGAR",
+    "IODIZED SALT", "TOMATO PASTE", "PEELED SHRIMPS", "CHICKEN SAUSAGE", "PANEER CUBES", "MINCED MOLOKHIA",
+    "DRINK POWDER", "MINERAL WATER", "ORANGE JUICE", "SOFT DRINK", "DISHWASH LIQUID", "WASHING POWDER",
+    "FACIAL TISSUE", "GARBAGE BAG", "BODY SPRAY", "SHAMPOO", "HAND WASH", "TOOTHPASTE", "PEANUT BUTTER",
+    "STRAWBERRY JAM", "HONEY", "OATS", "PASTA",
+]
+# "" keeps many names without a variant word, as in the real catalogs
+VARIANTS = [
+    "", "", "", "", "", "", "CLASSIC", "ORIGINAL", "SPICY", "GOLD", "PREMIUM", "LOW FAT", "EXTRA VIRGIN",
+    "FAMILY PACK", "JAR", "POUCH", "TIN", "ECONOMY", "FRESH", "FROZEN", "ORGANIC", "LITE", "HOT", "MILD",
+    "PLAIN", "SALTED", "UNSALTED", "CHOCOLATE", "VANILLA", "STRAWBERRY", "LEMON", "MINT", "ROSE",
+]
+
+# (value, unit kind, weight): the most frequent amounts of the real catalogs
+AMOUNTS = [
+    ("1", "KG", 350), ("400", "G", 210), ("100", "G", 190), ("1", "L", 150), ("500", "G", 130),
+    ("200", "G", 120), ("5", "KG", 105), ("50", "G", 80), ("15", "KG", 72), ("250", "ML", 65),
+    ("10", "KG", 63), ("50", "KG", 52), ("400", "ML", 40), ("200", "ML", 35), ("800", "G", 18),
+    ("300", "ML", 20), ("1.5", "L", 15), ("35", "G", 15), ("2", "KG", 12), ("150", "ML", 10),
+    ("2.5", "KG", 10), ("100", "ML", 12), ("900", "G", 8), ("340", "G", 5), ("750", "G", 6),
+]
+PACK_UNITS = [(6, 15), (10, 20), (12, 30), (20, 10), (24, 20), (30, 5), (48, 5)]
+# piece counts of the Future names without an amount ("100 TEABAGS", "25 PCS")
+COUNTS = [10, 20, 25, 50, 100]
+
+# supplier -> unit kind -> (spellings, weights)
+SPELLINGS = {
+    "Amal Trading": {"G": (["GM", "G", "GMS"], [0.80, 0.15, 0.05]), "KG": (["KG"], [1]),
+                     "ML": (["ML"], [1]), "L": (["LTR", " LTR", "L"], [0.75, 0.2, 0.05])},
+    "Future": {"G": (["G", "GM"], [0.65, 0.35]), "KG": (["KG"], [1]),
+               "ML": (["ML"], [1]), "L": ([" LTR", "LTR", "L"], [0.5, 0.2, 0.3])},
+    "Chettiot": {"G": (["G"], [1]), "KG": (["KG"], [1]), "ML": (["ML"], [1]), "L": (["L"], [1])},
+    "Red Frozen": {"G": (["G"], [1]), "KG": (["KG"], [1]), "ML": (["ML"], [1]), "L": (["L"], [1])},
+}
+
+# supplier -> share of names with an amount, share of names with a pack notation
+NAME_SHAPES = {
+    "Amal Trading": (0.69, 0.22),
+    "Future": (0.90, 0.02),
+    "Chettiot": (0.99, 0.0),
+    "Red Frozen": (1.0, 0.43),
+}
+
+# Amal Trading Unit column when the name has no pack notation (with one it is mostly CTN)
+UNITS = [("CTN", 0.09), ("PKT", 0.28), ("PCS", 0.25), ("KG", 0.13), ("BAG", 0.13), ("BTL", 0.05),
+         ("TIN", 0.04), ("JAR", 0.03)]
+
+
+def _weights(pairs):
+    values, weights = zip(*pairs)
+    weights = np.asarray(weights, dtype=float)
+    return np.asarray(values, dtype=object), weights / weights.sum()
+
+
+def _pick(rng, pairs, n: int):
+    values, p = _weights(pairs)
+    return values[rng.choice(len(values), size=n, p=p)]
+
+
+def supplier_rows(rows: int) -> dict:
+    """Rows per supplier for `rows` in total (SUPPLIERS shares, at least one each, the rest to the first)."""
+    counts = {supplier: max(1, int(rows * share)) for supplier, (_, _, share) in SUPPLIERS.items()}
+    first = next(iter(counts))
+    counts[first] += rows - sum(counts.values())
+    return counts
+
+
+def base_products(rng, n: int) -> pd.DataFrame:
+    """n random (brand, item, variant, second variant, amount, pack units) index tuples."""
+    _, amount_p = _weights([(i, w) for i, (_, _, w) in enumerate(AMOUNTS)])
+    _, pack_p = _weights(PACK_UNITS)
+    return pd.DataFrame({
+        "brand": rng.integers(len(BRANDS), size=n),
+        "item": rng.integers(len(ITEMS), size=n),
+        "variant": rng.integers(len(VARIANTS), size=n),
+        "variant2": rng.integers(len(VARIANTS), size=n),
+        "amount": rng.choice(len(AMOUNTS), size=n, p=amount_p),
+        "pack": rng.choice(len(PACK_UNITS), size=n, p=pack_p),
+    })
+
+
+def _words(base: pd.DataFrame) -> pd.Series:
+    """ "BRAND ITEM[ VARIANT][ VARIANT]" of every base product."""
+    brand = pd.Series(np.asarray(BRANDS, dtype=object)[base["brand"].to_numpy()])
+    item = pd.Series(np.asarray(ITEMS, dtype=object)[base["item"].to_numpy()])
+    return (brand + " " + item + _variants(base)).str.replace("  ", " ", regex=False)
+
+
+def _variants(base: pd.DataFrame) -> pd.Series:
+    variants = np.asarray(VARIANTS, dtype=object)
+    first = pd.Series(variants[base["variant"].to_numpy()])
+    second = pd.Series(variants[base["variant2"].to_numpy()])
+    return (" " + first + " " + second).str.rstrip()
+
+
+def _amounts(rng, supplier: str, base: pd.DataFrame) -> pd.Series:
+    """Amount of every base product, spelled the way `supplier` writes it ("400GM", "1 LTR")."""
+    values = np.asarray([value for value, _, _ in AMOUNTS], dtype=object)[base["amount"].to_numpy()]
+    kinds = np.asarray([kind for _, kind, _ in AMOUNTS], dtype=object)[base["amount"].to_numpy()]
+    spelled = np.empty(len(base), dtype=object)
+    for kind, (spellings, weights) in SPELLINGS[supplier].items():
+        rows = kinds == kind
+        spelled[rows] = _pick(rng, list(zip(spellings, weights)), int(rows.sum()))
+    return pd.Series(values) + pd.Series(spelled)
+
+
+def _pack_units(base: pd.DataFrame) -> pd.Series:
+    return pd.Series(np.asarray([units for units, _ in PACK_UNITS])[base["pack"].to_numpy()])
+
+
+def catalog_chunk(rng, supplier: str, base: pd.DataFrame, first_serial: int) -> pd.DataFrame:
+    """One chunk of `supplier`'s catalog (its own columns) for the base products."""
+    n = len(base)
+    with_amount, with_pack = NAME_SHAPES[supplier]
+    has_amount = rng.random(n) < with_amount
+    has_pack = has_amount & (rng.random(n) < with_pack / max(with_amount, 1e-9))
+    words, amount = _words(base), _amounts(rng, supplier, base)
+    units = _pack_units(base).astype(str)
+    serials = np.arange(first_serial, first_serial + n)
+
+    if supplier == "Amal Trading":
+        form = rng.integers(4, size=n)
+        packed = np.select(
+            [form == 0, form == 1, form == 2],
+            [units + "*" + amount, amount + "*" + units + " PKT", units + "X" + amount],
+            amount + " X " + units,
+        )
+        loose = np.where(rng.random(n) < 0.16, " " + units + " PCS", "")
+        name = np.where(has_pack, words + " " + packed, np.where(has_amount, words + " " + amount, words + loose))
+        unit = np.where(has_pack & (rng.random(n) < 0.9), "CTN", _pick(rng, UNITS, n))
+        quantity = np.where(rng.random(n) < 0.68, "0", rng.integers(1, 50, size=n).astype(str))
+        return pd.DataFrame({"SL NO": serials, "Item Name": name, "Quantity": quantity, "Unit": unit})
+
+    if supplier == "Future":
+        counts = pd.Series(rng.choice(COUNTS, size=n)).astype(str)
+        counted = words + " " + counts + np.where(rng.random(n) < 0.5, " TEABAGS", " PCS")
+        name = pd.Series(np.where(has_amount, words + " " + amount, counted))
+        # the real file has stray double and trailing spaces
+        noisy = rng.random(n)
+        name = name.where(noisy >= 0.05, name.str.replace(" ", "  ", n=1, regex=False))
+        name = name.where((noisy < 0.05) | (noisy >= 0.10), name + " ")
+        return pd.DataFrame({"SERIAL NUMBER": serials.astype(str), "PRODUCT TITLE": name})
+
+    if supplier == "Chettiot":
+        item = pd.Series(np.asarray(ITEMS, dtype=object)[base["item"].to_numpy()]) + _variants(base)
+        women = rng.random(n) < 0.9
+        name = np.where(women, "WOMEN - " + item + " - " + amount, words + " " + amount)
+        return pd.DataFrame({"SL NO": serials, "Item Name": name})
+
+    # Red Frozen: weight and (for some packs) units in their own columns, no packaging type
+    form = rng.integers(3, size=n)
+    pack = np.select([form == 0, form == 1], [" X" + units, "X " + units], "X" + units)
+    name = words + " " + amount + np.where(has_pack, pack, "")
+    units_column = pd.Series(_pack_units(base), dtype="Int64").where(has_pack & (rng.random(n) < 0.75))
+    return pd.DataFrame({"Serial_Number": serials, "Product_Name": name, "Weight_Quantity": amount,
+                         "Units_Per_Carton": units_column, "Packaging_Type": None})
+
+
+def _repeat_earlier_rows(rng, chunk: pd.DataFrame) -> pd.DataFrame:
+    """Overwrite DUPLICATE_RATE of the rows with an earlier row of the chunk (serial number kept)."""
+    n = len(chunk)
+    rows = np.flatnonzero(rng.random(n) < DUPLICATE_RATE)
+    rows = rows[rows > 0]
+    if len(rows):
+        sources = (rng.random(len(rows)) * rows).astype(int)
+        columns = list(chunk.columns[1:])
+        chunk.iloc[rows, 1:] = chunk.iloc[sources][columns].to_numpy()
+    return chunk
+
+
+def generate_catalogs(rows: int, out_dir: str, seed: int = SEED) -> dict:
+    """
+    Write catalogs with `rows` products in total into out_dir (one CSV per supplier,
+    named as in Merging_code.input_files): supplier -> (path, rows).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = supplier_rows(rows)
+    pool = base_products(np.random.default_rng([seed, len(SUPPLIERS)]), max(100, int(rows * SHARED_RATE) // 2))
+    written, next_serial = {}, 1
+    for index, (supplier, (file_name, columns, _)) in enumerate(SUPPLIERS.items()):
+        path = os.path.join(out_dir, file_name)
+        total = counts[supplier]
+        for chunk_index, start in enumerate(range(0, total, CHUNK_ROWS)):
+            rng = np.random.default_rng([seed, index, chunk_index])
+            n = min(CHUNK_ROWS, total - start)
+            base = base_products(rng, n)
+            shared = rng.random(n) < SHARED_RATE
+            base.loc[shared] = pool.iloc[rng.integers(len(pool), size=int(shared.sum()))].to_numpy()
+            chunk = _repeat_earlier_rows(rng, catalog_chunk(rng, supplier, base, next_serial + start))
+            chunk[columns].to_csv(path, index=False, header=chunk_index == 0, mode="w" if chunk_index == 0 else "a")
+        next_serial += total
+        written[supplier] = (path, total)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="products over all four catalogs")
+    parser.add_argument("--out", required=True, help="folder the catalog CSVs are written to")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = generate_catalogs(args.rows, args.out, args.seed)
+    elapsed = time.perf_counter() - start
+    for supplier, (path, n) in written.items():
+        print(f"📄 {supplier}: {n:,} rows -> {path}")
+    print(f"✅ {args.rows:,} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
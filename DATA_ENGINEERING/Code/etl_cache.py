@@ -0,0 +1,232 @@
+"""
+Fingerprint cache for the merge ETL (Merging_code.py).
+
+Each supplier CSV is fingerprinted by size, mtime and SHA-256 of its content. The
+cleaned per-supplier DataFrame is kept as a pickle in the cache directory, so a
+rerun only reprocesses suppliers whose fingerprint changed. The content hash is
+only recomputed when size or mtime moved, and a touched-but-identical file still
+counts as unchanged.
+
+The manifest also records a `salt` (hash of the ETL source modules, see
+Merging_code.SALT_MODULES, and the pandas version), so changing any of them
+invalidates every cached supplier, and the fingerprint of the last output file,
+so a rerun where nothing changed can skip the merge entirely.
+
+The delta of a merge run (Merging_code.DeltaWriter) is stamped with the SHA-256
+of the outputs it leads from and to (`write_delta_stamp`), so Sql_creation.py
+--delta only applies it on top of the load it was computed against.
+
+`NameMemo` keeps the extractor results per distinct normalized product name, so
+names repeated within or across catalogs (and across runs, when persisted) are
+only parsed once.
+"""
+
+# IMPORTS
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def delta_stamp_path(delta_file: str) -> str:
+    """The JSON stamp written next to a delta CSV."""
+    return os.path.splitext(delta_file)[0] + ".json"
+
+
+def output_versions(*paths: str) -> list:
+    """SHA-256 of each of `paths` that exists (the versions of a merge run's outputs)."""
+    return [file_sha256(path) for path in paths if os.path.exists(path)]
+
+
+def write_delta_stamp(delta_file: str, base: list, target: list):
+    """Record that `delta_file` turns the outputs with versions `base` into those with versions `target`."""
+    tmp_path = delta_stamp_path(delta_file) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"base": base, "target": target}, f, indent=2)
+    os.replace(tmp_path, delta_stamp_path(delta_file))
+
+
+def read_delta_stamp(delta_file: str) -> dict:
+    """{"base": [...], "target": [...]} of `delta_file`, or None when it has no stamp."""
+    try:
+        with open(delta_stamp_path(delta_file), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def code_salt(*source_files: str) -> str:
+    """Hash of the given source files plus the pandas version."""
+    digest = hashlib.sha256(pd.__version__.encode())
+    for path in source_files:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class SupplierCache:
+    def __init__(self, cache_dir: str, salt: str):
+        self.cache_dir = cache_dir
+        self.salt = salt
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except json.JSONDecodeError:
+                print(f"⚠️ Corrupted cache manifest, rebuilding: {self.manifest_path}")
+        if manifest.get("salt") != salt:
+            manifest = {}
+        self._old = manifest.get("suppliers", {})
+        self._output = manifest.get("output")
+        self._new = {}
+
+    def _fingerprint(self, supplier: str, path: str) -> dict:
+        st = os.stat(path)
+        old = self._old.get(supplier, {})
+        fp = {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        if old.get("path") == fp["path"] and old.get("size") == fp["size"] and old.get("mtime_ns") == fp["mtime_ns"]:
+            fp["sha256"] = old["sha256"]
+        else:
+            fp["sha256"] = file_sha256(path)
+        return fp
+
+    def _pickle_path(self, supplier: str) -> str:
+        safe = hashlib.sha1(supplier.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"supplier_{safe}.pkl")
+
+    def is_fresh(self, supplier: str, path: str) -> bool:
+        """True if `path` matches the fingerprint the cached intermediate was built from."""
+        fp = self._fingerprint(supplier, path)
+        self._new[supplier] = fp
+        old = self._old.get(supplier)
+        return bool(old) and old["sha256"] == fp["sha256"] and old["path"] == fp["path"] \
+            and os.path.exists(self._pickle_path(supplier))
+
+    def load(self, supplier: str) -> pd.DataFrame:
+        return pd.read_pickle(self._pickle_path(supplier))
+
+    def store(self, supplier: str, df: pd.DataFrame):
+        tmp_path = self._pickle_path(supplier) + ".tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, self._pickle_path(supplier))
+
+    def output_is_current(self, output_file: str) -> bool:
+        """True if every supplier checked so far is fresh and output_file is the one last written."""
+        if not self._output or set(self._new) != set(self._old):
+            return False
+        if any(self._new[s]["sha256"] != self._old[s]["sha256"] for s in self._new):
+            return False
+        if not os.path.exists(output_file):
+            return False
+        st = os.stat(output_file)
+        return self._output == {"path": os.path.abspath(output_file), "size": st.st_size,
+                                "mtime_ns": st.st_mtime_ns}
+
+    def commit(self, output_file: str):
+        """Persist the fingerprints of this run together with the output it produced."""
+        st = os.stat(output_file)
+        manifest = {
+            "salt": self.salt,
+            "suppliers": self._new,
+            "output": {"path": os.path.abspath(output_file), "size": st.st_size, "mtime_ns": st.st_mtime_ns},
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
+class NameMemo:
+    """
+    Extraction results per distinct normalized product name (upper-cased, stripped).
+
+    `extract(names) -> DataFrame` is only called for names not in the table yet; all
+    other rows are filled by a join against it. With a `path` the table is kept as a
+    pickle between runs (dropped when the salt changes). Every name is stamped with
+    the last run that looked it up; when the table outgrows `max_names`, the names
+    unused for longest are dropped on save. A run that learned no new name does not
+    rewrite the pickle (its stamps are refreshed by the next run that does).
+    """
+
+    def __init__(self, extract, path: str = None, salt: str = None, max_names: int = None):
+        self.extract = extract
+        self.path = path
+        self.salt = salt
+        self.max_names = max_names
+        self.table = None
+        self.last_run = None      # name -> run number of its last lookup
+        self.run = 0
+        if path and os.path.exists(path):
+            stored = pd.read_pickle(path)
+            if stored.get("salt") == salt:
+                self.table = stored["table"]
+                self.last_run = stored.get("last_run", pd.Series(0, index=self.table.index))
+                self.run = stored.get("run", 0) + 1
+        self.persisted = 0 if self.table is None else len(self.table)
+        self.rows = self.names = self.name_hits = self.extracted = self.added = self.evicted = 0
+
+    def lookup(self, names: pd.Series) -> pd.DataFrame:
+        """extract(names), computed once per distinct normalized name."""
+        # only str values have a key; missing and non-string values are extracted directly
+        has_key = names.map(lambda v: isinstance(v, str)).astype(bool)
+        keys = names[has_key].astype(object)
+        if len(keys):
+            keys = keys.str.upper().str.strip()
+        distinct = pd.Index(keys.unique())
+        known = distinct.isin(self.table.index) if self.table is not None else np.zeros(len(distinct), dtype=bool)
+        new = distinct[~known]
+        if known.any():
+            self.last_run.loc[distinct[known]] = self.run
+        if len(new):
+            learned = self.extract(pd.Series(new, index=new))
+            stamps = pd.Series(self.run, index=new)
+            self.table = learned if self.table is None else pd.concat([self.table, learned])
+            self.last_run = stamps if self.last_run is None else pd.concat([self.last_run, stamps])
+
+        self.rows += len(names)
+        self.names += len(distinct)
+        self.name_hits += int(known.sum())
+        self.extracted += len(new) + int((~has_key).sum())
+        self.added += len(new)
+
+        parts = [] if keys.empty else [self.table.reindex(keys.to_numpy()).set_axis(keys.index)]
+        if not has_key.all():
+            parts.append(self.extract(names[~has_key]))
+        if not parts:
+            return self.extract(names)
+        return pd.concat(parts).reindex(names.index)
+
+    def summary(self) -> str:
+        if not self.rows:
+            return f"Extraction memo: no lookups ({self.persisted:,} names stored)"
+        return (f"Extraction memo: {self.rows:,} rows, {self.names:,} distinct names "
+                f"({self.name_hits / max(self.names, 1):.1%} already in the memo, "
+                f"{self.persisted:,} stored from earlier runs); extractors ran on "
+                f"{self.extracted:,} values, {1 - self.extracted / self.rows:.1%} of rows served by the join"
+                + (f"; {self.evicted:,} least recently used names evicted" if self.evicted else ""))
+
+    def save(self):
+        """Write the table when this run added names, trimmed to max_names (least recently used out first)."""
+        if not self.path or not self.added:
+            return
+        if self.max_names and len(self.table) > self.max_names:
+            keep = self.last_run.sort_values(ascending=False, kind="stable").index[:self.max_names]
+            kept = self.table.index.isin(keep)
+            self.evicted = int((~kept).sum())
+            self.table, self.last_run = self.table[kept], self.last_run[kept]
+        tmp_path = self.path + ".tmp"
+        pd.to_pickle({"salt": self.salt, "run": self.run, "table": self.table, "last_run": self.last_run}, tmp_path)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,82 @@
+"""
+Stable Product_IDs for the merge ETL (Merging_code.py).
+
+A product is identified by its supplier and product name, upper-cased with runs
+of whitespace collapsed. Its ID is "product_" + the first ID_HEX_DIGITS hex digits
+of the SHA-1 of that identity, so the same product keeps the same ID however
+the catalogs are reordered or extended.
+
+The registry (identity -> Product_ID) is kept as a Parquet file. Once assigned,
+an ID never changes, which is what makes collision handling safe: a new identity
+whose short hash is already taken gets a longer prefix of its hash instead.
+Products dropped from a catalog stay in the registry, so they get their old ID
+back if they reappear.
+"""
+
+# IMPORTS
+import hashlib
+import os
+
+import pandas as pd
+
+ID_HEX_DIGITS = 12
+
+
+def identity_keys(df: pd.DataFrame) -> pd.Series:
+    """Normalized "<SUPPLIER>|<PRODUCT NAME>" per row."""
+    def norm(col):
+        return df[col].astype("string").fillna("").str.upper().str.replace(r"\s+", " ", regex=True).str.strip()
+    return (norm('Supplier') + "|" + norm('Product_Name')).astype(object)
+
+
+class ProductIds:
+    def __init__(self, path: str = None):
+        self.path = path
+        self._ids = {}
+        if path and os.path.exists(path):
+            registry = pd.read_parquet(path)
+            self._ids = dict(zip(registry['Identity'], registry['Product_ID']))
+        self._taken = set(self._ids.values())
+        self._run_counts = {}
+        self.added = 0
+        self.collisions = 0
+
+    def _new_id(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        for length in range(ID_HEX_DIGITS, len(digest) + 1, 4):
+            candidate = f"product_{digest[:length]}"
+            if candidate not in self._taken:
+                return candidate
+            self.collisions += 1
+        n = 2
+        while f"product_{digest}_{n}" in self._taken:
+            n += 1
+        return f"product_{digest}_{n}"
+
+    def assign(self, df: pd.DataFrame) -> list:
+        """
+        Product_ID for every row of df (needs Supplier and Product_Name), registering
+        new products. Can be called once per chunk: names that only differ in case or
+        spacing survive the exact dedup as separate rows, so the n-th repeat of an
+        identity within the run gets "|<n>" appended to its key.
+        """
+        base = identity_keys(df)
+        nth = base.groupby(base, sort=False).cumcount() + 1 \
+            + base.map(self._run_counts).fillna(0).astype(int)
+        keys = base.where(nth == 1, base + "|" + nth.astype(str))
+        self._run_counts.update(nth.groupby(base, sort=False).max().to_dict())
+        ids = keys.map(self._ids)
+        for key in keys[ids.isna()].unique():
+            product_id = self._new_id(key)
+            self._ids[key] = product_id
+            self._taken.add(product_id)
+            self.added += 1
+        return keys.map(self._ids).tolist()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        pd.DataFrame({'Identity': list(self._ids), 'Product_ID': list(self._ids.values())}) \
+            .to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
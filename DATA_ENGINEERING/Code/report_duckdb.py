@@ -0,0 +1,200 @@
+"""
+DuckDB backend for the Servoo report.
+
+Runs the report queries of report_queries.py (the same SQL) with DuckDB, straight
+over the ETL output instead of the SQLite master table: the Parquet file written by
+Merging_code.py, or the cleaned CSV when there is no Parquet file. DuckDB reads
+only the columns a query needs and aggregates them column-wise on all cores, which
+is what the report does all the time (counts and sums over the whole catalog).
+
+`products_view` applies the normalization Sql_creation.py applies on load (serial
+numbers as text without a trailing ".0", integer grams and units, NULL when
+unknown, and the markers pandas reads as missing, "N/A" included, as NULL in a
+CSV), so both engines see the same rows and return identical results: same
+columns, dtypes, values and row order (the queries order every multi-row result).
+
+DuckDB is optional (pip install duckdb); nothing else imports this module unless
+the DuckDB engine is asked for:
+
+    python "SQL Queries.py" --engine duckdb
+    python "SQL Queries.py" --engine duckdb --source /path/to/Servoo_Cleaned_Products.parquet
+    python report_duckdb.py                  # run both engines and compare
+    python report_duckdb.py --source /path/to/Servoo_Cleaned_Products.csv --db /path/to/servoo_master.db
+"""
+
+# IMPORTS
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from report_queries import CLUSTER_QUERY, CLUSTERS_TABLE, DB_FILE, QUERIES, TABLE_NAME, report_queries
+from sqlite_connect import connect
+
+# CONFIG
+# the ETL outputs in DATA_ENGINEERING/Data, next to this Code folder (override with --source / --clusters)
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data")
+PARQUET_FILE = os.path.join(DATA_DIR, "Servoo_Cleaned_Products.parquet")
+CSV_FILE = os.path.join(DATA_DIR, "Servoo_Cleaned_Products.csv")
+CLUSTERS_FILE = os.path.join(DATA_DIR, "Servoo_Product_Clusters.csv")
+# CSV values pandas.read_csv (and so Sql_creation.py) turns into NULL: its default na_values
+CSV_NULLS = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+             "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+
+def default_source() -> str:
+    """The Parquet output when it exists, else the CSV of the same merge run (as Sql_creation.py picks them)."""
+    return PARQUET_FILE if os.path.exists(PARQUET_FILE) else CSV_FILE
+
+
+def connect_duckdb(threads: int = None):
+    """In-memory DuckDB connection; NULLs sort first, as in SQLite."""
+    try:
+        import duckdb
+    except ImportError:
+        sys.exit("❌ The DuckDB engine needs the duckdb package: pip install duckdb")
+    con = duckdb.connect()
+    con.execute("SET default_null_order = 'nulls_first'")
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    return con
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def products_view(source: str) -> str:
+    """SELECT giving the products columns the report reads, typed and normalized like Sql_creation.py."""
+    if source.endswith(".parquet"):
+        rows = f"read_parquet({_sql_string(source)})"
+        grams = "CAST(Weight_Grams AS BIGINT)"
+    else:
+        nulls = ", ".join(_sql_string(value) for value in CSV_NULLS)
+        rows = f"read_csv({_sql_string(source)}, header = true, all_varchar = true, nullstr = [{nulls}])"
+        grams = "TRY_CAST(regexp_replace(Weight_Quantity, 'G$', '') AS BIGINT)"
+    return f"""
+        SELECT Product_ID,
+               Product_Name,
+               regexp_replace(CAST(Serial_Number AS VARCHAR), '\\.0$', '') AS Serial_Number,
+               CAST(Supplier AS VARCHAR) AS Supplier,
+               {grams} AS Weight_Grams,
+               CAST(Packaging_Type AS VARCHAR) AS Packaging_Type,
+               TRY_CAST(TRY_CAST(Units_Per_Carton AS DOUBLE) AS BIGINT) AS Units_Per_Carton
+        FROM {rows}
+    """
+
+
+def attach_sources(con, source: str, clusters_file: str = None):
+    """
+    Create products (and product_clusters, when the clusters file exists and covers
+    exactly the source's Product_IDs) on `con`.
+    Parquet stays a view: every query reads just its columns from the file. A CSV
+    has to be parsed whole, so it is loaded into a DuckDB table once instead.
+    """
+    kind = "VIEW" if source.endswith(".parquet") else "TABLE"
+    con.execute(f"CREATE OR REPLACE {kind} {TABLE_NAME} AS {products_view(source)}")
+    if clusters_file and os.path.exists(clusters_file):
+        con.execute(f"""
+            CREATE OR REPLACE VIEW {CLUSTERS_TABLE} AS
+            SELECT * FROM read_csv({_sql_string(clusters_file)}, header = true, types = {{'Product_ID': 'VARCHAR'}})
+        """)
+        # clusters of another product set are left out, as Sql_creation.py does
+        unknown, unclustered = con.execute(f"""
+            SELECT (SELECT COUNT(*) FROM {CLUSTERS_TABLE} WHERE Product_ID NOT IN (SELECT Product_ID FROM {TABLE_NAME})),
+                   (SELECT COUNT(*) FROM {TABLE_NAME} WHERE Product_ID NOT IN (SELECT Product_ID FROM {CLUSTERS_TABLE}))
+        """).fetchone()
+        if unknown or unclustered:
+            print(f"⚠️ {clusters_file} is stale ({unknown:,} clustered Product_IDs not in the source, "
+                  f"{unclustered:,} products without a cluster); cluster query skipped")
+            con.execute(f"DROP VIEW {CLUSTERS_TABLE}")
+
+
+def duckdb_queries(con) -> dict:
+    """Description -> SQL of every report query; the cluster query once its view exists."""
+    queries = dict(QUERIES)
+    views = {name for (name,) in con.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal").fetchall()}
+    if CLUSTERS_TABLE in views:
+        queries["Products matched across catalogs (name clusters)"] = CLUSTER_QUERY
+    return queries
+
+
+def fetch(con, sql: str) -> pd.DataFrame:
+    """Result of `sql` as pandas reads the same query from SQLite (whole-number sums as int64)."""
+    rel = con.sql(sql)
+    df = rel.df()
+    for column, column_type in zip(rel.columns, rel.types):
+        # SUM over BIGINT is a HUGEINT in DuckDB, which pandas receives as float64
+        if str(column_type) == "HUGEINT" and df[column].notna().all():
+            df[column] = df[column].astype("int64")
+    return df
+
+
+def run_report_duckdb(source: str = None, clusters_file: str = CLUSTERS_FILE, threads: int = None):
+    """
+    (queries, results, stats): the SQL of every report query run (description -> SQL),
+    its result DataFrame computed by DuckDB over `source` (description -> frame, in
+    report order) and run stats shaped like report_queries.run_report's, without row
+    counts (rows_scanned and rows_scanned_per_query are None).
+    """
+    source = source or default_source()
+    start = time.perf_counter()
+    con = connect_duckdb(threads)
+    try:
+        attach_sources(con, source, clusters_file)
+        queries = duckdb_queries(con)
+        results = {desc: fetch(con, sql) for desc, sql in queries.items()}
+        workers = con.execute("SELECT current_setting('threads')").fetchone()[0]
+    finally:
+        con.close()
+    stats = {
+        "source": f"DuckDB over {source}",
+        "queries": len(results),
+        "passes": len(results),           # one columnar scan per query (of the file, or the loaded CSV)
+        "workers": workers,
+        # DuckDB reports no row counts per scan; stored as NULL in report_runs
+        "rows_scanned": None,
+        "rows_scanned_per_query": None,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+    return queries, results, stats
+
+
+def compare_engines(expected: dict, actual: dict) -> list:
+    """Descriptions whose results differ between two engines (or exist in only one of them)."""
+    differ = []
+    for desc in list(expected) + [desc for desc in actual if desc not in expected]:
+        try:
+            pd.testing.assert_frame_equal(expected[desc], actual[desc])
+        except (AssertionError, KeyError) as e:
+            print(f"❌ {desc}: results differ\n{e}")
+            differ.append(desc)
+    return differ
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the report with DuckDB and SQLite and compare the results.")
+    parser.add_argument("--source", default=None, help="Parquet or CSV output of Merging_code.py")
+    parser.add_argument("--clusters", default=CLUSTERS_FILE, help="Duplicate_clusters.py output")
+    parser.add_argument("--db", default=DB_FILE, help="SQLite master database loaded from the same output")
+    args = parser.parse_args()
+
+    _, actual, stats = run_report_duckdb(args.source, args.clusters)
+    conn = connect(args.db, "read")
+    start = time.perf_counter()
+    expected = {desc: pd.read_sql_query(sql, conn) for desc, sql in report_queries(conn).items()}
+    sqlite_seconds = time.perf_counter() - start
+    conn.close()
+
+    differ = compare_engines(expected, actual)
+    print(f"⏱️ SQLite: {sqlite_seconds:.3f}s, {stats['source']}: {stats['seconds']:.3f}s "
+          f"({stats['queries']} queries, {stats['workers']} threads)")
+    if differ:
+        sys.exit(1)
+    print("✅ DuckDB and SQLite results are identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Report queries for the Servoo master database, and the indexes that cover them.
+
+SQL Queries.py runs the report through `run_report(conn)`; Sql_creation.py
+creates REPORT_INDEXES after every load. Each index holds every column its
+queries read, in the order their GROUP BY needs, so SQLite answers them from
+the index alone instead of reading and sorting the whole products table.
+
+`run_report` does not run the queries one by one (one scan of products each).
+REPORT_PASSES group products once by serial number and once by supplier and
+packaging into small temp tables, and every query is answered from those
+(CONSOLIDATED). The results are identical to running QUERIES, while adding a
+query no longer adds a scan. When the summary tables of report_summaries.py are
+in place, they replace the serial and supplier passes altogether.
+
+Run this file to check that with EXPLAIN QUERY PLAN, for the report queries, the
+passes and the report views saved in the database:
+
+    python report_queries.py
+    python report_queries.py --db /path/to/servoo_master.db
+    python report_queries.py --compare     # also run both ways and compare results
+    python report_queries.py --compare --workers 3
+
+It prints every plan and exits with status 1 if any of them still falls back to
+a full table scan ("SCAN <table>" without an index), or if --compare finds a
+result that differs.
+"""
+
+# IMPORTS
+import argparse
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from sqlite_connect import ConnectionPool, connect
+
+# CONFIG
+DB_FILE = "/home/anusha/Desktop/Servoo/DATA_ENGINEERING/Data/servoo_master.db"
+TABLE_NAME = "products"
+CLUSTERS_TABLE = "product_clusters"
+
+# index name -> columns, per table
+REPORT_INDEXES = {
+    TABLE_NAME: {
+        "idx_products_serial_supplier": ("Serial_Number", "Supplier"),          # duplicates, multi-catalog
+        "idx_products_supplier_packaging": ("Supplier", "Packaging_Type", "Units_Per_Carton"),  # per supplier
+        "idx_products_packaging_units": ("Packaging_Type", "Units_Per_Carton"),  # CTN split, total units
+    },
+    CLUSTERS_TABLE: {
+        "idx_product_clusters_cluster": ("Cluster_ID", "Product_ID"),
+    },
+}
+
+# every query with more than one row orders them fully (ties included), so the report
+# comes out in the same order from any engine (see report_duckdb.py)
+QUERIES = {
+    "Total number of products": f"SELECT COUNT(*) AS total_products FROM {TABLE_NAME};",
+
+    "Number of CTN vs NON-CTN products": f"""
+        SELECT Packaging_Type, COUNT(*) AS count
+        FROM {TABLE_NAME}
+        GROUP BY Packaging_Type
+        ORDER BY Packaging_Type;
+    """,
+
+    # Units_Per_Carton is an INTEGER column (NULL when unknown), so no casts or text checks
+    "Total units available": f"""
+        SELECT
+            SUM(
+                CASE
+                    WHEN Packaging_Type='CTN' AND Units_Per_Carton > 0
+                    THEN Units_Per_Carton
+                    ELSE 1
+                END
+            ) AS total_units
+        FROM {TABLE_NAME};
+    """,
+
+    "Duplicate Serial_Numbers": f"""
+        SELECT Serial_Number, COUNT(*) AS count
+        FROM {TABLE_NAME}
+        GROUP BY Serial_Number
+        HAVING COUNT(*) > 1
+        ORDER BY Serial_Number;
+    """,
+
+    "Missing Serial_Numbers": f"""
+        SELECT COUNT(*) AS missing_serials
+        FROM {TABLE_NAME}
+        WHERE Serial_Number IS NULL OR TRIM(Serial_Number) = '';
+    """,
+
+    "Supplier-wise product counts": f"""
+        SELECT Supplier, COUNT(*) AS total_products
+        FROM {TABLE_NAME}
+        GROUP BY Supplier
+        ORDER BY total_products DESC, Supplier;
+    """,
+
+    "Products appearing in multiple catalogs": f"""
+        SELECT Serial_Number, COUNT(DISTINCT Supplier) AS supplier_count
+        FROM {TABLE_NAME}
+        GROUP BY Serial_Number
+        HAVING supplier_count > 1
+        ORDER BY Serial_Number;
+    """,
+
+    "Unique products (only in one catalog)": f"""
+        SELECT COUNT(*) AS unique_products
+        FROM (
+            SELECT Serial_Number
+            FROM {TABLE_NAME}
+            GROUP BY Serial_Number
+            HAVING COUNT(DISTINCT Supplier) = 1
+        );
+    """
+}
+
+CLUSTER_QUERY = f"""
+        SELECT COUNT(*) AS matched_clusters, SUM(products) AS matched_products
+        FROM (
+            SELECT c.Cluster_ID, COUNT(*) AS products
+            FROM {TABLE_NAME} p
+            JOIN {CLUSTERS_TABLE} c ON c.Product_ID = p.Product_ID
+            GROUP BY c.Cluster_ID
+            HAVING COUNT(DISTINCT p.Supplier) > 1
+        );
+    """
+
+
+def table_exists(conn, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def report_queries(conn) -> dict:
+    """Description -> SQL of every report query, including the cluster query once its table is loaded."""
+    queries = dict(QUERIES)
+    # Cross-catalog matches by name cluster (Duplicate_clusters.py), when the table was loaded
+    if table_exists(conn, CLUSTERS_TABLE):
+        queries["Products matched across catalogs (name clusters)"] = CLUSTER_QUERY
+    return queries
+
+
+def units_expr(row: str = "") -> str:
+    """Units one product adds to "Total units available"; `row` is a prefix such as "NEW."."""
+    return f"CASE WHEN {row}Packaging_Type='CTN' AND {row}Units_Per_Carton > 0 THEN {row}Units_Per_Carton ELSE 1 END"
+
+
+# Consolidated report: temp table -> grouping query; each one is a single scan of products
+REPORT_PASSES = {
+    "serial_stats": f"""
+        SELECT Serial_Number, COUNT(*) AS n, COUNT(DISTINCT Supplier) AS suppliers
+        FROM {TABLE_NAME}
+        GROUP BY Serial_Number
+    """,
+    "supplier_stats": f"""
+        SELECT Supplier, Packaging_Type, COUNT(*) AS n, SUM({units_expr()}) AS units
+        FROM {TABLE_NAME}
+        GROUP BY Supplier, Packaging_Type
+    """,
+}
+
+# one-row totals over the per-serial table (no scan of products)
+SERIAL_TOTALS = """
+        SELECT COALESCE(SUM(CASE WHEN Serial_Number IS NULL OR TRIM(Serial_Number) = '' THEN n ELSE 0 END), 0)
+                   AS missing_serials,
+               COALESCE(SUM(suppliers = 1), 0) AS single_catalog_serials
+        FROM {serials}
+    """
+
+CLUSTER_PASS = f"""
+        SELECT c.Cluster_ID, COUNT(*) AS n, COUNT(DISTINCT p.Supplier) AS suppliers
+        FROM {TABLE_NAME} p
+        JOIN {CLUSTERS_TABLE} c ON c.Product_ID = p.Product_ID
+        GROUP BY c.Cluster_ID
+    """
+
+# role -> table the consolidated queries read; temp tables built by the passes, or the
+# summary tables kept current by report_summaries.py (same columns)
+PASS_TABLES = {
+    "serials": "serial_stats",
+    "suppliers": "supplier_stats",
+    "totals": "serial_totals",
+    "clusters": "cluster_stats",
+}
+
+# description -> the same result, computed from the pass tables (ORDER BY = the GROUP BY order)
+CONSOLIDATED = {
+    "Total number of products": "SELECT COALESCE(SUM(n), 0) AS total_products FROM {suppliers};",
+    "Number of CTN vs NON-CTN products":
+        "SELECT Packaging_Type, SUM(n) AS count FROM {suppliers} GROUP BY Packaging_Type ORDER BY Packaging_Type;",
+    "Total units available": "SELECT SUM(units) AS total_units FROM {suppliers};",
+    "Duplicate Serial_Numbers":
+        "SELECT Serial_Number, n AS count FROM {serials} WHERE n > 1 ORDER BY Serial_Number;",
+    "Missing Serial_Numbers": "SELECT missing_serials FROM {totals};",
+    "Supplier-wise product counts": """
+        SELECT Supplier, SUM(n) AS total_products
+        FROM {suppliers}
+        GROUP BY Supplier
+        ORDER BY total_products DESC, Supplier;
+    """,
+    "Products appearing in multiple catalogs":
+        "SELECT Serial_Number, suppliers AS supplier_count FROM {serials} WHERE suppliers > 1 ORDER BY Serial_Number;",
+    "Unique products (only in one catalog)": "SELECT single_catalog_serials AS unique_products FROM {totals};",
+    "Products matched across catalogs (name clusters)":
+        "SELECT COUNT(*) AS matched_clusters, SUM(n) AS matched_products FROM {clusters} WHERE suppliers > 1;",
+}
+
+
+# pass group -> the pass tables it builds; a group's queries only read its own tables, so
+# groups can run on separate connections
+PASS_GROUPS = {
+    "serials": ("serial_stats",),        # + serial_totals, derived from serial_stats
+    "suppliers": ("supplier_stats",),
+    "clusters": ("cluster_stats",),
+}
+
+
+def query_group(desc: str) -> str:
+    """Pass group whose tables the consolidated query `desc` reads."""
+    sql = CONSOLIDATED[desc]
+    return "clusters" if "{clusters}" in sql else "suppliers" if "{suppliers}" in sql else "serials"
+
+
+def report_passes(conn) -> dict:
+    """Temp table -> grouping query of every pass the report needs."""
+    passes = dict(REPORT_PASSES)
+    if table_exists(conn, CLUSTERS_TABLE):
+        passes["cluster_stats"] = CLUSTER_PASS
+    return passes
+
+
+def run_group(conn, group: str, passes: dict, descs: list, tables: dict):
+    """Build the pass tables of `group` on `conn` and answer its queries: (results, rows read per pass)."""
+    built, pass_rows = [], {}
+    try:
+        for table in PASS_GROUPS[group]:
+            if table not in passes:
+                continue
+            conn.execute(f"DROP TABLE IF EXISTS temp.{table}")
+            conn.execute(f"CREATE TEMP TABLE {table} AS {passes[table]}")
+            built.append(table)
+            pass_rows[table] = conn.execute(f"SELECT COALESCE(SUM(n), 0) FROM temp.{table}").fetchone()[0]
+        if "serial_stats" in built:
+            conn.execute("DROP TABLE IF EXISTS temp.serial_totals")
+            conn.execute(f"CREATE TEMP TABLE serial_totals AS {SERIAL_TOTALS.format(serials='serial_stats')}")
+            built.append("serial_totals")
+        results = {desc: pd.read_sql_query(CONSOLIDATED[desc].format(**tables), conn) for desc in descs}
+    finally:
+        for table in built:
+            conn.execute(f"DROP TABLE IF EXISTS temp.{table}")
+    return results, pass_rows
+
+
+def run_report(conn, summary_tables: dict = None, readers: ConnectionPool = None):
+    """
+    Result DataFrame of every report query (description -> frame, in report_queries
+    order), computed from one scan of products per pass, and the run stats:
+    source, passes, workers, rows_scanned (rows the passes read),
+    rows_scanned_per_query (what running every query on its own would read) and
+    seconds.
+
+    With `summary_tables` (report_summaries.summary_tables) the serial and supplier
+    passes are skipped and their maintained tables are read instead. With
+    `readers`, a read ConnectionPool on the same database held by the caller (so
+    its connections are reused across reports) of size > 1, the pass groups run
+    at the same time on a thread pool, each on a connection borrowed from it
+    (sqlite3 releases the GIL while a statement runs); results come back in the
+    same order either way. Only groups that build pass tables have work to
+    share, so with the summary tables (at most the cluster pass left) the report
+    runs on `conn` alone whatever the pool size.
+    """
+    start = time.perf_counter()
+    tables = dict(PASS_TABLES, **(summary_tables or {}))
+    passes = {table: sql for table, sql in report_passes(conn).items() if table in tables.values()}
+    queries = report_queries(conn)
+    groups = {}
+    for desc in queries:
+        groups.setdefault(query_group(desc), []).append(desc)
+
+    scanning = [group for group in groups if any(table in passes for table in PASS_GROUPS[group])]
+    workers = readers.size if readers is not None else 1
+    if workers > 1 and len(scanning) > 1:
+        def run_on_own_connection(group):
+            with readers.connection() as worker:
+                return run_group(worker, group, passes, groups[group], tables)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(run_on_own_connection, groups))
+    else:
+        workers = 1
+        outcomes = [run_group(conn, group, passes, descs, tables) for group, descs in groups.items()]
+
+    by_desc, pass_rows = {}, {}
+    for group_results, group_rows in outcomes:
+        by_desc.update(group_results)
+        pass_rows.update(group_rows)
+    results = {desc: by_desc[desc] for desc in queries}
+    total = int(results["Total number of products"].iloc[0, 0])
+    stats = {
+        "source": "summary tables" if summary_tables else "passes",
+        "queries": len(results),
+        "passes": len(passes),
+        "workers": min(workers, len(groups)),
+        "rows_scanned": sum(pass_rows.values()),
+        # every products query reads all rows; the cluster query reads the joined rows
+        "rows_scanned_per_query": total * len(QUERIES) + pass_rows.get("cluster_stats", 0),
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+    return results, stats
+
+
+def create_indexes(conn, table: str):
+    """Create the REPORT_INDEXES of `table` that do not exist yet, dropping report indexes no longer listed."""
+    wanted = REPORT_INDEXES[table]
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+                                "AND name LIKE 'idx_%'", (table,)).fetchall():
+        if name not in wanted:
+            conn.execute(f"DROP INDEX {name}")
+    for name, columns in wanted.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+
+
+# "SCAN products" / "SCAN p" (SQLite >= 3.36) or "SCAN TABLE products AS p" (older);
+# index scans ("SCAN products USING COVERING INDEX ...") do not match
+_TABLE_SCAN = re.compile(r"^SCAN (?:TABLE )?(?P<name>.+?)(?: AS \S+)?$")
+_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (?P<name>.+)$")
+
+
+def query_plan(conn, sql: str) -> list:
+    """The detail column of EXPLAIN QUERY PLAN, one string per step."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def full_scans(plan: list) -> list:
+    """Steps that read a whole table; scans of subqueries and views (co-routines) are skipped."""
+    subqueries = {m["name"] for m in map(_SUBQUERY.match, plan) if m}
+    scans = []
+    for step in plan:
+        m = _TABLE_SCAN.match(step)
+        if m and " USING " not in step and m["name"] not in subqueries and step != "SCAN CONSTANT ROW":
+            scans.append(step)
+    return scans
+
+
+def check_plans(conn) -> list:
+    """(name, plan, full scan steps) for every report query, report pass and view in the database."""
+    checks = list(report_queries(conn).items())
+    checks += [(f"pass: {table}", sql) for table, sql in report_passes(conn).items()]
+    views = conn.execute("SELECT name FROM sqlite_master WHERE type = 'view' ORDER BY name").fetchall()
+    checks += [(f"view: {name}", f'SELECT * FROM "{name}"') for (name,) in views]
+    results = []
+    for name, sql in checks:
+        plan = query_plan(conn, sql)
+        results.append((name, plan, full_scans(plan)))
+    return results
+
+
+def compare_results(conn, readers: ConnectionPool = None) -> bool:
+    """Run every query on its own and through run_report; True if all results are identical."""
+    start = time.perf_counter()
+    expected = {desc: pd.read_sql_query(sql, conn) for desc, sql in report_queries(conn).items()}
+    per_query = time.perf_counter() - start
+    actual, stats = run_report(conn, readers=readers)
+    ok = True
+    for desc, df in expected.items():
+        try:
+            pd.testing.assert_frame_equal(df, actual[desc])
+        except AssertionError as e:
+            print(f"❌ {desc}: consolidated result differs\n{e}")
+            ok = False
+    print(f"\n{'✅' if ok else '❌'} {stats['queries']} queries: {per_query:.3f}s one by one, "
+          f"{stats['seconds']:.3f}s from {stats['passes']} passes on {stats['workers']} connection(s) "
+          f"({stats['rows_scanned']:,} rows scanned instead of {stats['rows_scanned_per_query']:,})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a report query or view needs a full table scan.")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--compare", action="store_true",
+                        help="also check that the consolidated report gives the same results as the queries")
+    parser.add_argument("--workers", type=int, default=1, help="connections the consolidated report uses with --compare")
+    args = parser.parse_args()
+
+    conn = connect(args.db, "read")
+    results = check_plans(conn)
+
+    failed = 0
+    for name, plan, scans in results:
+        print(f"\n{'❌' if scans else '✅'} {name}")
+        for step in plan:
+            print(f"    {step}")
+        failed += bool(scans)
+
+    if args.compare:
+        with ConnectionPool(args.db, "read", args.workers) as readers:
+            same = compare_results(conn, readers)
+    else:
+        same = True
+    conn.close()
+
+    if failed:
+        print(f"\n❌ {failed} of {len(results)} report queries fall back to a full table scan")
+        sys.exit(1)
+    print(f"\n✅ All {len(results)} report queries are answered from indexes")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
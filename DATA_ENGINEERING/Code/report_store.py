@@ -0,0 +1,130 @@
+"""
+Report history for SQL Queries.py.
+
+Every run of the report is appended, never replaced:
+
+- report_runs: one row per run (Run_ID, Generated_At, source, rows scanned, seconds)
+- analysis_report: one row per query and run. Result is the query result as a
+  JSON array of row objects ("[{"Packaging_Type": "CTN", "count": 1232}, ...]"),
+  readable with json.loads or SQLite's json_extract. Value holds the number
+  itself when the result is a single value (counts and totals), so a metric over
+  time is a plain indexed lookup:
+
+      SELECT r.Generated_At, a.Value
+      FROM analysis_report a JOIN report_runs r USING (Run_ID)
+      WHERE a.Query_Description = 'Total number of products'
+      ORDER BY a.Run_ID;
+
+The primary key (Query_Description, Run_ID) is that index. An analysis_report
+left by earlier versions (Result as a Python repr, replaced on every run) is
+renamed to analysis_report_legacy and its rows are imported as past runs.
+"""
+
+# IMPORTS
+import ast
+import json
+from datetime import datetime
+
+import pandas as pd
+
+RUNS_TABLE = "report_runs"
+RESULTS_TABLE = "analysis_report"
+LEGACY_TABLE = "analysis_report_legacy"
+
+
+def _columns(conn, table: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def ensure_store(conn):
+    """Create the history tables, moving an old-style analysis_report out of the way first."""
+    old = _columns(conn, RESULTS_TABLE)
+    if old and "Run_ID" not in old:
+        conn.execute(f"DROP TABLE IF EXISTS {LEGACY_TABLE}")
+        conn.execute(f"ALTER TABLE {RESULTS_TABLE} RENAME TO {LEGACY_TABLE}")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {RUNS_TABLE} (
+            Run_ID INTEGER PRIMARY KEY,
+            Generated_At TEXT NOT NULL,
+            Source TEXT,
+            Rows_Scanned INTEGER,
+            Seconds REAL
+        )""")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} (
+            Run_ID INTEGER NOT NULL REFERENCES {RUNS_TABLE} (Run_ID),
+            Query_Description TEXT NOT NULL,
+            Query TEXT,
+            Result TEXT,
+            Value NUMERIC,
+            Generated_At TEXT,
+            PRIMARY KEY (Query_Description, Run_ID)
+        )""")
+    if old and "Run_ID" not in old:
+        import_legacy(conn)
+
+
+def result_value(df: pd.DataFrame):
+    """The number of a single-value result (one row, one numeric column), else None."""
+    if df.shape == (1, 1) and pd.api.types.is_numeric_dtype(df.dtypes.iloc[0]) and pd.notna(df.iat[0, 0]):
+        return df.iat[0, 0].item() if hasattr(df.iat[0, 0], "item") else df.iat[0, 0]
+    return None
+
+
+def save_run(conn, results: dict, queries: dict, stats: dict = None, generated_at: str = None) -> pd.DataFrame:
+    """
+    Append one report run: `results` (description -> DataFrame) of `queries`
+    (description -> SQL), plus the run_report stats. Returns the rows written to
+    analysis_report, with their Run_ID.
+    """
+    stats = stats or {}
+    generated_at = generated_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    run_id = conn.execute(
+        f"INSERT INTO {RUNS_TABLE} (Generated_At, Source, Rows_Scanned, Seconds) VALUES (?, ?, ?, ?)",
+        (generated_at, stats.get("source"), stats.get("rows_scanned"), stats.get("seconds")),
+    ).lastrowid
+    descs = list(results)
+    rows = pd.DataFrame({
+        "Run_ID": run_id,
+        "Query_Description": descs,
+        "Query": [queries[desc].strip() for desc in descs],
+        "Result": [results[desc].to_json(orient="records") for desc in descs],
+        # object column, so counts stay 5238 (not 5238.0) next to the empty values
+        "Value": pd.Series([result_value(results[desc]) for desc in descs], dtype=object),
+        "Generated_At": generated_at,
+    })
+    conn.executemany(
+        f"INSERT INTO {RESULTS_TABLE} ({', '.join(rows.columns)}) VALUES ({', '.join('?' * len(rows.columns))})",
+        rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None),
+    )
+    return rows
+
+
+def import_legacy(conn):
+    """Copy the rows of LEGACY_TABLE into the history, one run per Generated_At."""
+    legacy = pd.read_sql_query(f"SELECT * FROM {LEGACY_TABLE}", conn)
+    for generated_at, run in legacy.groupby("Generated_At", sort=True):
+        results, queries = {}, {}
+        for row in run.itertuples(index=False):
+            try:
+                results[row.Query_Description] = pd.DataFrame(ast.literal_eval(row.Result))
+            except (ValueError, SyntaxError):
+                continue   # not a Python literal; the row stays in LEGACY_TABLE only
+            queries[row.Query_Description] = row.Query
+        if results:
+            save_run(conn, results, queries, {"source": "legacy"}, generated_at)
+
+
+def metric_history(conn, desc: str) -> pd.DataFrame:
+    """Run_ID, Generated_At, Value and Result of one query over all runs, oldest first."""
+    return pd.read_sql_query(f"""
+        SELECT a.Run_ID, r.Generated_At, a.Value, a.Result
+        FROM {RESULTS_TABLE} a JOIN {RUNS_TABLE} r USING (Run_ID)
+        WHERE a.Query_Description = ?
+        ORDER BY a.Run_ID
+    """, conn, params=(desc,))
+
+
+def parse_result(result: str) -> pd.DataFrame:
+    """DataFrame back from a stored Result."""
+    return pd.DataFrame(json.loads(result))
@@ -0,0 +1,223 @@
+"""
+Summary tables for the headline report numbers, kept current by triggers.
+
+The consolidated report (report_queries.run_report) still reads all of products
+once per pass. The summary tables below hold the same grouped rows as those
+passes and are updated by triggers on every insert, update and delete of
+products, so the report only reads a handful of small rows:
+
+- summary_suppliers: products and units per (Supplier, Packaging_Type); gives the
+  product count, CTN vs NON-CTN, supplier counts and total units
+- summary_serials: products and distinct suppliers per Serial_Number; gives the
+  duplicate and multi-catalog serial lists
+- summary_serial_suppliers: products per (Serial_Number, Supplier), needed to keep
+  the distinct supplier count right when a product is removed
+- summary_totals: one row with the missing serial count and the number of serials
+  found in a single catalog
+
+Sql_creation.py calls `ensure_summaries` on every load: when a table or trigger
+is missing (first run, or products was recreated) everything is rebuilt from
+products in one pass, after the bulk insert on a cold load.
+
+Run this file to recompute every summary from scratch and compare:
+
+    python report_summaries.py
+    python report_summaries.py --db /path/to/servoo_master.db --repair
+
+It exits with status 1 if a summary differs (after rebuilding it with --repair).
+"""
+
+# IMPORTS
+import argparse
+import sys
+import time
+
+from report_queries import DB_FILE, REPORT_PASSES, SERIAL_TOTALS, TABLE_NAME, units_expr
+from sqlite_connect import connect
+
+# role -> summary table (see report_queries.PASS_TABLES)
+SUMMARY_TABLES = {
+    "serials": "summary_serials",
+    "suppliers": "summary_suppliers",
+    "totals": "summary_totals",
+}
+
+# summary table -> (columns, query that builds it from scratch); same columns as the passes
+SUMMARIES = {
+    "summary_serial_suppliers": (
+        "Serial_Number TEXT, Supplier TEXT, n INTEGER NOT NULL, UNIQUE (Serial_Number, Supplier)",
+        f"SELECT Serial_Number, Supplier, COUNT(*) AS n FROM {TABLE_NAME} GROUP BY Serial_Number, Supplier",
+    ),
+    "summary_serials": (
+        "Serial_Number TEXT UNIQUE, n INTEGER NOT NULL, suppliers INTEGER NOT NULL",
+        REPORT_PASSES["serial_stats"],
+    ),
+    "summary_suppliers": (
+        "Supplier TEXT, Packaging_Type TEXT, n INTEGER NOT NULL, units INTEGER NOT NULL, "
+        "UNIQUE (Supplier, Packaging_Type)",
+        REPORT_PASSES["supplier_stats"],
+    ),
+    "summary_totals": (
+        "missing_serials INTEGER NOT NULL, single_catalog_serials INTEGER NOT NULL",
+        SERIAL_TOTALS.format(serials="summary_serials"),
+    ),
+}
+
+SUMMARY_INDEXES = [
+    "CREATE INDEX summary_serials_n ON summary_serials (n)",
+    "CREATE INDEX summary_serials_suppliers ON summary_serials (suppliers)",
+]
+
+
+def _add(row: str) -> str:
+    """Trigger statements counting product `row` (NEW) into the summaries."""
+    serial, supplier, packaging = f"{row}.Serial_Number", f"{row}.Supplier", f"{row}.Packaging_Type"
+    pair = f"Serial_Number IS {serial} AND Supplier IS {supplier}"
+    group = f"Supplier IS {supplier} AND Packaging_Type IS {packaging}"
+    return f"""
+        INSERT INTO summary_serial_suppliers (Serial_Number, Supplier, n)
+            SELECT {serial}, {supplier}, 0 WHERE NOT EXISTS (SELECT 1 FROM summary_serial_suppliers WHERE {pair});
+        UPDATE summary_serial_suppliers SET n = n + 1 WHERE {pair};
+        INSERT INTO summary_serials (Serial_Number, n, suppliers)
+            SELECT {serial}, 0, 0 WHERE NOT EXISTS (SELECT 1 FROM summary_serials WHERE Serial_Number IS {serial});
+        UPDATE summary_serials SET n = n + 1, suppliers = (
+            SELECT COUNT(Supplier) FROM summary_serial_suppliers WHERE Serial_Number IS {serial}
+        ) WHERE Serial_Number IS {serial};
+        INSERT INTO summary_suppliers (Supplier, Packaging_Type, n, units)
+            SELECT {supplier}, {packaging}, 0, 0 WHERE NOT EXISTS (SELECT 1 FROM summary_suppliers WHERE {group});
+        UPDATE summary_suppliers SET n = n + 1, units = units + ({units_expr(row + ".")}) WHERE {group};"""
+
+
+def _remove(row: str) -> str:
+    """Trigger statements taking product `row` (OLD) out of the summaries; empty groups are deleted."""
+    serial, supplier, packaging = f"{row}.Serial_Number", f"{row}.Supplier", f"{row}.Packaging_Type"
+    pair = f"Serial_Number IS {serial} AND Supplier IS {supplier}"
+    group = f"Supplier IS {supplier} AND Packaging_Type IS {packaging}"
+    return f"""
+        UPDATE summary_serial_suppliers SET n = n - 1 WHERE {pair};
+        DELETE FROM summary_serial_suppliers WHERE {pair} AND n = 0;
+        UPDATE summary_serials SET n = n - 1, suppliers = (
+            SELECT COUNT(Supplier) FROM summary_serial_suppliers WHERE Serial_Number IS {serial}
+        ) WHERE Serial_Number IS {serial};
+        DELETE FROM summary_serials WHERE Serial_Number IS {serial} AND n = 0;
+        UPDATE summary_suppliers SET n = n - 1, units = units - ({units_expr(row + ".")}) WHERE {group};
+        DELETE FROM summary_suppliers WHERE {group} AND n = 0;"""
+
+
+def _totals(row: str, sign: str) -> str:
+    """SET clause adding (sign "+") or removing ("-") summary_serials `row` in summary_totals."""
+    missing = f"CASE WHEN {row}.Serial_Number IS NULL OR TRIM({row}.Serial_Number) = '' THEN {row}.n ELSE 0 END"
+    return (f"missing_serials = missing_serials {sign} ({missing}), "
+            f"single_catalog_serials = single_catalog_serials {sign} ({row}.suppliers = 1)")
+
+
+TRIGGERS = {
+    "summary_products_insert": f"AFTER INSERT ON {TABLE_NAME} BEGIN {_add('NEW')} END",
+    "summary_products_delete": f"AFTER DELETE ON {TABLE_NAME} BEGIN {_remove('OLD')} END",
+    "summary_products_update": f"""
+        AFTER UPDATE OF Serial_Number, Supplier, Packaging_Type, Units_Per_Carton ON {TABLE_NAME}
+        WHEN OLD.Serial_Number IS NOT NEW.Serial_Number OR OLD.Supplier IS NOT NEW.Supplier
+          OR OLD.Packaging_Type IS NOT NEW.Packaging_Type OR OLD.Units_Per_Carton IS NOT NEW.Units_Per_Carton
+        BEGIN {_remove('OLD')} {_add('NEW')} END""",
+    "summary_serials_insert":
+        f"AFTER INSERT ON summary_serials BEGIN UPDATE summary_totals SET {_totals('NEW', '+')}; END",
+    "summary_serials_delete":
+        f"AFTER DELETE ON summary_serials BEGIN UPDATE summary_totals SET {_totals('OLD', '-')}; END",
+    "summary_serials_update": f"""
+        AFTER UPDATE ON summary_serials BEGIN
+            UPDATE summary_totals SET {_totals('OLD', '-')};
+            UPDATE summary_totals SET {_totals('NEW', '+')};
+        END""",
+}
+
+
+def _existing(conn, kind: str) -> set:
+    return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+
+def summaries_ready(conn) -> bool:
+    """True when every summary table and trigger exists (so the tables are current)."""
+    return set(SUMMARIES) <= _existing(conn, "table") and set(TRIGGERS) <= _existing(conn, "trigger")
+
+
+def summary_tables(conn):
+    """SUMMARY_TABLES for report_queries.run_report when the summaries are ready, else None."""
+    return SUMMARY_TABLES if summaries_ready(conn) else None
+
+
+def rebuild_summaries(conn):
+    """Drop and rebuild every summary table from products (one grouped pass each), then the triggers."""
+    for name in TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for table, (columns, build) in SUMMARIES.items():
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"CREATE TABLE {table} ({columns})")
+        conn.execute(f"INSERT INTO {table} {build}")
+    for sql in SUMMARY_INDEXES:
+        conn.execute(sql)
+    for name, body in TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def ensure_summaries(conn) -> bool:
+    """Rebuild the summaries unless they are all in place; True if they were rebuilt."""
+    if summaries_ready(conn):
+        return False
+    rebuild_summaries(conn)
+    return True
+
+
+def check_summaries(conn) -> dict:
+    """
+    Recompute every summary from products and compare it with the maintained table:
+    summary table -> number of rows that differ (missing or extra on either side).
+    """
+    diffs = {}
+    for table, (_, build) in SUMMARIES.items():
+        if table == "summary_totals":
+            build = SERIAL_TOTALS.format(serials="temp.fresh_summary_serials")
+        conn.execute(f"DROP TABLE IF EXISTS temp.fresh_{table}")
+        conn.execute(f"CREATE TEMP TABLE fresh_{table} AS {build}")
+        diffs[table] = conn.execute(f"""
+            SELECT (SELECT COUNT(*) FROM (SELECT * FROM temp.fresh_{table} EXCEPT SELECT * FROM main.{table}))
+                 + (SELECT COUNT(*) FROM (SELECT * FROM main.{table} EXCEPT SELECT * FROM temp.fresh_{table}))
+        """).fetchone()[0]
+    for table in SUMMARIES:
+        conn.execute(f"DROP TABLE IF EXISTS temp.fresh_{table}")
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute the report summary tables and compare.")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--repair", action="store_true", help="rebuild the summaries when they differ")
+    args = parser.parse_args()
+
+    conn = connect(args.db, "write")
+    if not summaries_ready(conn):
+        if not args.repair:
+            sys.exit(f"❌ Summary tables are missing in {args.db}; run Sql_creation.py (or use --repair)")
+        with conn:
+            rebuild_summaries(conn)
+        print("🔧 Summaries built from products")
+
+    start = time.perf_counter()
+    diffs = check_summaries(conn)
+    elapsed = time.perf_counter() - start
+    for table, n in diffs.items():
+        print(f"{'✅' if not n else '❌'} {table}: {n:,} rows differ")
+    print(f"🔎 Recomputed from scratch in {elapsed:.2f}s")
+
+    bad = any(diffs.values())
+    if bad and args.repair:
+        with conn:
+            rebuild_summaries(conn)
+        print("🔧 Summaries rebuilt from products")
+    conn.close()
+    if bad:
+        sys.exit(1)
+    print("✅ Summary tables match products")
+
+
+if __name__ == "__main__":
+    main()
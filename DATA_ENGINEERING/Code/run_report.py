@@ -0,0 +1,133 @@
+"""
+Per-stage instrumentation for the merge ETL (Merging_code.py).
+
+`RunReport.stage(name, supplier)` wraps one step of the pipeline and records its
+wall time, rows in / out and the process peak memory (max RSS) when it ended.
+Entering the same (stage, supplier) again adds to the existing record, so the
+chunks of a streaming run add up to one line per supplier. Every finished stage
+is also logged through `logging`.
+
+With a profile directory, each (stage, supplier) runs under its own cProfile
+profiler and is dumped as <stage>[__<supplier>].prof for `python -m pstats` or
+snakeviz.
+
+`save(path)` writes the whole run as JSON: stages in execution order, totals per
+stage, extraction null rates, peak memory and any extra counters the pipeline
+attached (memo hit rates, delta counts, ...).
+"""
+
+# IMPORTS
+import cProfile
+import json
+import logging
+import os
+import re
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger("merge_etl")
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    """Peak resident set size so far, in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class RunReport:
+    def __init__(self, profile_dir: str = None, **info):
+        self.profile_dir = profile_dir
+        self.info = dict(info, started_at=datetime.now().isoformat(timespec="seconds"))
+        self.stages = {}          # (stage, supplier) -> record, in first-entry order
+        self.extraction = {}      # supplier -> {"rows": n, "<column>": null count}
+        self.counters = {}
+        self._profiles = {}
+        self._start = time.perf_counter()
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str, supplier: str = None, rows_in: int = None):
+        """
+        Time one pipeline step. The yielded dict takes the step's outcome:
+        `rows_out` (and `rows_in` when only known inside the block).
+        """
+        record = self.stages.setdefault((name, supplier), {
+            "stage": name, "supplier": supplier, "calls": 0, "seconds": 0.0,
+            "rows_in": 0, "rows_out": 0, "peak_rss_mb": 0.0,
+        })
+        outcome = {"rows_in": rows_in, "rows_out": None}
+        profiler = None
+        if self.profile_dir:
+            profiler = self._profiles.setdefault((name, supplier), cProfile.Profile())
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield outcome
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            record["calls"] += 1
+            record["seconds"] += elapsed
+            record["rows_in"] += outcome["rows_in"] or 0
+            record["rows_out"] += outcome["rows_out"] or 0
+            record["peak_rss_mb"] = peak_rss_mb()
+            logger.info("stage=%s supplier=%s seconds=%.3f rows_in=%s rows_out=%s peak_rss_mb=%.1f",
+                        name, supplier or "-", elapsed, outcome["rows_in"], outcome["rows_out"],
+                        record["peak_rss_mb"])
+
+    def timed_chunks(self, chunks, name: str, supplier: str = None):
+        """Yield from `chunks` (e.g. a read_csv chunk iterator), timing each read as `name`."""
+        iterator = iter(chunks)
+        while True:
+            with self.stage(name, supplier) as st:
+                chunk = next(iterator, None)
+                st["rows_out"] = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+    def record_extraction(self, supplier: str, df, columns):
+        """Count rows and nulls of the extracted `columns` of one processed frame."""
+        counts = self.extraction.setdefault(supplier, {"rows": 0, **{c: 0 for c in columns}})
+        counts["rows"] += len(df)
+        for c in columns:
+            counts[c] += int(df[c].isna().sum())
+
+    def to_dict(self) -> dict:
+        stages = [dict(r, seconds=round(r["seconds"], 4)) for r in self.stages.values()]
+        totals = {}
+        for r in stages:
+            totals[r["stage"]] = round(totals.get(r["stage"], 0.0) + r["seconds"], 4)
+        null_rates = {
+            supplier: {c: round(n / counts["rows"], 4) if counts["rows"] else None
+                       for c, n in counts.items() if c != "rows"}
+            for supplier, counts in self.extraction.items()
+        }
+        return {
+            **self.info,
+            "total_seconds": round(time.perf_counter() - self._start, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_children_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+            "stage_totals": totals,
+            "stages": stages,
+            "extraction_null_rates": null_rates,
+            **self.counters,
+        }
+
+    def save(self, path: str) -> dict:
+        report = self.to_dict()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, path)
+        for (name, supplier), profiler in self._profiles.items():
+            label = name if supplier is None else f"{name}__{re.sub(r'[^A-Za-z0-9]+', '_', supplier)}"
+            profiler.dump_stats(os.path.join(self.profile_dir, f"{label}.prof"))
+        logger.info("run report: total %.2fs, peak RSS %.1f MB, stages %s",
+                    report["total_seconds"], report["peak_rss_mb"], report["stage_totals"])
+        return report
@@ -0,0 +1,133 @@
+"""
+Shared SQLite connections for every pipeline stage.
+
+The scrapers (1URL, 3DATA), the cosine stage, Sql_creation.py and SQL Queries.py
+all open their databases through `connect(db_file, profile)`, so they get the same
+tuned settings and can run side by side on Url_output_amazon.db or the master
+database instead of failing with "database is locked":
+
+- write: WAL journal (readers never block the writer and the other way round),
+  synchronous=NORMAL (durable at checkpoints, no fsync per commit), 64 MB page
+  cache, 256 MB memory map, in-memory temp tables, and a 30 s busy timeout so a
+  stage waits for another stage's commit instead of failing
+- bulk_load: write with a 256 MB page cache, for Sql_creation.py
+- read: read-only (file opened with mode=ro), same cache, memory map and busy
+  timeout; temp tables still work (query_only is not set, it would refuse them)
+
+ConnectionPool keeps a few connections of one profile open for reuse, e.g. the
+read-only connections report_queries.run_report hands to its worker threads.
+The scripts of the stage folders under DATA_SCRAPING/CODE (1URL, 2COSINE, 3DATA)
+import this file from here: each appends DATA_ENGINEERING/Code (three levels up
+from its folder) to sys.path right before `from sqlite_connect import connect`.
+"""
+
+# IMPORTS
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# CONFIG
+BUSY_TIMEOUT_MS = 30_000
+MMAP_SIZE = 256 * 1024 * 1024
+
+# profile -> PRAGMA name -> value, applied in this order on every new connection
+PROFILES = {
+    "write": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": BUSY_TIMEOUT_MS,
+        "cache_size": -65536,        # 64 MB
+        "mmap_size": MMAP_SIZE,
+        "temp_store": "MEMORY",
+    },
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": BUSY_TIMEOUT_MS,
+        "cache_size": -262144,       # 256 MB
+        "mmap_size": MMAP_SIZE,
+        "temp_store": "MEMORY",
+    },
+    "read": {
+        "busy_timeout": BUSY_TIMEOUT_MS,
+        "cache_size": -65536,
+        "mmap_size": MMAP_SIZE,
+        "temp_store": "MEMORY",
+    },
+}
+READ_ONLY_PROFILES = {"read"}
+
+
+def connect(db_file: str, profile: str = "write", **kwargs) -> sqlite3.Connection:
+    """
+    New connection to `db_file` with the PRAGMAs of `profile`; extra keyword
+    arguments go to sqlite3.connect (e.g. check_same_thread=False).
+    Read-only profiles never create the file: a missing database raises
+    sqlite3.OperationalError.
+    """
+    pragmas = PROFILES[profile]
+    kwargs.setdefault("timeout", BUSY_TIMEOUT_MS / 1000)
+    if profile in READ_ONLY_PROFILES:
+        conn = sqlite3.connect(Path(db_file).absolute().as_uri() + "?mode=ro", uri=True, **kwargs)
+    else:
+        conn = sqlite3.connect(db_file, **kwargs)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Up to `size` connections to one database with one profile, opened on first
+    use and reused afterwards. `with pool.connection() as conn:` borrows one
+    (waiting when all are in use); a transaction left open is rolled back when
+    it is returned. Connections may be used from any thread, one borrower at a time.
+    """
+
+    def __init__(self, db_file: str, profile: str = "read", size: int = 4):
+        self.db_file = db_file
+        self.profile = profile
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return connect(self.db_file, self.profile, check_same_thread=False)
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        """Close every idle connection (call once all borrowers are done)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -28,7 +28,6 @@ Notes
 
 
 # IMPORTS 
-import sqlite3
 import json
 import logging
 import time
@@ -39,6 +38,12 @@ from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
 from playwright_stealth import stealth_sync
 import os
+import sys
+# shared SQLite connection profiles: DATA_ENGINEERING/Code/sqlite_connect.py, found through
+# this explicit path entry (three levels up from this stage folder)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                             "DATA_ENGINEERING", "Code"))
+from sqlite_connect import connect
 
 
 # CONFIGURATION
@@ -76,7 +81,7 @@ headers = {
 
 
 # DATABASE 
-conn = sqlite3.connect(DB_FILE)
+conn = connect(DB_FILE, "write")
 cursor = conn.cursor()
 cursor.execute("""
     CREATE TABLE IF NOT EXISTS top_product_urls (
@@ -357,7 +362,8 @@ Error handling and robustness
 Dependencies
 ------------
 - Python packages: pandas, beautifulsoup4, playwright, playwright-stealth (playwright_stealth),
-    sqlite3 (stdlib), json (stdlib), logging (stdlib), time, random, datetime, os.
+    sqlite3 (stdlib, opened through DATA_ENGINEERING/Code/sqlite_connect.py with the shared
+    WAL / busy-timeout "write" profile), json (stdlib), logging (stdlib), time, random, datetime, os.
 - Playwright browser binaries must be installed and available (e.g., `playwright install`).
 - The CSV input must contain headers "SL NO" and "Item Name".
 Security and etiquette
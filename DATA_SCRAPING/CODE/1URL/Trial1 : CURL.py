@@ -1,7 +1,6 @@
 # amazon_curl_cffi_search_scraper.py
 # Converted to use curl_cffi + BeautifulSoup for Amazon.ae search pages
 
-import sqlite3
 import json
 import logging
 import time
@@ -12,6 +11,12 @@ from bs4 import BeautifulSoup
 from curl_cffi import requests
 import os
 import urllib.parse
+import sys
+# shared SQLite connection profiles: DATA_ENGINEERING/Code/sqlite_connect.py, found through
+# this explicit path entry (three levels up from this stage folder)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                             "DATA_ENGINEERING", "Code"))
+from sqlite_connect import connect
 
 # --------------------------- CONFIG --------------------------- #
 BASE_URL = "https://www.amazon.ae/"
@@ -44,7 +49,7 @@ logging.basicConfig(
 logging.info("Amazon.ae (curl_cffi) URL Scraper started.")
 
 # --------------------------- DATABASE --------------------------- #
-conn = sqlite3.connect(DB_FILE)
+conn = connect(DB_FILE, "write")
 cursor = conn.cursor()
 cursor.execute("""
     CREATE TABLE IF NOT EXISTS top_product_urls (
@@ -1,5 +1,4 @@
 # --------------------------- IMPORTS --------------------------- #
-import sqlite3
 import json
 import logging
 import time
@@ -10,6 +9,12 @@ from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
 from playwright_stealth import stealth_sync
 import os
+import sys
+# shared SQLite connection profiles: DATA_ENGINEERING/Code/sqlite_connect.py, found through
+# this explicit path entry (three levels up from this stage folder)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                             "DATA_ENGINEERING", "Code"))
+from sqlite_connect import connect
 
 # --------------------------- CONFIG --------------------------- #
 BASE_URL = "https://www.amazon.ae/"
@@ -40,7 +45,7 @@ logging.basicConfig(
 logging.info("Amazon.ae Scraper started.")
 
 # --------------------------- DATABASE --------------------------- #
-conn = sqlite3.connect(DB_FILE)
+conn = connect(DB_FILE, "write")
 cursor = conn.cursor()
 cursor.execute("""
     CREATE TABLE IF NOT EXISTS top_product_urls (
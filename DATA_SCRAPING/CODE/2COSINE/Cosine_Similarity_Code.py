@@ -45,6 +45,7 @@ Logging and error handling:
 Dependencies:
 - scikit-learn (for TfidfVectorizer and cosine_similarity)
 - Python standard library: json, sqlite3, logging
+- DATA_ENGINEERING/Code/sqlite_connect.py (shared SQLite connection profiles)
 Usage:
 - Run the module as a script. It will initialize the database table if necessary,
     process all records in INPUT_JSON, write augmented results to OUTPUT_JSON, and
@@ -61,10 +62,16 @@ Notes and considerations:
 
 # importing necessary libraries
 import json
-import sqlite3
 import logging
+import os
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+import sys
+# shared SQLite connection profiles: DATA_ENGINEERING/Code/sqlite_connect.py, found through
+# this explicit path entry (three levels up from this stage folder)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                             "DATA_ENGINEERING", "Code"))
+from sqlite_connect import connect
 
 #CONFIG
 INPUT_JSON = "/home/anusha/Desktop/Servoo/DATA_SCRAPING/DATA/top_product_urls.json"
@@ -81,7 +88,7 @@ logging.basicConfig(
 
 #DATABASE SETUP
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH, "write")
     cur = conn.cursor()
     cur.execute('''
         CREATE TABLE IF NOT EXISTS url_similarity_results (
@@ -116,7 +123,7 @@ def main():
         logging.info(f"Loaded {len(data)} records from input JSON.")
 
         output_data = []
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(DB_PATH, "write")
         cur = conn.cursor()
 
         for record in data:
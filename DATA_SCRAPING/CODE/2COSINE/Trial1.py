@@ -1,10 +1,16 @@
 import json
 import logging
-import sqlite3
 from pathlib import Path
 from datetime import datetime
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+import os
+import sys
+# shared SQLite connection profiles: DATA_ENGINEERING/Code/sqlite_connect.py, found through
+# this explicit path entry (three levels up from this stage folder)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                             "DATA_ENGINEERING", "Code"))
+from sqlite_connect import connect
 
 # ---------------- CONFIG ---------------- #
 INPUT_JSON = "/home/anusha/Desktop/top_product_urls.json"
@@ -24,7 +30,7 @@ logging.info("=== Cosine Similarity Script Started ===")
 
 # ---------------- DATABASE SETUP ---------------- #
 def setup_database():
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH, "write")
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS url_similarity (
@@ -1,21 +1,37 @@
 # AMAZON DATA SCRAPER USING CURL
 
 import sqlite3
+import argparse
+import hashlib
 import time
 import random
-import csv
 import os
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from tqdm import tqdm
-from curl_cffi import requests
 from bs4 import BeautifulSoup
+from session_pool import get_session, close_sessions
+from scrape_sink import ScrapeSink
+import sys
+# shared SQLite connection profiles: DATA_ENGINEERING/Code/sqlite_connect.py, found through
+# this explicit path entry (three levels up from this stage folder)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                             "DATA_ENGINEERING", "Code"))
+from sqlite_connect import connect
 
 # ------------------ USER CONFIG ------------------
 DB_FILE = "/home/anusha/Desktop/Servoo/DATA_SCRAPING/DATA/Url_output_amazon.db"
 USER_AGENTS_FILE = "/home/anusha/Desktop/DATAHUT/Macys_clothing/user_agents.txt"
 OUTPUT_CSV = "/home/anusha/Desktop/Servoo/DATA_SCRAPING/DATA/Servoo_Scraped_Data.csv"
 OUTPUT_TABLE = "scraped_products"
+OUTPUT_COLUMNS = ["Scrape_ID","Serial_Number","Product_Name","Matched_Product_Name",
+                  "Description","Price_AED","Image_URL","Barcode","Source_URL","Source_Website","Last_Updated"]
+CSV_HEADER = ["Scrape_ID","Serial_Number","Product_Name","Matched_Product_Name",
+              "Description","Price (AED)","Image_URL","Barcode","Source_URL","Source_Website","Last_Updated"]
+SINK_BATCH_SIZE = 50
+RETRY_TABLE = "retry_queue"
+DEAD_LETTER_TABLE = "dead_letter"
+REFRESH_TABLE = "refresh_state"
 
 BASE_HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
@@ -27,6 +43,32 @@ BASE_HEADERS = {
 MIN_DELAY = 2.0
 MAX_DELAY = 6.0
 
+# Proxies to rotate through (None = direct). Each (user agent, proxy) pair gets
+# its own persistent session, so keep MAX_IDENTITIES small to reuse connections.
+PROXIES = [None]
+MAX_IDENTITIES = 4
+
+# Failed fetches / anti-bot blocks are retried with exponential backoff
+# (RETRY_BASE_DELAY * 2**(attempt-1), capped) before going to the dead-letter table.
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 60        # seconds
+RETRY_MAX_DELAY = 6 * 3600   # seconds
+
+# Refresh mode (--refresh): a product is due once its age since the last check
+# exceeds REFRESH_INTERVAL_HOURS / (1 + VOLATILITY_WEIGHT * price-change rate),
+# so products whose price keeps changing come round sooner than stable ones.
+# VOLATILITY_WEIGHT is derived from the two ends of that range: a stable price
+# (rate 0) is re-checked every REFRESH_INTERVAL_HOURS, a price that changed at
+# every check (rate 1) every REFRESH_MIN_INTERVAL_HOURS (14 days -> 1 day: 13).
+# A failed check (fetch error, 4xx/5xx, anti-bot page) still counts as a visit:
+# last_checked moves on and the next interval doubles per consecutive failure
+# (at most 2**REFRESH_MAX_BACKOFF), so dead URLs cannot keep the head of the queue.
+REFRESH_INTERVAL_HOURS = 24 * 14
+REFRESH_MIN_INTERVAL_HOURS = 24
+VOLATILITY_WEIGHT = REFRESH_INTERVAL_HOURS / REFRESH_MIN_INTERVAL_HOURS - 1
+REFRESH_MAX_BACKOFF = 3
+REFRESH_LIMIT = 500
+
 SOURCE_WEBSITE = "https://www.amazon.ae/"
 
 logging.basicConfig(
@@ -71,43 +113,163 @@ def prepare_output_table(conn):
     """)
     conn.commit()
 
-def append_to_csv(row, csv_path=OUTPUT_CSV):
-    header = ["Scrape_ID","Serial_Number","Product_Name","Matched_Product_Name",
-              "Description","Price (AED)","Image_URL","Barcode","Source_URL","Source_Website","Last_Updated"]
-    write_header = not os.path.exists(csv_path)
-    with open(csv_path, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow(header)
-        writer.writerow(row)
-
-def insert_output_table(conn, row):
+def prepare_retry_tables(conn):
     cur = conn.cursor()
     cur.execute(f"""
-        INSERT INTO {OUTPUT_TABLE} (
-            Scrape_ID, Serial_Number, Product_Name, Matched_Product_Name,
-            Description, Price_AED, Image_URL, Barcode, Source_URL, Source_Website, Last_Updated
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, row)
+        CREATE TABLE IF NOT EXISTS {RETRY_TABLE} (
+            id INTEGER PRIMARY KEY,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT,
+            last_error TEXT
+        )
+    """)
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DEAD_LETTER_TABLE} (
+            id INTEGER PRIMARY KEY,
+            serial_number TEXT,
+            matched_url TEXT,
+            attempts INTEGER,
+            last_error TEXT,
+            failed_at TEXT
+        )
+    """)
     conn.commit()
 
 def fetch_all_rows(conn):
+    """Unscraped rows, skipping dead letters and queued retries whose backoff has not expired."""
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT u.id, u.serial_number, u.input_title, u.matched_url, u.status
+        FROM url_similarity u
+        LEFT JOIN {RETRY_TABLE} r ON r.id = u.id
+        WHERE IFNULL(u.scraped,0) = 0
+          AND u.id NOT IN (SELECT id FROM {DEAD_LETTER_TABLE})
+          AND (r.id IS NULL OR r.next_attempt_at <= ?)
+    """, (datetime.utcnow().isoformat(),))
+    return cur.fetchall()
+
+def fetch_failed_rows(conn):
+    """Rows waiting in the retry queue or the dead-letter table (for --retry-failed).
+
+    Read only: backoff is ignored since the operator asked for the retry explicitly,
+    but nothing is moved here. A dead letter leaves the table only when its retry
+    succeeds (ScrapeSink deletes it with the scraped row); a failed retry keeps it
+    there with the attempt count raised, so an aborted run loses no failure history.
+    """
     cur = conn.cursor()
-    cur.execute("""
-        SELECT id, serial_number, input_title, matched_url, status
-        FROM url_similarity
-        WHERE IFNULL(scraped,0) = 0
+    cur.execute(f"""
+        SELECT u.id, u.serial_number, u.input_title, u.matched_url, u.status
+        FROM url_similarity u
+        WHERE IFNULL(u.scraped,0) = 0
+          AND (u.id IN (SELECT id FROM {RETRY_TABLE}) OR u.id IN (SELECT id FROM {DEAD_LETTER_TABLE}))
     """)
     return cur.fetchall()
 
-def mark_scraped(conn, scrape_id):
+def schedule_retry(conn, scrape_id, serial, url, error):
+    """Record a failed attempt; after MAX_ATTEMPTS the row moves to the dead-letter table.
+
+    Attempts count over the row's whole history, so a dead letter retried with
+    --retry-failed that fails again stays a dead letter with one more attempt.
+    """
     cur = conn.cursor()
-    cur.execute("UPDATE url_similarity SET scraped = 1 WHERE id = ?", (scrape_id,))
+    cur.execute(f"""
+        SELECT COALESCE((SELECT attempts FROM {RETRY_TABLE} WHERE id = ?),
+                        (SELECT attempts FROM {DEAD_LETTER_TABLE} WHERE id = ?), 0)
+    """, (scrape_id, scrape_id))
+    attempts = cur.fetchone()[0] + 1
+    now = datetime.utcnow()
+    if attempts >= MAX_ATTEMPTS:
+        logging.warning("Giving up on id=%s after %d attempts: %s", scrape_id, attempts, error)
+        cur.execute(f"""
+            INSERT OR REPLACE INTO {DEAD_LETTER_TABLE} (id, serial_number, matched_url, attempts, last_error, failed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (scrape_id, serial, url, attempts, error, now.isoformat()))
+        cur.execute(f"DELETE FROM {RETRY_TABLE} WHERE id = ?", (scrape_id,))
+    else:
+        delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+        next_at = (now + timedelta(seconds=delay)).isoformat()
+        cur.execute(f"""
+            INSERT OR REPLACE INTO {RETRY_TABLE} (id, attempts, next_attempt_at, last_error)
+            VALUES (?, ?, ?, ?)
+        """, (scrape_id, attempts, next_at, error))
     conn.commit()
 
-def get_page(url, headers, timeout=3000):
+def prepare_refresh_table(conn):
+    cur = conn.cursor()
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {REFRESH_TABLE} (
+            Scrape_ID INTEGER PRIMARY KEY,
+            content_hash TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            last_checked TEXT,
+            checks INTEGER NOT NULL DEFAULT 0,
+            price_changes INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cur.execute(f"PRAGMA table_info({REFRESH_TABLE})")
+    if "failures" not in [r[1] for r in cur.fetchall()]:
+        cur.execute(f"ALTER TABLE {REFRESH_TABLE} ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+    conn.commit()
+
+def fetch_due_refresh_rows(conn, limit=REFRESH_LIMIT):
+    """Scraped products whose volatility-weighted age has passed the refresh interval
+    (doubled per consecutive failed check), most overdue first."""
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT * FROM (
+            SELECT p.Scrape_ID, p.Serial_Number, p.Product_Name, p.Matched_Product_Name,
+                   p.Description, p.Price_AED, p.Image_URL, p.Barcode, p.Source_URL,
+                   r.content_hash, r.etag, r.last_modified,
+                   (julianday(?) - julianday(COALESCE(r.last_checked, p.Last_Updated))) * 24.0
+                   * (1.0 + ? * IFNULL(r.price_changes, 0) * 1.0 / MAX(IFNULL(r.checks, 0), 1))
+                   / (? * (1 << MIN(IFNULL(r.failures, 0), ?))) AS overdue
+            FROM {OUTPUT_TABLE} p
+            LEFT JOIN {REFRESH_TABLE} r ON r.Scrape_ID = p.Scrape_ID
+            WHERE p.Source_URL LIKE 'http%' AND p.Product_Name != 'Not Available'
+        )
+        WHERE overdue >= 1.0
+        ORDER BY overdue DESC
+        LIMIT ?
+    """, (datetime.utcnow().isoformat(), VOLATILITY_WEIGHT, REFRESH_INTERVAL_HOURS, REFRESH_MAX_BACKOFF, limit))
+    return cur.fetchall()
+
+def content_hash(fields):
+    return hashlib.sha1("\x1f".join(str(f) for f in fields).encode("utf-8")).hexdigest()
+
+def record_refresh_check(conn, scrape_id, digest, resp, price_changed):
+    conn.execute(f"""
+        INSERT INTO {REFRESH_TABLE} (Scrape_ID, content_hash, etag, last_modified, last_checked, checks, price_changes)
+        VALUES (?, ?, ?, ?, ?, 1, ?)
+        ON CONFLICT(Scrape_ID) DO UPDATE SET
+            content_hash = excluded.content_hash,
+            etag = COALESCE(excluded.etag, etag),
+            last_modified = COALESCE(excluded.last_modified, last_modified),
+            last_checked = excluded.last_checked,
+            checks = checks + 1,
+            price_changes = price_changes + excluded.price_changes,
+            failures = 0
+    """, (scrape_id, digest, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+          datetime.utcnow().isoformat(), int(price_changed)))
+
+def record_refresh_failure(conn, scrape_id):
+    """Count a failed check: moves last_checked on and backs the product off (see REFRESH_MAX_BACKOFF)."""
+    conn.execute(f"""
+        INSERT INTO {REFRESH_TABLE} (Scrape_ID, last_checked, failures)
+        VALUES (?, ?, 1)
+        ON CONFLICT(Scrape_ID) DO UPDATE SET
+            last_checked = excluded.last_checked,
+            failures = failures + 1
+    """, (scrape_id, datetime.utcnow().isoformat()))
+
+def build_identities(user_agents):
+    agents = random.sample(user_agents, min(MAX_IDENTITIES, len(user_agents))) if user_agents else ["Mozilla/5.0"]
+    return [(ua, proxy) for ua in agents for proxy in PROXIES]
+
+def get_page(url, headers, proxy=None):
     try:
-        return requests.get(url, headers=headers, timeout=timeout)
+        return get_session(headers["User-Agent"], proxy).get(url, headers=headers)
     except Exception as e:
         logging.exception("HTTP error for %s: %s", url, e)
         return None
@@ -188,23 +350,66 @@ def extract_barcode(soup):
         return cand[0]
     return "Not Available"
 
+def is_blocked(soup):
+    page_text = soup.get_text(" ", strip=True).lower()
+    return any(x in page_text for x in ["robot check","press and hold","enter the characters you see"])
+
+def extract_product_fields(soup):
+    """(Product_Name, Description, Price_AED, Image_URL, Barcode) for a product page."""
+    return (
+        extract_title(soup) or "Not Available",
+        extract_description_bullets(soup),
+        extract_price(soup) or "Not Available",
+        extract_image(soup) or "Not Available",
+        extract_barcode(soup) or "Not Available",
+    )
+
 # ---------------- MAIN -----------------
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape Amazon.ae product details for matched URLs.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--retry-failed", action="store_true",
+                      help="only re-fetch rows in the retry queue or dead-letter table")
+    mode.add_argument("--refresh", action="store_true",
+                      help="re-check already scraped products that are due by staleness/volatility")
+    parser.add_argument("--refresh-limit", type=int, default=REFRESH_LIMIT,
+                        help="maximum products to re-check in one --refresh run")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     user_agents = load_user_agents(USER_AGENTS_FILE)
-    conn = sqlite3.connect(DB_FILE)
+    identities = build_identities(user_agents)
+    conn = connect(DB_FILE, "write")
     conn.row_factory = sqlite3.Row
 
     ensure_scraped_column(conn)
     prepare_output_table(conn)
+    prepare_retry_tables(conn)
+    prepare_refresh_table(conn)
 
-    rows = fetch_all_rows(conn)
-    logging.info("Total rows to scrape: %d", len(rows))
-    if not rows:
-        return
+    sink = ScrapeSink(conn, OUTPUT_CSV, OUTPUT_TABLE, OUTPUT_COLUMNS, CSV_HEADER,
+                      retry_table=RETRY_TABLE, dead_letter_table=DEAD_LETTER_TABLE,
+                      batch_size=SINK_BATCH_SIZE)
+    try:
+        if args.refresh:
+            rows = fetch_due_refresh_rows(conn, args.refresh_limit)
+            logging.info("Total rows due for refresh: %d", len(rows))
+            refresh_rows(rows, identities, conn, sink)
+        else:
+            rows = fetch_failed_rows(conn) if args.retry_failed else fetch_all_rows(conn)
+            logging.info("Total rows to scrape: %d", len(rows))
+            scrape_rows(rows, identities, conn, sink)
+    finally:
+        sink.close()
+        close_sessions()
+        conn.close()
+    logging.info("Scraping complete.")
 
+def scrape_rows(rows, identities, conn, sink):
     for r in tqdm(rows, desc="Scraping Products"):
         scrape_id, serial, matched_product_name, url, status = r
-        ua = random.choice(user_agents) if user_agents else "Mozilla/5.0"
+        ua, proxy = random.choice(identities)
         headers = BASE_HEADERS.copy()
         headers["User-Agent"] = ua
 
@@ -217,57 +422,78 @@ def main():
                 "Not Available", "Not Available", "Not Available", "Not Available",
                 url if url else "Not Available", SOURCE_WEBSITE, now
             )
-            append_to_csv(row_out)
-            insert_output_table(conn, row_out)
-            mark_scraped(conn, scrape_id)
+            sink.write(row_out)
             continue
 
-        resp = get_page(url, headers)
+        resp = get_page(url, headers, proxy)
         if resp is None or not hasattr(resp, "status_code") or resp.status_code >= 400:
             logging.warning("Failed to fetch %s", url)
-            row_out = (
-                scrape_id, serial, "Not Available", matched_product_name,
-                "Not Available", "Not Available", "Not Available", "Not Available",
-                url, SOURCE_WEBSITE, now
-            )
-            append_to_csv(row_out)
-            insert_output_table(conn, row_out)
-            mark_scraped(conn, scrape_id)
+            error = f"HTTP {resp.status_code}" if resp is not None and hasattr(resp, "status_code") else "request error"
+            schedule_retry(conn, scrape_id, serial, url, error)
             continue
 
         soup = BeautifulSoup(resp.text, "lxml")
-        page_text = soup.get_text(" ", strip=True).lower()
-        if any(x in page_text for x in ["robot check","press and hold","enter the characters you see"]):
+        if is_blocked(soup):
             logging.warning("Blocked by anti-bot: %s", url)
-            row_out = (
-                scrape_id, serial, "Not Available", matched_product_name,
-                "Blocked by anti-bot", "Not Available", "Not Available", "Not Available",
-                url, SOURCE_WEBSITE, now
-            )
-            append_to_csv(row_out)
-            insert_output_table(conn, row_out)
-            mark_scraped(conn, scrape_id)
+            schedule_retry(conn, scrape_id, serial, url, "Blocked by anti-bot")
             continue
 
-        product_name = extract_title(soup) or "Not Available"
-        description = extract_description_bullets(soup)
-        price = extract_price(soup) or "Not Available"
-        image_url = extract_image(soup) or "Not Available"
-        barcode = extract_barcode(soup) or "Not Available"
+        fields = extract_product_fields(soup)
+        row_out = (scrape_id, serial, fields[0], matched_product_name) + fields[1:] + (url, SOURCE_WEBSITE, now)
 
-        row_out = (
-            scrape_id, serial, product_name, matched_product_name,
-            description, price, image_url, barcode, url, SOURCE_WEBSITE, now
-        )
-
-        append_to_csv(row_out)
-        insert_output_table(conn, row_out)
-        mark_scraped(conn, scrape_id)
+        sink.write(row_out)
 
         time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
 
-    conn.close()
-    logging.info("Scraping complete.")
+def refresh_rows(rows, identities, conn, sink):
+    """Re-check due products; only pages whose extracted fields changed are written back."""
+    unchanged = changed = failed = 0
+    for r in tqdm(rows, desc="Refreshing Products"):
+        scrape_id, serial, name, matched_product_name, description, price, image_url, barcode, url = r[:9]
+        old_fields = (name, description, price, image_url, barcode)
+        old_hash = r["content_hash"] or content_hash(old_fields)
+        ua, proxy = random.choice(identities)
+        headers = BASE_HEADERS.copy()
+        headers["User-Agent"] = ua
+        if r["etag"]:
+            headers["If-None-Match"] = r["etag"]
+        if r["last_modified"]:
+            headers["If-Modified-Since"] = r["last_modified"]
+
+        resp = get_page(url, headers, proxy)
+        if resp is not None and getattr(resp, "status_code", None) == 304:
+            with conn:
+                record_refresh_check(conn, scrape_id, old_hash, resp, False)
+            unchanged += 1
+            continue
+        if resp is None or not hasattr(resp, "status_code") or resp.status_code >= 400:
+            logging.warning("Refresh fetch failed for %s", url)
+            with conn:
+                record_refresh_failure(conn, scrape_id)
+            failed += 1
+            continue
+        soup = BeautifulSoup(resp.text, "lxml")
+        if is_blocked(soup):
+            logging.warning("Blocked by anti-bot during refresh: %s", url)
+            with conn:
+                record_refresh_failure(conn, scrape_id)
+            failed += 1
+            continue
+
+        fields = extract_product_fields(soup)
+        digest = content_hash(fields)
+        # one transaction per product: the stored hash never runs ahead of the row
+        with conn:
+            if digest == old_hash:
+                unchanged += 1
+            else:
+                changed += 1
+                sink.update((scrape_id, serial, fields[0], matched_product_name) + fields[1:]
+                            + (url, SOURCE_WEBSITE, datetime.utcnow().isoformat()))
+            record_refresh_check(conn, scrape_id, digest, resp, fields[2] != price)
+
+        time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
+    logging.info("Refresh done: %d changed, %d unchanged, %d failed", changed, unchanged, failed)
 
 if __name__ == "__main__":
     main()
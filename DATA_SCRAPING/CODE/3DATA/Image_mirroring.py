@@ -0,0 +1,230 @@
+# PRODUCT IMAGE MIRRORING
+"""Mirror the Image_URL values of the scraped products into local storage.
+
+The catalog and the Power BI report used to hotlink m.media-amazon.com, which is
+slow and breaks when Amazon rotates image URLs. This stage:
+
+- reads OUTPUT_CSV (Servoo_Scraped_Data.csv) and collects the distinct image URLs,
+- skips URLs already recorded in the manifest from earlier runs,
+- downloads the rest concurrently on a bounded thread pool (one curl_cffi session
+  per worker thread, so connections are reused),
+- stores every image once under IMAGE_DIR/<sha256[:2]>/<sha256><ext>, so the same
+  picture served from two URLs is kept only once,
+- optionally renders thumbnails in a process pool (needs Pillow), only for the
+  images of the current CSV that have none yet,
+- writes MIRRORED_CSV: the input rows plus Local_Image_Path (and
+  Local_Thumbnail_Path when thumbnails are enabled).
+
+Image_mirroring_check.py runs this stage end to end against a local HTTP server.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from curl_cffi import requests
+import session_pool
+
+# CONFIG
+OUTPUT_CSV = "/home/anusha/Desktop/Servoo/DATA_SCRAPING/DATA/Servoo_Scraped_Data.csv"
+MIRRORED_CSV = "/home/anusha/Desktop/Servoo/DATA_SCRAPING/DATA/Servoo_Scraped_Data_Mirrored.csv"
+IMAGE_DIR = "/home/anusha/Desktop/Servoo/DATA_SCRAPING/DATA/images"
+MAX_WORKERS = 8
+THUMBNAIL_SIZE = (160, 160)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+CONTENT_TYPE_EXT = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+
+_local = threading.local()
+
+
+# ------------------ HELPERS ------------------
+def load_manifest(path):
+    """url -> {"sha256", "path", "fetched_at"} for every image mirrored so far."""
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            logging.warning("Corrupted manifest %s, starting fresh", path)
+    return {}
+
+def save_manifest(path, manifest):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+def thread_session():
+    # curl handles are not thread-safe, so each worker thread keeps its own session
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session(
+            impersonate=session_pool.IMPERSONATE,
+            timeout=(session_pool.CONNECT_TIMEOUT, session_pool.READ_TIMEOUT),
+        )
+        _local.session.headers.update({"User-Agent": USER_AGENT})
+    return _local.session
+
+def image_extension(url, content_type):
+    ext = CONTENT_TYPE_EXT.get((content_type or "").split(";")[0].strip().lower())
+    if ext:
+        return ext
+    ext = os.path.splitext(url.split("?")[0])[1].lower()
+    return ext if ext in CONTENT_TYPE_EXT.values() else ".img"
+
+def store_image(image_dir, data, ext):
+    """Write `data` under its content hash; identical bytes are stored only once."""
+    digest = hashlib.sha256(data).hexdigest()
+    folder = os.path.join(image_dir, digest[:2])
+    path = os.path.join(folder, digest + ext)
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        tmp_path = path + f".{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return digest, path
+
+def download_image(url, image_dir):
+    resp = thread_session().get(url)
+    if resp.status_code >= 400:
+        raise IOError(f"HTTP {resp.status_code}")
+    if not resp.content:
+        raise IOError("empty body")
+    return store_image(image_dir, resp.content, image_extension(url, resp.headers.get("Content-Type")))
+
+def make_thumbnail(src_path, thumb_path, size=THUMBNAIL_SIZE):
+    # runs in a worker process
+    from PIL import Image
+    if os.path.exists(thumb_path):
+        return thumb_path
+    with Image.open(src_path) as img:
+        img.thumbnail(size)
+        img.convert("RGB").save(thumb_path, "JPEG", quality=85)
+    return thumb_path
+
+def thumbnail_path(image_dir, digest):
+    return os.path.join(image_dir, "thumbs", digest + ".jpg")
+
+
+# ---------------- MAIN -----------------
+def mirror_images(urls, image_dir, manifest, workers=MAX_WORKERS):
+    """Download every URL not yet in `manifest`; returns (downloaded, failed) counts."""
+    pending = [u for u in urls if u not in manifest or not os.path.exists(manifest[u]["path"])]
+    logging.info("%d distinct image URLs, %d already mirrored, %d to fetch",
+                 len(urls), len(urls) - len(pending), len(pending))
+    downloaded = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(download_image, u, image_dir): u for u in pending}
+        for fut in as_completed(futures):
+            url = futures[fut]
+            try:
+                digest, path = fut.result()
+            except Exception as e:
+                logging.warning("Image download failed for %s: %s", url, e)
+                failed += 1
+                continue
+            manifest[url] = {"sha256": digest, "path": path, "fetched_at": datetime.utcnow().isoformat()}
+            downloaded += 1
+    return downloaded, failed
+
+def build_thumbnails(image_dir, entries, workers):
+    """Thumbnails for the manifest `entries` of this run: sha256 -> thumbnail path.
+
+    Existing thumbnails are returned without touching the process pool, so a run
+    only renders the images that are new to the store.
+    """
+    os.makedirs(os.path.join(image_dir, "thumbs"), exist_ok=True)
+    by_digest = {v["sha256"]: v["path"] for v in entries}
+    thumbs = {}
+    missing = {}
+    for digest, path in by_digest.items():
+        thumb = thumbnail_path(image_dir, digest)
+        if os.path.exists(thumb):
+            thumbs[digest] = thumb
+        else:
+            missing[digest] = path
+    if not missing:
+        return thumbs
+    with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+        futures = {
+            pool.submit(make_thumbnail, path, thumbnail_path(image_dir, digest)): digest
+            for digest, path in missing.items()
+        }
+        for fut in as_completed(futures):
+            digest = futures[fut]
+            try:
+                thumbs[digest] = fut.result()
+            except Exception as e:
+                logging.warning("Thumbnail failed for %s: %s", by_digest[digest], e)
+    return thumbs
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mirror scraped product images into content-addressed storage.")
+    parser.add_argument("--csv", default=OUTPUT_CSV, help="scraped products CSV with an Image_URL column")
+    parser.add_argument("--out-csv", default=MIRRORED_CSV, help="CSV to write with the local path columns")
+    parser.add_argument("--image-dir", default=IMAGE_DIR, help="root of the content-addressed image store")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="concurrent downloads")
+    parser.add_argument("--thumbnails", action="store_true", help="also render thumbnails (requires Pillow)")
+    return parser.parse_args()
+
+def mirror_csv(csv_path, out_csv, image_dir, workers=MAX_WORKERS, thumbnails=False):
+    """Mirror the images of `csv_path` and write `out_csv`; returns the run's counts."""
+    os.makedirs(image_dir, exist_ok=True)
+    manifest_path = os.path.join(image_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames)
+        rows = list(reader)
+
+    urls = list(dict.fromkeys(
+        r["Image_URL"] for r in rows if (r.get("Image_URL") or "").startswith("http")
+    ))
+    try:
+        downloaded, failed = mirror_images(urls, image_dir, manifest, workers)
+    finally:
+        save_manifest(manifest_path, manifest)
+    logging.info("Downloaded %d images (%d failed), %d unique files in store",
+                 downloaded, failed, len({v["sha256"] for v in manifest.values()}))
+
+    current = [manifest[u] for u in urls if u in manifest]
+    thumbs = build_thumbnails(image_dir, current, workers) if thumbnails else {}
+
+    extra = ["Local_Image_Path"] + (["Local_Thumbnail_Path"] if thumbnails else [])
+    with open(out_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames + extra)
+        writer.writeheader()
+        for r in rows:
+            entry = manifest.get(r.get("Image_URL"))
+            r["Local_Image_Path"] = entry["path"] if entry else "Not Available"
+            if thumbnails:
+                r["Local_Thumbnail_Path"] = thumbs.get(entry["sha256"], "Not Available") if entry else "Not Available"
+            writer.writerow(r)
+    logging.info("Mirrored CSV written to %s", out_csv)
+    return {"urls": len(urls), "downloaded": downloaded, "failed": failed, "thumbnails": len(thumbs)}
+
+def main():
+    args = parse_args()
+    mirror_csv(args.csv, args.out_csv, args.image_dir, args.workers, args.thumbnails)
+
+if __name__ == "__main__":
+    main()
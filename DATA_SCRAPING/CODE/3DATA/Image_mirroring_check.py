@@ -0,0 +1,149 @@
+# IMAGE MIRRORING CHECK
+"""End-to-end check of Image_mirroring.py against a local HTTP server.
+
+Serves a few generated images (one of them under two URLs, plus a URL that
+returns 404) from a temporary folder with `http.server`, then runs
+`mirror_csv` twice:
+
+1. full CSV with thumbnails: every image is downloaded, the two URLs of the
+   same picture share one file, the 404 is counted as failed, every row points
+   at a file whose bytes match what the server sent, one thumbnail per picture
+2. a CSV with only part of the rows: nothing is downloaded again (only the 404
+   is retried), and thumbnails are only looked at for this CSV's images (a
+   deleted thumbnail of an image not in the CSV stays deleted)
+
+Exit code 1 if any expectation fails.
+
+Usage
+-----
+    python Image_mirroring_check.py
+    python Image_mirroring_check.py --images 20 --workdir /tmp --keep
+"""
+
+import argparse
+import csv
+import functools
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+from Image_mirroring import mirror_csv, thumbnail_path
+
+# CONFIG
+DEFAULT_IMAGES = 6
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def make_images(folder, count):
+    """count PNGs of different colours: file name -> sha256 of the served bytes."""
+    digests = {}
+    for i in range(count):
+        name = f"img_{i}.png"
+        Image.new("RGB", (320, 240), (40 * i % 256, 90, 200 - 10 * i % 200)).save(os.path.join(folder, name))
+        with open(os.path.join(folder, name), "rb") as f:
+            digests[name] = hashlib.sha256(f.read()).hexdigest()
+    return digests
+
+
+def write_csv(path, urls):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Scrape_ID", "Image_URL"])
+        writer.writerows((i, url) for i, url in enumerate(urls))
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def run_check(images, workdir):
+    failures = []
+
+    def expect(ok, message):
+        if not ok:
+            failures.append(message)
+            print(f"   ❌ {message}")
+
+    serve_dir = os.path.join(workdir, "served")
+    image_dir = os.path.join(workdir, "store")
+    os.makedirs(serve_dir)
+    digests = make_images(serve_dir, images)
+    shutil.copy(os.path.join(serve_dir, "img_0.png"), os.path.join(serve_dir, "alias_of_0.png"))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=serve_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        urls = [base + name for name in digests] + [base + "alias_of_0.png", base + "missing.png"]
+        full_csv = os.path.join(workdir, "full.csv")
+        write_csv(full_csv, urls + [urls[1], "Not Available"])
+
+        print("1. full CSV, empty store")
+        counts = mirror_csv(full_csv, os.path.join(workdir, "full_out.csv"), image_dir, workers=4, thumbnails=True)
+        expect(counts["urls"] == images + 2, f"distinct URLs {counts['urls']} != {images + 2}")
+        expect(counts["downloaded"] == images + 1, f"downloaded {counts['downloaded']} != {images + 1}")
+        expect(counts["failed"] == 1, f"failed {counts['failed']} != 1")
+        expect(counts["thumbnails"] == images, f"thumbnails {counts['thumbnails']} != {images}")
+        stored = [name for root, _, files in os.walk(image_dir) if "thumbs" not in root
+                  for name in files if name != "manifest.json"]
+        expect(len(stored) == images, f"{len(stored)} files in the store, expected {images} (alias deduplicated)")
+        for row in read_csv(os.path.join(workdir, "full_out.csv")):
+            name = row["Image_URL"].rsplit("/", 1)[-1]
+            if name in digests or name == "alias_of_0.png":
+                with open(row["Local_Image_Path"], "rb") as f:
+                    got = hashlib.sha256(f.read()).hexdigest()
+                expect(got == digests.get(name, digests["img_0.png"]), f"{name}: stored bytes differ from served bytes")
+                expect(os.path.exists(row["Local_Thumbnail_Path"]), f"{name}: no thumbnail")
+            else:
+                expect(row["Local_Image_Path"] == "Not Available", f"{row['Image_URL']}: expected Not Available")
+
+        print("2. partial CSV, warm store")
+        dropped = thumbnail_path(image_dir, digests[f"img_{images - 1}.png"])
+        os.remove(dropped)
+        partial_csv = os.path.join(workdir, "partial.csv")
+        write_csv(partial_csv, urls[:2] + [urls[-1]])
+        counts = mirror_csv(partial_csv, os.path.join(workdir, "partial_out.csv"), image_dir, workers=4,
+                            thumbnails=True)
+        expect(counts["downloaded"] == 0, f"downloaded {counts['downloaded']} != 0 on a warm store")
+        expect(counts["failed"] == 1, f"failed {counts['failed']} != 1 (the 404 is retried)")
+        expect(counts["thumbnails"] == 2, f"thumbnails {counts['thumbnails']} != 2")
+        expect(not os.path.exists(dropped), "thumbnail of an image outside the CSV was rebuilt")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=DEFAULT_IMAGES, help="distinct images to serve (at least 3)")
+    parser.add_argument("--workdir", default=tempfile.gettempdir(), help="where the check's files are written")
+    parser.add_argument("--keep", action="store_true", help="keep the served files and the store")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="image_mirroring_check_", dir=args.workdir)
+    try:
+        ok = run_check(max(3, args.images), workdir)
+    finally:
+        if args.keep:
+            print(f"   files kept in {workdir}")
+        else:
+            shutil.rmtree(workdir)
+    if not ok:
+        sys.exit(1)
+    print("✅ Image mirroring check passed")
+
+
+if __name__ == "__main__":
+    main()
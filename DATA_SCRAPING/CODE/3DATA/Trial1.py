@@ -30,6 +30,12 @@ from tqdm import tqdm
 from curl_cffi import requests   # curl-cffi provides a requests-like API
 from bs4 import BeautifulSoup
 import pandas as pd
+import sys
+# shared SQLite connection profiles: DATA_ENGINEERING/Code/sqlite_connect.py, found through
+# this explicit path entry (three levels up from this stage folder)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                             "DATA_ENGINEERING", "Code"))
+from sqlite_connect import connect
 
 # ------------------ USER CONFIG ------------------
 DB_FILE = "/home/anusha/Desktop/sevoo_task/servoo_task/DATA_SCRAPING_TASK/DATA/Url_output_amazon.db"
@@ -249,7 +255,7 @@ def main():
     if not user_agents:
         logging.warning("No user agents loaded - proceeding with default UA in BASE_HEADERS")
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect(DB_FILE, "write")
     conn.row_factory = sqlite3.Row
 
     ensure_scraped_column(conn)
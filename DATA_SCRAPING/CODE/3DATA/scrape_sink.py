@@ -0,0 +1,126 @@
+# UNIFIED CSV + SQLITE SINK FOR THE DETAIL SCRAPER
+"""Single output sink for scraped product rows.
+
+Every row has to land in three places: the output CSV, the `scraped_products`
+table and the `scraped` flag on `url_similarity`. Doing that per row meant three
+opens/commits and no atomicity. `ScrapeSink` buffers rows and, per batch,
+
+1. inserts them and sets `scraped = 1` (and drops any retry-queue or dead-letter
+   entry) inside one SQLite transaction, then
+2. appends them to a CSV handle that stays open for the whole run.
+
+The database is the source of truth. If the process dies between steps 1 and 2,
+`reconcile()` (run on startup) rewrites the CSV from `scraped_products` and
+re-applies the `scraped` flag, so the outputs cannot drift apart.
+"""
+
+import csv
+import logging
+import os
+from collections import Counter
+
+
+class ScrapeSink:
+    def __init__(self, conn, csv_path, table, columns, header, retry_table=None, dead_letter_table=None,
+                 batch_size=50):
+        self.conn = conn
+        self.csv_path = csv_path
+        self.table = table
+        self.columns = columns
+        self.header = header
+        self.retry_table = retry_table
+        self.dead_letter_table = dead_letter_table
+        self.batch_size = batch_size
+        self._buffer = []
+        self._csv_stale = False
+
+        self.reconcile()
+        write_header = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+        self._file = open(csv_path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if write_header:
+            self._writer.writerow(header)
+            self._file.flush()
+
+    def _db_rows(self):
+        cur = self.conn.cursor()
+        cur.execute(f"SELECT {', '.join(self.columns)} FROM {self.table} ORDER BY rowid")
+        return cur.fetchall()
+
+    def reconcile(self):
+        """Make the CSV and the `scraped` flags agree with `scraped_products`."""
+        cur = self.conn.cursor()
+        cur.execute(f"""
+            UPDATE url_similarity SET scraped = 1
+            WHERE IFNULL(scraped,0) = 0 AND id IN (SELECT Scrape_ID FROM {self.table})
+        """)
+        if cur.rowcount:
+            logging.info("Reconcile: set scraped flag on %d rows already in %s", cur.rowcount, self.table)
+        self.conn.commit()
+
+        cur.execute(f"SELECT Scrape_ID FROM {self.table}")
+        db_ids = Counter(str(r[0]) for r in cur.fetchall())
+        csv_ids = Counter()
+        if os.path.exists(self.csv_path):
+            with open(self.csv_path, "r", newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                csv_ids.update(r[0] for r in reader if r)
+        if csv_ids == db_ids:
+            return
+
+        logging.warning("Reconcile: %s disagrees with %s (%d vs %d rows), rewriting CSV from DB",
+                        self.csv_path, self.table, sum(csv_ids.values()), sum(db_ids.values()))
+        self._rewrite_csv()
+
+    def _rewrite_csv(self):
+        tmp_path = self.csv_path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.header)
+            writer.writerows(tuple(r) for r in self._db_rows())
+        os.replace(tmp_path, self.csv_path)
+
+    def write(self, row):
+        """Buffer one output row; row[0] is the url_similarity id (Scrape_ID)."""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def update(self, row):
+        """Apply a refreshed version of an already-written row (matched on Scrape_ID).
+
+        Not committed here: it joins the caller's transaction, so it commits together
+        with whatever the caller records about the check. Updated rows cannot be
+        appended to the CSV, so the CSV is rewritten from the DB once on close().
+        """
+        assignments = ", ".join(f"{c} = ?" for c in self.columns[1:])
+        self.conn.execute(f"UPDATE {self.table} SET {assignments} WHERE Scrape_ID = ?",
+                          tuple(row[1:]) + (row[0],))
+        self._csv_stale = True
+
+    def flush(self):
+        if not self._buffer:
+            return
+        ids = [(row[0],) for row in self._buffer]
+        placeholders = ", ".join("?" * len(self.columns))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({placeholders})",
+                self._buffer,
+            )
+            self.conn.executemany("UPDATE url_similarity SET scraped = 1 WHERE id = ?", ids)
+            for failure_table in (self.retry_table, self.dead_letter_table):
+                if failure_table:
+                    self.conn.executemany(f"DELETE FROM {failure_table} WHERE id = ?", ids)
+        self._writer.writerows(self._buffer)
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+        if self._csv_stale:
+            self._rewrite_csv()
@@ -0,0 +1,94 @@
+# PERSISTENT CURL_CFFI SESSION POOL
+"""Session pool for the curl_cffi scrapers.
+
+One `curl_cffi.requests.Session` is kept per (user agent, proxy) identity, so
+every fetch made under the same identity reuses the open TCP/TLS connection
+(keep-alive), negotiates HTTP/2 over TLS where the server offers it, and keeps
+the cookies Amazon sets. Cookies are also written to COOKIE_DIR when the pool is
+closed and loaded back the next time that identity is used.
+
+Usage
+-----
+    session = get_session(user_agent, proxy)
+    resp = session.get(url, headers=headers)
+    ...
+    close_sessions()
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from curl_cffi import CurlHttpVersion
+from curl_cffi import requests
+
+# CONFIG
+COOKIE_DIR = "/home/anusha/Desktop/Servoo/DATA_SCRAPING/DATA/cookies"
+IMPERSONATE = "chrome124"
+CONNECT_TIMEOUT = 10   # seconds to establish TCP/TLS
+READ_TIMEOUT = 30      # seconds to receive the response
+
+_sessions = {}
+
+
+def _identity_key(user_agent, proxy):
+    raw = f"{user_agent}|{proxy or ''}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _cookie_path(key):
+    return os.path.join(COOKIE_DIR, f"{key}.json")
+
+
+def _load_cookies(session, key):
+    path = _cookie_path(key)
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for c in json.load(f):
+                session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning("Ignoring unreadable cookie file %s: %s", path, e)
+
+
+def _save_cookies(session, key):
+    cookies = [
+        {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+        for c in session.cookies.jar
+    ]
+    if not cookies:
+        return
+    os.makedirs(COOKIE_DIR, exist_ok=True)
+    with open(_cookie_path(key), "w", encoding="utf-8") as f:
+        json.dump(cookies, f)
+
+
+def get_session(user_agent, proxy=None):
+    """Return the persistent session for this user agent / proxy identity, creating it on first use."""
+    key = _identity_key(user_agent, proxy)
+    session = _sessions.get(key)
+    if session is None:
+        session = requests.Session(
+            impersonate=IMPERSONATE,
+            http_version=CurlHttpVersion.V2TLS,
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+            proxy=proxy,
+        )
+        session.headers.update({"User-Agent": user_agent, "Connection": "keep-alive"})
+        _load_cookies(session, key)
+        _sessions[key] = session
+        logging.info("Opened session %s (proxy=%s)", key, proxy or "none")
+    return session
+
+
+def close_sessions():
+    """Persist cookies and close every pooled session."""
+    for key, session in list(_sessions.items()):
+        try:
+            _save_cookies(session, key)
+        except OSError as e:
+            logging.warning("Could not save cookies for session %s: %s", key, e)
+        session.close()
+    _sessions.clear()